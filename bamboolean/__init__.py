@@ -1,3 +1,12 @@
 from .factories import ParserFactory as Parser   # noqa
 from .factories import InterpreterFactory as Interpreter   # noqa
 from .factories import interpret, parse, extract_vars, normalize  # noqa
+from .factories import compile, enable_cache, disable_cache  # noqa
+from .factories import parse_stream, optimize, compile_adaptive  # noqa
+from .factories import profile, evaluate_columns, evaluate_npy  # noqa
+from .factories import specialize  # noqa
+from .batch import evaluate_many  # noqa
+from .ruleset import RuleSet  # noqa
+from .lazy import Lazy  # noqa
+from .aio import evaluate_async  # noqa
+from .serialization import dump, dumps, load, loads  # noqa
@@ -0,0 +1,311 @@
+"""Evaluation reordering AND/OR chains by sampled runtime statistics.
+
+Operands of a chain are side-effect free, so they can be evaluated in any
+order; the cheapest order runs first the operands which most often decide
+the chain (false for AND, true for OR) at the lowest cost.
+"""
+from time import perf_counter
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple
+
+from . import tokens as tok
+from .ast import AST, BinOp, chain_operands
+from .compiler import ExprCompiler, Predicate, VarsLookup
+from .lazy import LazyTable, NotComputed, SymbolTable, computed_view, \
+    lazy_table
+from .walkers import VarsExtractor
+
+Path = Tuple[int, ...]
+
+SNAPSHOT_VERSION = 1
+
+
+def path_key(path: Path) -> str:
+    """Key of a chain in snapshots: positions of the operands leading to it"""
+    return '.'.join(map(str, path))
+
+
+class ChainStats:
+    """Sampled outcomes of the operands of a single chain"""
+    __slots__ = ('evaluated', 'decided', 'elapsed', 'order')
+
+    def __init__(self, size: int) -> None:
+        self.evaluated = [0] * size
+        self.decided = [0] * size
+        self.elapsed = [0.0] * size
+        self.order = list(range(size))
+
+    def reorder(self) -> None:
+        """Order operands by their expected cost per deciding the chain"""
+        if not all(self.evaluated):
+            return
+
+        def cost_per_decision(i: int) -> float:
+            # Laplace smoothing keeps never deciding operands comparable
+            decides = (self.decided[i] + 1) / (self.evaluated[i] + 2)
+            return self.elapsed[i] / self.evaluated[i] / decides
+
+        self.order = sorted(self.order, key=cost_per_decision)
+
+    def to_dict(self) -> Dict[str, list]:
+        return {
+            'evaluated': list(self.evaluated),
+            'decided': list(self.decided),
+            'elapsed': list(self.elapsed),
+            'order': list(self.order),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, list]) -> 'ChainStats':
+        size = len(data['order'])
+        if sorted(data['order']) != list(range(size)) or any(
+                len(data[field]) != size
+                for field in ('evaluated', 'decided', 'elapsed')):
+            raise ValueError("Inconsistent chain statistics")
+        stats = cls(size)
+        stats.evaluated = [int(count) for count in data['evaluated']]
+        stats.decided = [int(count) for count in data['decided']]
+        stats.elapsed = [float(seconds) for seconds in data['elapsed']]
+        stats.order = [int(position) for position in data['order']]
+        return stats
+
+
+class AdaptiveChain:
+    """AND/OR chain evaluated in the order learned by its statistics.
+
+    When an operand raises in the learned order, the result is settled in
+    the written order, reusing the operands already evaluated, so
+    reordering never introduces an exception. It may avoid one, when the
+    written order would raise before reaching the deciding operand.
+
+    An AND chain returns the value of an operand, and which one depends on
+    the order: the first falsy one, or else the last one evaluated, so
+    with `a = 1` and `b = 2`, `a AND b` may give 1 instead of 2.
+    """
+    __slots__ = ('operands', 'conjunction', 'stats', 'expression',
+                 'ordering')
+
+    def __init__(self, operands: Sequence[Predicate], conjunction: bool,
+                 expression: 'AdaptiveExpression') -> None:
+        self.operands = tuple(operands)
+        self.conjunction = conjunction
+        self.stats = ChainStats(len(operands))
+        self.expression = expression
+        self.set_order(self.stats.order)
+
+    def set_order(self, order: Sequence[int]) -> None:
+        positions = tuple(order)
+        if positions == tuple(range(len(self.operands))):
+            self.ordering = (positions, self.operands)
+        else:
+            self.ordering = (positions,
+                             tuple(self.operands[i] for i in positions))
+
+    def reorder(self) -> None:
+        self.stats.reorder()
+        self.set_order(self.stats.order)
+
+    def __call__(self, table: dict) -> Any:
+        if self.expression.sampling:
+            return self.sample(table)
+        positions, ordered = self.ordering
+        if ordered is self.operands:
+            return self.evaluate(ordered, table)
+        passed = 0
+        try:
+            if self.conjunction:
+                for operand in ordered:
+                    value = operand(table)
+                    if not value:
+                        return value
+                    passed += 1
+                return value
+            for operand in ordered:
+                if operand(table):
+                    return True
+                passed += 1
+            return False
+        except RecursionError:
+            raise
+        except Exception as error:
+            return self.settle(table, positions[:passed], positions[passed],
+                               error)
+
+    def evaluate(self, operands: Sequence[Predicate], table: dict) -> Any:
+        if self.conjunction:
+            for operand in operands:
+                value = operand(table)
+                if not value:
+                    return value
+            return value
+        for operand in operands:
+            if operand(table):
+                return True
+        return False
+
+    def settle(self, table: dict, passed: Sequence[int], failed: int,
+               error: Exception) -> Any:
+        """Result in the written order, after the operands at `passed`
+        did not decide the chain and the one at `failed` raised `error`"""
+        for position, operand in enumerate(self.operands):
+            if position == failed:
+                raise error
+            if position in passed:
+                continue
+            value = operand(table)
+            if bool(value) != self.conjunction:
+                return value if self.conjunction else True
+        raise error
+
+    def sample(self, table: dict) -> Any:
+        """Evaluate and record the operands, give the written order result.
+
+        Operands after the one settling the chain in the written order are
+        evaluated on a ComputedView, and skipped when they would compute a
+        Lazy or resolver value, which the written order would not.
+        """
+        stats = self.stats
+        settled: Optional[Tuple[Any, Optional[Exception]]] = None
+        view = table
+        for i, operand in enumerate(self.operands):
+            error = None
+            start = perf_counter()
+            try:
+                value = operand(view)
+            except NotComputed:
+                if settled is None:
+                    raise  # `table` is a view, skip the whole chain
+                continue
+            except Exception as exc:
+                value, error = None, exc
+            stats.elapsed[i] += perf_counter() - start
+            stats.evaluated[i] += 1
+            decides = error is None and bool(value) != self.conjunction
+            if decides:
+                stats.decided[i] += 1
+            if settled is None and (decides or error is not None):
+                settled = (value, error)
+                view = computed_view(table)
+
+        if settled is None:
+            return value if self.conjunction else False
+        value, error = settled
+        if error is not None:
+            raise error
+        return value if self.conjunction else True
+
+
+class AdaptiveCompiler(ExprCompiler):
+    """Compile chains into AdaptiveChain closures, keyed by their path"""
+    def __init__(self, tree: AST, expression: 'AdaptiveExpression') -> None:
+        super().__init__(tree)
+        self.expression = expression
+        self.chains: Dict[str, AdaptiveChain] = {}
+        self.path: Path = ()
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, Any, Predicate]:
+        if node.op.type not in (tok.AND, tok.OR):
+            self.error("Could not compile binary operator")
+        path = self.path
+        operands: List[Predicate] = []
+        for position, operand in enumerate(chain_operands(node)):
+            self.path = path + (position,)
+            operands.append((yield operand))
+        self.path = path
+        chain = AdaptiveChain(operands, node.op.type == tok.AND,
+                              self.expression)
+        self.chains[path_key(path)] = chain
+        return chain
+
+
+class AdaptiveExpression:
+    """Expression adapting the order of its AND/OR chains to the traffic.
+
+    Every `sample_every`-th evaluation is a sample: all operands of the
+    chains it reaches are evaluated, except those which would compute a
+    Lazy or resolver value the written order does not need, and how often
+    each decides its chain and how long it takes are recorded. Every
+    `reorder_every` samples the chains are reordered. For records
+    evaluated without an exception, results have the same truth value as
+    with `Interpreter`, but the operand value returned by AND, truthy or
+    falsy, may differ.
+
+    Trees nesting closures deeper than MAX_CLOSURE_DEPTH have no adaptive
+    chains and are evaluated in the written order.
+
+    Statistics can be saved with `snapshot()` as a JSON-compatible dict,
+    and loaded back with `load_snapshot()`, e.g. at startup.
+    Sharing an instance between threads is safe, but counts may be lost.
+    """
+    def __init__(self, text: str, tree: AST, sample_every: int = 16,
+                 reorder_every: int = 64) -> None:
+        if sample_every < 1 or reorder_every < 1:
+            raise ValueError("Sampling intervals must be positive")
+        self.text = text
+        self.tree = tree
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+        self.sampling = False
+        self.evaluations = 0
+        self.samples = 0
+        compiler = AdaptiveCompiler(tree, self)
+        self._predicate = compiler.compile()
+        self.chains = compiler.chains
+        self._lookup = VarsLookup(VarsExtractor(tree).extract())
+
+    def evaluate(self, symbol_table: SymbolTable) -> Any:
+        if callable(symbol_table):
+            table: dict = LazyTable({}, symbol_table)
+        else:
+            table = lazy_table(self._lookup(symbol_table))
+        self.evaluations += 1
+        if self.evaluations % self.sample_every:
+            return self._predicate(table)
+
+        self.sampling = True
+        try:
+            return self._predicate(table)
+        finally:
+            self.sampling = False
+            self.samples += 1
+            if self.samples % self.reorder_every == 0:
+                self.reorder()
+
+    def reorder(self) -> None:
+        for chain in self.chains.values():
+            chain.reorder()
+
+    def orders(self) -> Dict[str, List[int]]:
+        """Current order of operands of every chain"""
+        return {key: list(chain.stats.order)
+                for key, chain in self.chains.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'version': SNAPSHOT_VERSION,
+            'text': self.text,
+            'chains': {key: chain.stats.to_dict()
+                       for key, chain in self.chains.items()},
+        }
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Restore statistics and order saved for the same expression"""
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported snapshot version: {!r}".format(
+                snapshot.get('version')))
+        if snapshot.get('text') != self.text:
+            raise ValueError("Snapshot of a different expression")
+        chains = snapshot['chains']
+        if set(chains) != set(self.chains):
+            raise ValueError("Snapshot of a different expression")
+        loaded = {}
+        for key, chain in self.chains.items():
+            stats = ChainStats.from_dict(chains[key])
+            if len(stats.order) != len(chain.operands):
+                raise ValueError("Snapshot of a different expression")
+            loaded[key] = stats
+        for key, chain in self.chains.items():
+            chain.stats = loaded[key]
+            chain.set_order(chain.stats.order)
+
+    def __repr__(self) -> str:
+        return 'AdaptiveExpression({!r})'.format(self.text)
@@ -0,0 +1,189 @@
+"""Evaluation with variables fetched from asyncio backends.
+
+    await evaluate_async("cheap_flag AND score > 0.5", fetch)
+
+`fetch` is called with the upper-cased name of a variable and returns its
+value, or an awaitable of it; KeyError means the variable is missing.
+A batched resolver instead takes a list of names and returns (an
+awaitable of) a mapping of those present, fetching them in one round trip.
+Every variable is fetched at most once per evaluation.
+
+By default variables are fetched when evaluation reaches them, so
+short-circuiting skips fetches exactly as `interpret` skips evaluation;
+as each operand of AND and OR may decide the result, no two fetches are
+ever certainly needed at once. Speculative evaluation instead fetches all
+the variables at once (in a single batch) and evaluates the operands of
+every chain concurrently; the first operand deciding its chain wins, and
+fetches no longer needed are cancelled.
+"""
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+from . import tokens as tok
+from .ast import AST, BinOp, Constraint, NoOp, TokenBasedAST, UnaryOp, Var, \
+    chain_operands
+from .compiler import CompiledExpression
+from .exceptions import BambooleanRuntimeError
+from .factories import parse
+from .interpreter import evaluation_order, rel_ops
+from .walkers import VarsExtractor
+
+AsyncResolver = Callable[[str], Any]
+BatchResolver = Callable[[List[str]], Any]
+
+
+async def _resolved(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def _consume(tasks: Iterable['asyncio.Future[Any]']) -> None:
+    """Cancel pending tasks and retrieve exceptions of finished ones"""
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+
+class Fetcher:
+    """Variables of a single evaluation, each fetched once"""
+    def __init__(self, resolver: Union[AsyncResolver, BatchResolver],
+                 batched: bool) -> None:
+        self.resolver: Callable[[Any], Any] = resolver
+        self.batched = batched
+        self.tasks: Dict[str, 'asyncio.Future[Any]'] = {}
+        self.batches: List['asyncio.Future[Any]'] = []
+
+    def fetch(self, names: Iterable[str]) -> None:
+        """Start fetching the variables not fetched yet, in one batch"""
+        names = [name for name in names if name not in self.tasks]
+        if not names:
+            return
+        if not self.batched:
+            for name in names:
+                self.tasks[name] = asyncio.ensure_future(self._fetch(name))
+            return
+        batch = asyncio.ensure_future(_resolved(self.resolver(names)))
+        self.batches.append(batch)
+        for name in names:
+            self.tasks[name] = asyncio.ensure_future(self._pick(batch, name))
+
+    async def _fetch(self, name: str) -> Any:
+        try:
+            return await _resolved(self.resolver(name))
+        except KeyError:
+            return ''
+
+    async def _pick(self, batch: 'asyncio.Future[Any]', name: str) -> Any:
+        # shielded, so a variable no longer needed does not cancel the batch
+        values = await asyncio.shield(batch)
+        return values.get(name, '')
+
+    async def get(self, name: str) -> Any:
+        if name not in self.tasks:
+            self.fetch([name])
+        # shielded, as other operands may still read the variable when
+        # this one is cancelled
+        return await asyncio.shield(self.tasks[name])
+
+    def close(self) -> None:
+        _consume(self.tasks.values())
+        _consume(self.batches)
+
+
+class AsyncEvaluator:
+    """Evaluation of a tree with variables read from a Fetcher"""
+    def __init__(self, tree: AST, fetcher: Fetcher) -> None:
+        self.tree = tree
+        self.fetcher = fetcher
+
+    def error(self, extra: str = '') -> BambooleanRuntimeError:
+        return BambooleanRuntimeError(
+            "Runtime error occured. {extra}".format(extra=extra))
+
+    async def leaf(self, node: AST) -> Any:
+        if isinstance(node, Constraint):
+            value = await self.fetcher.get(str(node.var.value))
+            return rel_ops[node.rel_op.type](value, node.value.value)
+        if isinstance(node, Var):
+            return await self.fetcher.get(str(node.value))
+        if isinstance(node, TokenBasedAST):
+            return node.value
+        if isinstance(node, NoOp):
+            return True  # no expression should evaluate to true
+        raise self.error("Could not evaluate {}".format(type(node).__name__))
+
+    async def evaluate(self) -> Any:
+        """Evaluate in order, with the `evaluation_order` of `Interpreter`"""
+        walk = evaluation_order(self.tree)
+        try:
+            leaf = next(walk)
+            while True:
+                leaf = walk.send(await self.leaf(leaf))
+        except StopIteration as stop:
+            return stop.value
+
+    async def speculate(self, node: AST) -> Any:
+        """Evaluate operands of chains concurrently, the first deciding wins.
+
+        Results have the same truth value as in order, for records evaluated
+        without an exception; the falsy value returned by AND may differ,
+        and an exception of an operand is ignored when another one decides
+        the chain.
+        """
+        if isinstance(node, UnaryOp):
+            if node.op.type != tok.NOT:
+                raise self.error("Could not evaluate unary operator")
+            # nested evaluations run as tasks, keeping the stack flat
+            return not await asyncio.ensure_future(self.speculate(node.right))
+        if not isinstance(node, BinOp):
+            return await self.leaf(node)
+
+        op_type = node.op.type
+        if op_type not in (tok.AND, tok.OR):
+            raise self.error("Could not evaluate binary operator")
+        deciding = bool(op_type == tok.OR)
+        tasks = [asyncio.ensure_future(self.speculate(operand))
+                 for operand in chain_operands(node)]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue  # undecided, raised when no operand decides
+                    if task.exception() is None \
+                            and bool(task.result()) is deciding:
+                        return True if deciding else task.result()
+            # no operand decided, the first exception is raised as in order
+            values = [task.result() for task in tasks]
+            return values[-1] if op_type == tok.AND else False
+        finally:
+            _consume(tasks)
+
+
+async def evaluate_async(expression: Union[str, CompiledExpression],
+                         resolver: Union[AsyncResolver, BatchResolver],
+                         batched: bool = False,
+                         speculative: bool = False) -> Any:
+    """Evaluate the expression with variables fetched by `resolver`.
+
+    `resolver` takes an upper-cased variable name, or with `batched` a
+    list of them, see the module documentation. Fetches still pending when
+    the result is known are cancelled.
+    """
+    tree = expression.tree if isinstance(expression, CompiledExpression) \
+        else parse(expression)
+    fetcher = Fetcher(resolver, batched)
+    evaluator = AsyncEvaluator(tree, fetcher)
+    try:
+        if not speculative:
+            return await evaluator.evaluate()
+        fetcher.fetch(sorted(VarsExtractor(tree).extract()))
+        return await evaluator.speculate(tree)
+    finally:
+        fetcher.close()
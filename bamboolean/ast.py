@@ -1,14 +1,20 @@
 from typing import List, Any, Union
-from .tokens import Token
+from .tokens import Token, ValueType
+from .node_visitor import NodeVisitor
 
 
 class AST:
-    """Abstract Syntax Tree """
+    """Abstract Syntax Tree
+
+    Nodes are shared, e.g. by the parse cache, and must not be modified.
+    """
+    __slots__ = ()
+
     def tree_repr(self) -> List[Any]:
         raise NotImplementedError
 
     def __str__(self) -> str:
-        return str(self.tree_repr())
+        return _repr_string(self)
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -18,9 +24,14 @@ class AST:
 
 
 class TokenBasedAST(AST):
+    __slots__ = ('token',)
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.value = token.value
+
+    @property
+    def value(self) -> ValueType:
+        return self.token.value
 
     def tree_repr(self):
         return self.token.tree_repr()
@@ -30,18 +41,20 @@ class TokenBasedAST(AST):
 
 
 class Var(TokenBasedAST):
-    pass
+    __slots__ = ()
 
 
 class Num(TokenBasedAST):
-    pass
+    __slots__ = ()
 
 
 class Bool(TokenBasedAST):
-    pass
+    __slots__ = ()
 
 
 class String(TokenBasedAST):
+    __slots__ = ()
+
     def stringify(self) -> str:
         return f"'{self.value}'"
 
@@ -50,6 +63,8 @@ ASTValueType = Union[String, Bool, Num]
 
 
 class Constraint(AST):
+    __slots__ = ('var', 'rel_op', 'value')
+
     def __init__(self, var: Var, rel_op: Token, value: ASTValueType):
         self.var = var
         self.rel_op = rel_op
@@ -68,41 +83,107 @@ class Constraint(AST):
 
 
 class BinOp(AST):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left: AST, op: Token, right: AST) -> None:
         self.left = left
         self.op = op
         self.right = right
 
     def tree_repr(self) -> List[Any]:
-        return [
-            self.left.tree_repr(),
-            self.op.tree_repr(),
-            self.right.tree_repr(),
-        ]
+        return _TreeRepr().visit(self)
 
     def stringify(self) -> str:
-        left, right = self.left.stringify(), self.right.stringify()
-        return f"({left} {self.op.stringify()} {right})"
+        return _stringify(self)
 
 
 class UnaryOp(AST):
+    __slots__ = ('op', 'right')
+
     def __init__(self, op: Token, right: AST) -> None:
         self.op = op
         self.right = right
 
     def tree_repr(self) -> List[Any]:
-        return [
-            self.op.tree_repr(),
-            self.right.tree_repr(),
-        ]
+        return _TreeRepr().visit(self)
 
     def stringify(self) -> str:
-        return f"{self.op.stringify()} {self.right.stringify()}"
+        return _stringify(self)
 
 
 class NoOp(AST):
+    __slots__ = ()
+
     def tree_repr(self) -> List[Any]:
         return ['noop']
 
     def stringify(self) -> str:
         return ""
+
+
+def chain_operands(node: BinOp) -> List[AST]:
+    """Operands of a chain of the same binary operator, left to right.
+
+    `(a AND b) AND c` and `a AND (b AND c)` both give [a, b, c].
+    """
+    op_type = node.op.type
+    operands: List[AST] = []
+    stack: List[AST] = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, BinOp) and current.op.type == op_type:
+            stack.append(current.right)
+            stack.append(current.left)
+        else:
+            operands.append(current)
+    return operands
+
+
+class _TreeRepr(NodeVisitor):
+    """`tree_repr` of operators, walking the tree without recursion"""
+    def visit_BinOp(self, node: BinOp) -> Any:
+        left = yield node.left
+        right = yield node.right
+        return [left, node.op.tree_repr(), right]
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Any:
+        return [node.op.tree_repr(), (yield node.right)]
+
+    def generic_visit(self, node: AST) -> Any:
+        return node.tree_repr()
+
+
+def _stringify(node: AST) -> str:
+    """`stringify` of the tree, joining its parts collected on a stack"""
+    parts: List[str] = []
+    stack: List[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, BinOp):
+            op = ' {} '.format(item.op.stringify())
+            stack.extend((')', item.right, op, item.left, '('))
+        elif isinstance(item, UnaryOp):
+            stack.extend((item.right, item.op.stringify() + ' '))
+        else:
+            parts.append(item.stringify())
+    return ''.join(parts)
+
+
+def _repr_string(node: AST) -> str:
+    """`str` of the `tree_repr` of the tree, without nesting any lists"""
+    parts: List[str] = []
+    stack: List[Any] = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, BinOp):
+            stack.extend(
+                (']', item.right, ', ', item.op, ', ', item.left, '['))
+        elif isinstance(item, UnaryOp):
+            stack.extend((']', item.right, ', ', item.op, '['))
+        else:
+            parts.append(repr(item.tree_repr()))
+    return ''.join(parts)
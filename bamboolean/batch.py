@@ -0,0 +1,106 @@
+"""Evaluation of one expression against many records in worker processes"""
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Iterable, Iterator, List, \
+    Optional, Union
+
+from .bytecode import Program, compile_program, run
+from .compiler import CompiledExpression, Predicate, VarsLookup, \
+    compile_closures
+from .factories import parse
+from .lazy import lazy_table
+from .walkers import VarsExtractor
+
+Decoder = Callable[[Any], dict]
+
+# program of the expression evaluated by the worker process, and decoder
+# of its records
+_program: Optional[Program] = None
+_decode: Optional[Decoder] = None
+
+
+def fold_keys(record: dict) -> dict:
+    """Symbol table of the record, with upper-cased keys"""
+    return {k.upper(): v for k, v in record.items()}
+
+
+def _init_worker(program: Program, decode: Decoder) -> None:
+    global _program, _decode
+    _program, _decode = program, decode
+
+
+def _evaluate_chunk(records: List[Any]) -> List[Any]:
+    program, decode = _program, _decode
+    assert program is not None and decode is not None, \
+        "worker not initialized"
+    return [run(program, lazy_table(decode(record))) for record in records]
+
+
+def _chunks(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_many(expression: Union[str, CompiledExpression],
+                  records: Iterable[Any], workers: Optional[int] = None,
+                  chunksize: int = 1024, max_pending: Optional[int] = None,
+                  decode: Decoder = fold_keys) -> Iterator[Any]:
+    """Evaluate the expression for every record, yielding results in order.
+
+    The expression is parsed and compiled to bytecode once, and the
+    program is sent to each of `workers` processes (by default one per
+    CPU) when it starts. Records are read lazily and sent in chunks; at
+    most `max_pending` chunks (by default two per worker) are in flight,
+    so memory stays bounded however long the input is. With one worker
+    records are evaluated in the calling process, by compiled closures.
+
+    `decode` turns a record into a symbol table with upper-cased keys, in
+    the process evaluating it, so records may be e.g. raw lines of JSON.
+    By default only the variables of the expression are read from the
+    records, with VarsLookup. Values of the symbol tables may be Lazy.
+    Records, results and the decoder must be picklable. An exception
+    raised for a record is raised by the iterator, and chunks in flight
+    are discarded.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive")
+    tree = expression.tree if isinstance(expression, CompiledExpression) \
+        else parse(expression)
+    if decode is fold_keys:
+        decode = VarsLookup(VarsExtractor(tree).extract())
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _evaluate_serial(compile_closures(tree), records, decode)
+    max_pending = max_pending or 2 * workers
+    return _evaluate_parallel(compile_program(tree), records, decode,
+                              workers, chunksize, max_pending)
+
+
+def _evaluate_serial(predicate: Predicate, records: Iterable[Any],
+                     decode: Decoder) -> Iterator[Any]:
+    for record in records:
+        yield predicate(lazy_table(decode(record)))
+
+
+def _evaluate_parallel(program: Program, records: Iterable[Any],
+                       decode: Decoder, workers: int, chunksize: int,
+                       max_pending: int) -> Iterator[Any]:
+    pending: Deque['Future[List[Any]]'] = deque()
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(program, decode)) as pool:
+        try:
+            for chunk in _chunks(records, chunksize):
+                pending.append(pool.submit(_evaluate_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
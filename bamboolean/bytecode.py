@@ -0,0 +1,229 @@
+"""Flat postfix bytecode for Bamboolean expressions and a stack VM.
+
+A program is an array of (opcode, argument) pairs together with tables of
+constants and variable names, so it is cheap to copy, pickle and share
+between processes. Boolean operators short-circuit with jumps:
+
+    x > 42 AND y        0 LOAD_VAR             0 (X)
+                        2 LOAD_CONST           0 (42)
+                        4 CMP_GT
+                        6 JUMP_IF_FALSE_OR_POP 10
+                        8 LOAD_VAR             1 (Y)
+"""
+from array import array
+from typing import Any, Dict, Generator, List, NoReturn, Sequence, Tuple
+
+from . import tokens as tok
+from .exceptions import BambooleanRuntimeError
+from .ast import AST, BinOp, UnaryOp, Constraint, TokenBasedAST, \
+    chain_operands
+from .node_visitor import NodeVisitor
+
+LOAD_VAR = 1
+LOAD_CONST = 2
+CMP_EQ = 3
+CMP_NE = 4
+CMP_LT = 5
+CMP_LTE = 6
+CMP_GT = 7
+CMP_GTE = 8
+NOT = 9
+TO_BOOL = 10
+JUMP_IF_FALSE_OR_POP = 11
+JUMP_IF_TRUE_OR_POP = 12
+
+opnames: Dict[int, str] = {
+    code: name for name, code in globals().items()
+    if isinstance(code, int) and name.isupper()
+}
+
+compare_opcodes: Dict[str, int] = {
+    tok.EQ: CMP_EQ,
+    tok.NE: CMP_NE,
+    tok.LT: CMP_LT,
+    tok.LTE: CMP_LTE,
+    tok.GT: CMP_GT,
+    tok.GTE: CMP_GTE,
+}
+
+
+class Program:
+    """Compiled expression: flat code with constant and name tables"""
+    __slots__ = ('code', 'consts', 'names')
+
+    def __init__(self, code: Sequence[int], consts: Tuple[Any, ...],
+                 names: Tuple[str, ...]) -> None:
+        self.code = code
+        self.consts = consts
+        self.names = names
+
+    def __getstate__(self) -> Tuple[Sequence[int], Tuple[Any, ...],
+                                    Tuple[str, ...]]:
+        # code may be a view of a buffer, which can not be pickled
+        return array('l', self.code), self.consts, self.names
+
+    def __setstate__(self, state: Tuple[Sequence[int], Tuple[Any, ...],
+                                        Tuple[str, ...]]) -> None:
+        self.code, self.consts, self.names = state
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Program):
+            return NotImplemented
+        return (list(self.code) == list(other.code)
+                and self.consts == other.consts
+                and self.names == other.names)
+
+    def __repr__(self) -> str:
+        return 'Program({} instructions)'.format(len(self.code) // 2)
+
+
+class BytecodeCompiler(NodeVisitor):
+    def __init__(self, tree: AST) -> None:
+        self.tree = tree
+        self.code = array('l')
+        self.consts: List[Any] = []
+        self.names: List[str] = []
+        self._const_index: Dict[Tuple[type, Any], int] = {}
+        self._name_index: Dict[str, int] = {}
+
+    def compile(self) -> Program:
+        self.visit(self.tree)
+        return Program(self.code, tuple(self.consts), tuple(self.names))
+
+    def error(self, extra='') -> NoReturn:
+        raise BambooleanRuntimeError(
+            "Compilation error occured. {extra}".format(extra=extra))
+
+    def emit(self, opcode: int, arg: int = 0) -> int:
+        self.code.append(opcode)
+        self.code.append(arg)
+        return len(self.code) - 2
+
+    def const(self, value: Any) -> int:
+        key = (type(value), value)  # keep 1, 1.0 and True apart
+        if key not in self._const_index:
+            self._const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return self._const_index[key]
+
+    def name(self, name: str) -> int:
+        if name not in self._name_index:
+            self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self._name_index[name]
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, Any, None]:
+        op_type = node.op.type
+        if op_type == tok.AND:
+            jump = JUMP_IF_FALSE_OR_POP
+        elif op_type == tok.OR:
+            jump = JUMP_IF_TRUE_OR_POP
+        else:
+            self.error("Could not compile binary operator")
+
+        operands = chain_operands(node)
+        jumps = []
+        for operand in operands[:-1]:
+            yield operand
+            jumps.append(self.emit(jump))
+        yield operands[-1]
+        for position in jumps:
+            self.code[position + 1] = len(self.code)
+        if op_type == tok.OR:
+            self.emit(TO_BOOL)
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Generator[AST, Any, None]:
+        if node.op.type != tok.NOT:
+            self.error("Could not compile unary operator")
+        yield node.right
+        self.emit(NOT)
+
+    def visit_Constraint(self, node: Constraint) -> None:
+        self.visit(node.var)
+        self.visit(node.value)
+        self.emit(compare_opcodes[node.rel_op.type])
+
+    def visit_Var(self, node: TokenBasedAST) -> None:
+        self.emit(LOAD_VAR, self.name(str(node.value)))
+
+    def _constant(self, node: TokenBasedAST) -> None:
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    visit_Num = visit_Bool = visit_String = _constant
+
+    def visit_NoOp(self, node) -> None:
+        # no expression should evaluate to true
+        self.emit(LOAD_CONST, self.const(True))
+
+
+def compile_program(tree: AST) -> Program:
+    return BytecodeCompiler(tree).compile()
+
+
+def run(program: Program, table: dict) -> Any:
+    """Execute the program against a symbol table with upper-cased keys"""
+    code, consts, names = program.code, program.consts, program.names
+    get = table.get
+    stack: List[Any] = []
+    push, pop = stack.append, stack.pop
+    pc, end = 0, len(code)
+
+    while pc < end:
+        opcode = code[pc]
+        if opcode == LOAD_VAR:
+            push(get(names[code[pc + 1]], ''))
+        elif opcode == LOAD_CONST:
+            push(consts[code[pc + 1]])
+        elif opcode == JUMP_IF_FALSE_OR_POP:
+            if not stack[-1]:
+                pc = code[pc + 1]
+                continue
+            pop()
+        elif opcode == JUMP_IF_TRUE_OR_POP:
+            if stack[-1]:
+                pc = code[pc + 1]
+                continue
+            pop()
+        elif opcode == CMP_EQ:
+            value = pop()
+            stack[-1] = stack[-1] == value
+        elif opcode == CMP_NE:
+            value = pop()
+            stack[-1] = stack[-1] != value
+        elif opcode == CMP_GT:
+            value = pop()
+            stack[-1] = stack[-1] > value
+        elif opcode == CMP_LT:
+            value = pop()
+            stack[-1] = stack[-1] < value
+        elif opcode == CMP_GTE:
+            value = pop()
+            stack[-1] = stack[-1] >= value
+        elif opcode == CMP_LTE:
+            value = pop()
+            stack[-1] = stack[-1] <= value
+        elif opcode == NOT:
+            stack[-1] = not stack[-1]
+        elif opcode == TO_BOOL:
+            stack[-1] = bool(stack[-1])
+        else:
+            raise BambooleanRuntimeError(
+                "Unknown opcode {} at {}".format(opcode, pc))
+        pc += 2
+
+    return stack[-1]
+
+
+def disassemble(program: Program) -> str:
+    code, lines = program.code, []
+    for pc in range(0, len(code), 2):
+        opcode, arg = code[pc], code[pc + 1]
+        line = '{:>4} {:<20}'.format(pc, opnames.get(opcode, opcode))
+        if opcode == LOAD_VAR:
+            line += ' {} ({})'.format(arg, program.names[arg])
+        elif opcode == LOAD_CONST:
+            line += ' {} ({!r})'.format(arg, program.consts[arg])
+        elif opcode in (JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP):
+            line += ' {}'.format(arg)
+        lines.append(line.rstrip())
+    return '\n'.join(lines)
@@ -0,0 +1,257 @@
+"""Command line interface, run with `python -m bamboolean`.
+
+    python -m bamboolean filter EXPR [FILE ...]
+
+streams JSON lines or CSV rows of the files (or standard input) and
+writes those matching the expression, or a flag for every record, to
+standard output.
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+from itertools import islice, tee
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, \
+    TextIO, Tuple
+
+from .batch import evaluate_many
+from .compiler import CompiledExpression
+from .exceptions import BambooleanError, BambooleanSyntaxError
+from .factories import compile
+from .walkers import VarsExtractor
+
+BUFFER_SIZE = 1 << 20
+# lines joined into a single write
+BLOCK_SIZE = 4096
+
+integer_regex = re.compile(r'[-+]?\d+\Z')
+float_regex = re.compile(r'[-+]?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?\Z')
+
+
+def parse_value(text: str) -> Any:
+    """Value of a CSV field: a number, a boolean or the text itself"""
+    if integer_regex.match(text):
+        return int(text)
+    if float_regex.match(text):
+        return float(text)
+    lowered = text.lower()
+    if lowered == 'true':
+        return True
+    if lowered == 'false':
+        return False
+    return text
+
+
+class JsonTables:
+    """Symbol tables of JSON lines holding only the variables in `names`.
+
+    A variable takes the value of the last key equal to it when
+    upper-cased, as with case folding of the whole record. Records mostly
+    share their keys, so the keys giving the variables are found once for
+    every distinct sequence of keys.
+    """
+    max_layouts = 1024
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = frozenset(names)
+        self.layouts: Dict[Tuple[str, ...], Tuple[Tuple[str, str], ...]] = {}
+
+    def __call__(self, line: str) -> dict:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Record is not a JSON object")
+        keys = tuple(record)
+        layout = self.layouts.get(keys)
+        if layout is None:
+            if len(self.layouts) >= self.max_layouts:
+                self.layouts.clear()
+            found = {}
+            for key in keys:
+                name = key.upper()
+                if name in self.names:
+                    found[name] = key
+            layout = self.layouts[keys] = tuple(found.items())
+        return {name: record[key] for name, key in layout}
+
+
+class CsvTables:
+    """Symbol tables of CSV rows holding only the variables in `names`"""
+    def __init__(self, names: Iterable[str], header: Sequence[str],
+                 infer_types: bool) -> None:
+        names = frozenset(names)
+        columns = {name.upper(): i for i, name in enumerate(header)
+                   if name.upper() in names}
+        self.columns = tuple(columns.items())
+        self.infer_types = infer_types
+
+    def __call__(self, row: List[str]) -> dict:
+        size = len(row)
+        if self.infer_types:
+            return {name: parse_value(row[i])
+                    for name, i in self.columns if i < size}
+        return {name: row[i] for name, i in self.columns if i < size}
+
+
+def write_blocks(out: TextIO, lines: Iterable[str]) -> None:
+    """Write lines in blocks, including those before an exception"""
+    block: List[str] = []
+    try:
+        for line in lines:
+            block.append(line)
+            if len(block) >= BLOCK_SIZE:
+                out.write(''.join(block))
+                block = []
+    finally:
+        out.write(''.join(block))
+
+
+class Filter:
+    """Records of the inputs matching an expression, written to `out`"""
+    def __init__(self, expression: CompiledExpression,
+                 args: argparse.Namespace, out: TextIO) -> None:
+        self.expression = expression
+        self.args = args
+        self.out = out
+        self.names = VarsExtractor(expression.tree).extract()
+        self.header: Optional[List[str]] = None
+        # records of the current input evaluated, None before reading them
+        self.count: Optional[int] = None
+
+    def evaluate(self, records: Iterable[Any], decode: Any
+                 ) -> Iterable[Tuple[Any, Any]]:
+        """(record, result) pairs, counting evaluated records.
+
+        Workers evaluate records in chunks, so when one fails, its chunk is
+        evaluated again record by record to count up to the failing one.
+        """
+        pending, evaluated = tee(records)
+        results = evaluate_many(self.expression, evaluated,
+                                workers=self.args.workers,
+                                chunksize=self.args.chunksize, decode=decode)
+        count = self.count = 0
+        try:
+            for result in results:
+                record = next(pending)
+                count = self.count = count + 1
+                yield record, result
+        except Exception:
+            if self.args.workers > 1:
+                self.locate(pending, decode, count)
+                self.count = count  # the error was not in evaluation
+            raise
+
+    def locate(self, records: Iterator[Any], decode: Any,
+               count: int) -> None:
+        """Evaluate the failing chunk here, raising for the failing record"""
+        chunk = islice(records, self.args.chunksize)
+        for position, record in enumerate(chunk, count):
+            self.count = position
+            self.expression.evaluate(decode(record))
+
+    def jsonl(self, stream: TextIO) -> None:
+        lines = (line for line in stream if not line.isspace())
+        pairs = self.evaluate(lines, JsonTables(self.names))
+        if self.args.flags:
+            write_blocks(self.out, ('true\n' if result else 'false\n'
+                                    for _, result in pairs))
+            return
+        write_blocks(self.out, (
+            line if line.endswith('\n') else line + '\n'
+            for line, result in pairs if result))
+
+    def csv(self, stream: TextIO) -> None:
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        decode = CsvTables(self.names, header, not self.args.strings)
+        pairs = self.evaluate(reader, decode)
+        if self.args.flags:
+            write_blocks(self.out, ('true\n' if result else 'false\n'
+                                    for _, result in pairs))
+            return
+        writer = csv.writer(self.out, lineterminator='\n')
+        if self.header is None:
+            self.header = header
+            writer.writerow(header)
+        elif header != self.header:
+            raise ValueError("Header differs from the first file")
+        writer.writerows(row for row, result in pairs if result)
+
+
+def input_format(path: str, args: argparse.Namespace) -> str:
+    if args.format:
+        return args.format
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def run_filter(args: argparse.Namespace, stdin: TextIO, out: TextIO) -> int:
+    try:
+        expression = compile(args.expression)
+    except BambooleanSyntaxError as error:
+        print('Invalid expression: {}'.format(error), file=sys.stderr)
+        return 2
+
+    records = Filter(expression, args, out)
+    for path in args.files or ['-']:
+        records.count = None
+        try:
+            if path == '-':
+                getattr(records, input_format('', args))(stdin)
+                continue
+            with open(path, encoding='utf-8', newline='',
+                      buffering=BUFFER_SIZE) as stream:
+                getattr(records, input_format(path, args))(stream)
+        except (OSError, UnicodeError) as error:
+            # errors of the file rather than of one of its records
+            print('{}: {}'.format(path, error), file=sys.stderr)
+            return 1
+        except (ValueError, TypeError, csv.Error,
+                BambooleanError) as error:
+            if records.count is None:
+                print('{}: {}'.format(path, error), file=sys.stderr)
+            else:
+                print('{}: record {}: {}'.format(path, records.count + 1,
+                                                 error), file=sys.stderr)
+            return 1
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None,
+         stdin: Optional[TextIO] = None,
+         stdout: Optional[TextIO] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m bamboolean')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    filter_parser = commands.add_parser(
+        'filter', help='write records matching the expression')
+    filter_parser.add_argument('expression')
+    filter_parser.add_argument('files', nargs='*',
+                               help="JSON lines or CSV files, '-' for stdin")
+    filter_parser.add_argument(
+        '--format', choices=('jsonl', 'csv'),
+        help='format of the input, by default CSV for *.csv files and JSON '
+             'lines otherwise')
+    filter_parser.add_argument('--flags', action='store_true',
+                               help='write true or false for every record')
+    filter_parser.add_argument(
+        '--strings', action='store_true',
+        help="keep CSV fields as strings, instead of reading numbers and "
+             "booleans")
+    filter_parser.add_argument('--workers', type=int, default=1,
+                               help='processes evaluating the records')
+    filter_parser.add_argument('--chunksize', type=int, default=1024,
+                               help='records sent to a worker at once')
+    args = parser.parse_args(argv)
+
+    if stdin is None:
+        stdin = open(sys.stdin.fileno(), encoding='utf-8', newline='',
+                     buffering=BUFFER_SIZE, closefd=False)
+    out = stdout or open(sys.stdout.fileno(), 'w', encoding='utf-8',
+                         newline='', buffering=BUFFER_SIZE, closefd=False)
+    try:
+        return run_filter(args, stdin, out)
+    finally:
+        out.flush()
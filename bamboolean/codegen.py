@@ -0,0 +1,95 @@
+import math
+from typing import Any, Callable, Dict, Generator, List, NoReturn
+
+from . import tokens as tok
+from .exceptions import BambooleanRuntimeError
+from .ast import AST, BinOp, UnaryOp, Constraint, TokenBasedAST, \
+    chain_operands
+from .node_visitor import NodeVisitor
+
+python_rel_ops: Dict[str, str] = {
+    tok.EQ: '==',
+    tok.NE: '!=',
+    tok.LT: '<',
+    tok.LTE: '<=',
+    tok.GT: '>',
+    tok.GTE: '>=',
+}
+
+PREDICATE_TEMPLATE = '''\
+def predicate(table):
+    get = table.get
+    return {expr}
+'''
+
+
+class PythonCodeGenerator(NodeVisitor):
+    """Translate the tree into an equivalent Python expression.
+
+    Generated code reads variables from a symbol table with upper-cased keys
+    through `get`, e.g. `x > 42 AND y` becomes
+    `((get('X', '') > 42) and get('Y', ''))`.
+    """
+    def __init__(self, tree: AST) -> None:
+        self.tree = tree
+
+    def generate(self) -> str:
+        return self.visit(self.tree)
+
+    def error(self, extra='') -> NoReturn:
+        raise BambooleanRuntimeError(
+            "Code generation error occured. {extra}".format(extra=extra))
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, str, str]:
+        operands: List[str] = []
+        for operand in chain_operands(node):
+            operands.append((yield operand))
+        op_type = node.op.type
+        if op_type == tok.AND:
+            return '({})'.format(' and '.join(operands))
+        elif op_type == tok.OR:
+            return 'bool({})'.format(' or '.join(operands))
+        else:
+            self.error("Could not generate binary operator")
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Generator[AST, str, str]:
+        if node.op.type == tok.NOT:
+            return '(not {})'.format((yield node.right))
+        else:
+            self.error("Could not generate unary operator")
+
+    def visit_Constraint(self, node: Constraint) -> str:
+        op = python_rel_ops[node.rel_op.type]
+        var, value = self.visit(node.var), self.visit(node.value)
+        return f'({var} {op} {value})'
+
+    def visit_Var(self, node: TokenBasedAST) -> str:
+        return 'get({!r}, {!r})'.format(node.value, '')
+
+    def _constant(self, node: TokenBasedAST) -> str:
+        value = node.value
+        if isinstance(value, float) and not math.isfinite(value):
+            return 'float({!r})'.format(str(value))
+        return repr(value)
+
+    visit_Num = visit_Bool = visit_String = _constant
+
+    def visit_NoOp(self, node) -> str:
+        return 'True'  # no expression should evaluate to true
+
+
+def generate_source(tree: AST) -> str:
+    """Source of a `predicate(table)` function evaluating the tree"""
+    return PREDICATE_TEMPLATE.format(expr=PythonCodeGenerator(tree).generate())
+
+
+def compile_predicate(tree: AST) -> Callable[[dict], Any]:
+    """Compile the tree into a native Python function.
+
+    The function takes a symbol table with upper-cased keys and returns the
+    same value `Interpreter` would.
+    """
+    namespace: Dict[str, Any] = {}
+    code = compile(generate_source(tree), '<bamboolean>', 'exec')
+    exec(code, namespace)
+    return namespace['predicate']
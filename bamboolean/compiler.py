@@ -0,0 +1,314 @@
+from functools import partial
+from typing import Any, Callable, Dict, Generator, Iterable, List, \
+    Mapping, NoReturn, Optional, Sequence, Tuple
+
+from . import tokens as tok
+from .exceptions import BambooleanRuntimeError
+from .ast import AST, BinOp, UnaryOp, Constraint, TokenBasedAST, \
+    chain_operands
+from .node_visitor import NodeVisitor
+from .codegen import compile_predicate
+from .bytecode import compile_program, run
+from .interpreter import evaluation_order
+from .lazy import LazyTable, SymbolTable, lazy_table
+from .walkers import VarsExtractor
+
+Predicate = Callable[[dict], Any]
+
+# closures nested deeper would approach the default recursion limit
+MAX_CLOSURE_DEPTH = 200
+
+
+def _make_eq(name: str, value: Any) -> Predicate:
+    return lambda table: table.get(name, '') == value
+
+
+def _make_ne(name: str, value: Any) -> Predicate:
+    return lambda table: table.get(name, '') != value
+
+
+def _make_lt(name: str, value: Any) -> Predicate:
+    return lambda table: table.get(name, '') < value
+
+
+def _make_lte(name: str, value: Any) -> Predicate:
+    return lambda table: table.get(name, '') <= value
+
+
+def _make_gt(name: str, value: Any) -> Predicate:
+    return lambda table: table.get(name, '') > value
+
+
+def _make_gte(name: str, value: Any) -> Predicate:
+    return lambda table: table.get(name, '') >= value
+
+
+constraint_factories: Dict[str, Callable[[str, Any], Predicate]] = {
+    tok.EQ: _make_eq,
+    tok.NE: _make_ne,
+    tok.LT: _make_lt,
+    tok.LTE: _make_lte,
+    tok.GT: _make_gt,
+    tok.GTE: _make_gte,
+}
+
+
+def _make_and(operands: Sequence[Predicate]) -> Predicate:
+    if len(operands) == 2:
+        left, right = operands
+        return lambda table: left(table) and right(table)
+
+    def evaluate(table: dict) -> Any:
+        for operand in operands:
+            value = operand(table)
+            if not value:
+                return value
+        return value
+    return evaluate
+
+
+def _make_or(operands: Sequence[Predicate]) -> Predicate:
+    if len(operands) == 2:
+        left, right = operands
+        return lambda table: bool(left(table) or right(table))
+
+    def evaluate(table: dict) -> bool:
+        for operand in operands:
+            if operand(table):
+                return True
+        return False
+    return evaluate
+
+
+def closure_depth(tree: AST) -> int:
+    """Nesting of the closures of the tree: of its chains, NOTs and leaves"""
+    deepest = 0
+    stack: List[Tuple[AST, int]] = [(tree, 1)]
+    while stack:
+        node, depth = stack.pop()
+        deepest = max(deepest, depth)
+        if isinstance(node, BinOp):
+            stack.extend((operand, depth + 1)
+                         for operand in chain_operands(node))
+        elif isinstance(node, UnaryOp):
+            stack.append((node.right, depth + 1))
+    return deepest
+
+
+def _make_walk(tree: AST, leaves: Dict[int, Predicate]) -> Predicate:
+    def evaluate(table: dict) -> Any:
+        walk = evaluation_order(tree)
+        try:
+            leaf = next(walk)
+            while True:
+                leaf = walk.send(leaves[id(leaf)](table))
+        except StopIteration as stop:
+            return stop.value
+    return evaluate
+
+
+class ExprCompiler(NodeVisitor):
+    """Compile the tree into a tree of pre-bound closures.
+
+    Every closure takes a symbol table with upper-cased keys and gives the
+    same result as `Interpreter` would, without any visitor dispatch.
+    Chains of the same binary operator are flattened into a single closure.
+    Trees nesting closures deeper than MAX_CLOSURE_DEPTH compile only
+    their leaves, evaluated with `evaluation_order` as by `Interpreter`.
+    """
+    def __init__(self, tree: AST) -> None:
+        self.tree = tree
+
+    def compile(self) -> Predicate:
+        if closure_depth(self.tree) > MAX_CLOSURE_DEPTH:
+            return self.compile_walk()
+        return self.visit(self.tree)
+
+    def compile_walk(self) -> Predicate:
+        leaves: Dict[int, Predicate] = {}
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, BinOp):
+                stack.extend((node.left, node.right))
+            elif isinstance(node, UnaryOp):
+                stack.append(node.right)
+            else:
+                leaves[id(node)] = self.visit(node)
+        return _make_walk(self.tree, leaves)
+
+    def error(self, extra='') -> NoReturn:
+        raise BambooleanRuntimeError(
+            "Compilation error occured. {extra}".format(extra=extra))
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, Any, Predicate]:
+        operands: List[Predicate] = []
+        for operand in chain_operands(node):
+            operands.append((yield operand))
+        op_type = node.op.type
+        if op_type == tok.AND:
+            return _make_and(tuple(operands))
+        elif op_type == tok.OR:
+            return _make_or(tuple(operands))
+        else:
+            self.error("Could not compile binary operator")
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Generator[AST, Any, Predicate]:
+        if node.op.type == tok.NOT:
+            right = yield node.right
+            return lambda table: not right(table)
+        else:
+            self.error("Could not compile unary operator")
+
+    def visit_Constraint(self, node: Constraint) -> Predicate:
+        factory = constraint_factories[node.rel_op.type]
+        return factory(str(node.var.value), node.value.value)
+
+    def visit_Var(self, node: TokenBasedAST) -> Predicate:
+        name = node.value
+        return lambda table: table.get(name, '')
+
+    def _constant(self, node: TokenBasedAST) -> Predicate:
+        value = node.value
+        return lambda table: value
+
+    visit_Num = visit_Bool = visit_String = _constant
+
+    def visit_NoOp(self, node) -> Predicate:
+        return lambda table: True  # no expression should evaluate to true
+
+
+def compile_closures(tree: AST) -> Predicate:
+    return ExprCompiler(tree).compile()
+
+
+def compile_python(tree: AST) -> Predicate:
+    try:
+        return compile_predicate(tree)
+    except (SyntaxError, RecursionError, MemoryError):
+        # CPython can not compile very deeply nested expressions
+        return compile_closures(tree)
+
+
+def compile_bytecode(tree: AST) -> Predicate:
+    return partial(run, compile_program(tree))
+
+
+backends: Dict[str, Callable[[AST], Predicate]] = {
+    'closure': compile_closures,
+    'python': compile_python,
+    'bytecode': compile_bytecode,
+}
+
+
+class VarsLookup:
+    """Symbol table of only the variables `names` (upper-cased) of a record.
+
+    A variable is looked up under its upper- and lower-case spelling; only
+    variables found under neither are searched for among all the keys of
+    the record. Reading records holding the variables thus costs as many
+    lookups as there are variables, however wide the record.
+
+    A record spelling a variable in several ways gives the value of its
+    upper-case key, else of its lower-case key, else of the last key equal
+    to it when upper-cased. This differs from `Interpreter`, which folds
+    all the keys so that the last one always wins: `{'X': 2, 'x': 1}`
+    gives 2 here, but 1 to `Interpreter`.
+    """
+    __slots__ = ('names', 'keys')
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = tuple(names)
+        self.keys = tuple((name, name.lower()) for name in self.names)
+
+    def __call__(self, record: Mapping[str, Any]) -> dict:
+        table = {}
+        missing = []
+        for upper, lower in self.keys:
+            if upper in record:
+                table[upper] = record[upper]
+            elif lower in record:
+                table[upper] = record[lower]
+            else:
+                missing.append(upper)
+        if missing:
+            wanted = frozenset(missing)
+            for key, value in record.items():
+                name = key.upper()
+                if name in wanted:
+                    table[name] = value
+        return table
+
+
+PositionalPredicate = Callable[[Sequence[Any]], Any]
+
+
+class CompiledExpression:
+    """Expression parsed and compiled once, ready to be evaluated many times.
+
+    `backend` chooses how the tree is compiled: 'closure' builds a tree of
+    pre-bound closures, 'python' generates native Python code and
+    'bytecode' lowers it to a flat program run by a stack VM.
+    Instances are immutable and can be shared freely, e.g. between threads.
+
+    Variables of the expression, in `variables`, are resolved when it is
+    compiled, so evaluating reads only them from the record, see VarsLookup
+    for records spelling a variable in several ways, and `positional`
+    evaluates rows of values without any keys.
+    """
+    __slots__ = ('text', 'tree', 'backend', 'variables', '_predicate',
+                 '_lookup')
+
+    text: str
+    tree: AST
+    backend: str
+    variables: Tuple[str, ...]
+    _predicate: Predicate
+    _lookup: VarsLookup
+
+    def __init__(self, text: str, tree: AST, backend: str = 'closure') -> None:
+        try:
+            compile_tree = backends[backend]
+        except KeyError:
+            raise ValueError("Unknown backend: {}".format(backend)) from None
+        object.__setattr__(self, 'text', text)
+        object.__setattr__(self, 'tree', tree)
+        object.__setattr__(self, 'backend', backend)
+        object.__setattr__(self, '_predicate', compile_tree(tree))
+        variables = tuple(sorted(VarsExtractor(tree).extract()))
+        object.__setattr__(self, 'variables', variables)
+        object.__setattr__(self, '_lookup', VarsLookup(variables))
+
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise AttributeError("CompiledExpression is immutable")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError("CompiledExpression is immutable")
+
+    def evaluate(self, symbol_table: SymbolTable) -> bool:
+        if callable(symbol_table):
+            return self._predicate(LazyTable({}, symbol_table))
+        return self._predicate(lazy_table(self._lookup(symbol_table)))
+
+    def positional(self, names: Optional[Sequence[str]] = None
+                   ) -> PositionalPredicate:
+        """Predicate of rows of values in the order of `names`.
+
+        Names are case-insensitive, by default those of `variables`. Only
+        values of the variables of the expression are read from a row, and
+        variables not in `names` are missing. Values may be Lazy.
+        """
+        order = self.variables if names is None \
+            else [name.upper() for name in names]
+        wanted = frozenset(self.variables)
+        slots = tuple({name: position for position, name in enumerate(order)
+                       if name in wanted}.items())
+        predicate = self._predicate
+
+        def evaluate(values: Sequence[Any]) -> Any:
+            return predicate(lazy_table({name: values[position]
+                                         for name, position in slots}))
+        return evaluate
+
+    def __repr__(self) -> str:
+        return 'CompiledExpression({!r})'.format(self.text)
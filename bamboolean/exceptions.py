@@ -1,12 +1,24 @@
+from typing import Optional
+
+
 class BambooleanError(Exception):
     pass
 
 
-class BambooleanLexerError(BambooleanError):
+class BambooleanSyntaxError(BambooleanError):
+    """Error in the expression text, located by line and column"""
+    def __init__(self, message: str, line: Optional[int] = None,
+                 column: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+
+class BambooleanLexerError(BambooleanSyntaxError):
     pass
 
 
-class BambooleanParserError(BambooleanError):
+class BambooleanParserError(BambooleanSyntaxError):
     pass
 
 
@@ -14,5 +26,9 @@ class BambooleanRuntimeError(BambooleanError):
     pass
 
 
+class BambooleanSerializationError(BambooleanError):
+    """Data which is not in, or not in this version of, the binary format"""
+
+
 class NoSuchVisitorException(BambooleanError):
     pass
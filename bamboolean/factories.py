@@ -1,9 +1,48 @@
-from typing import Set
+from typing import Any, Mapping, Optional, Set, TextIO
 from .ast import AST
 from .lexer import Lexer
 from .parser import Parser
 from .interpreter import Interpreter
-from .walkers import VarsExtractor, ExprNormalizer
+from .lazy import SymbolTable
+from .compiler import CompiledExpression
+from .adaptive import AdaptiveExpression
+from .profiling import Profile, timed_parse
+from .vectorized import CHUNK_BYTES, VectorizedEvaluator, \
+    evaluate_npy as _evaluate_npy
+from .cache import LRUCache
+from .walkers import VarsExtractor, ExprNormalizer, ExprOptimizer, \
+    partial_evaluate
+
+_cache: Optional[LRUCache] = None
+
+
+def enable_cache(maxsize: int = 1024) -> LRUCache:
+    """Cache parsed and compiled expressions, keyed on the expression text.
+
+    Cached trees are shared between callers and must not be modified.
+    Calling it again resizes the existing cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = LRUCache(maxsize)
+    else:
+        _cache.resize(maxsize)
+    return _cache
+
+
+def disable_cache() -> None:
+    global _cache
+    _cache = None
+
+
+def get_cache() -> Optional[LRUCache]:
+    return _cache
+
+
+def set_cache(cache: Optional[LRUCache]) -> None:
+    """Use `cache`, e.g. one saved with `get_cache`, or none"""
+    global _cache
+    _cache = cache
 
 
 def ParserFactory(text: str) -> Parser:
@@ -11,23 +50,100 @@ def ParserFactory(text: str) -> Parser:
     return Parser(lexer)
 
 
-def InterpreterFactory(text: str, symbol_table: dict) -> Interpreter:
-    parser = ParserFactory(text)
-    tree = parser.parse()
-    return Interpreter(tree, symbol_table)
+def InterpreterFactory(text: str, symbol_table: SymbolTable) -> Interpreter:
+    return Interpreter(parse(text), symbol_table)
 
 
-def interpret(text: str, symbol_table: dict) -> bool:
+def interpret(text: str, symbol_table: SymbolTable) -> bool:
     return InterpreterFactory(text, symbol_table).interpret()
 
 
-def parse(text: str) -> AST:
+def _parse(text: str) -> AST:
     return ParserFactory(text).parse()
 
 
+def parse(text: str) -> AST:
+    cache = _cache
+    if cache is None:
+        return _parse(text)
+    return cache.get_or_create(('parse', text), lambda: _parse(text))
+
+
+def parse_stream(stream: TextIO) -> AST:
+    """Parse expression read lazily from a file-like object"""
+    return Parser(Lexer(stream)).parse()
+
+
 def extract_vars(text: str) -> Set[str]:
     return VarsExtractor(parse(text)).extract()
 
 
 def normalize(text: str) -> str:
     return ExprNormalizer(parse(text)).normalize().stringify()
+
+
+def optimize(text: str) -> str:
+    return ExprOptimizer(parse(text)).optimize().stringify()
+
+
+def compile(text: str, backend: str = 'closure') -> CompiledExpression:
+    cache = _cache
+    if cache is None:
+        return CompiledExpression(text, parse(text), backend)
+    return cache.get_or_create(
+        ('compile', backend, text),
+        lambda: CompiledExpression(text, parse(text), backend),
+    )
+
+
+def specialize(text: str, known_vars: Mapping[str, Any],
+               backend: str = 'closure') -> CompiledExpression:
+    """Compile the residual expression with `known_vars` substituted.
+
+    Variables known ahead, e.g. of a tenant, are evaluated once, and the
+    residual expression is then evaluated against records holding the
+    other variables. Specialized expressions are never cached.
+    """
+    residual = partial_evaluate(parse(text), known_vars)
+    return CompiledExpression(residual.stringify(), residual, backend)
+
+
+def compile_adaptive(text: str, sample_every: int = 16,
+                     reorder_every: int = 64) -> AdaptiveExpression:
+    """Compile expression reordering its chains by sampled statistics.
+
+    Adaptive expressions hold their statistics and are never cached.
+    """
+    return AdaptiveExpression(text, parse(text), sample_every, reorder_every)
+
+
+def profile(text: str) -> Profile:
+    """Parse expression timing the lexer and parser, for profiled evaluation.
+
+    Evaluate records with `Profile.evaluate`, then export the statistics
+    with `to_dict`, `to_json` or `collapsed`. Profiles are never cached.
+    """
+    tree, lexing, parsing = timed_parse(text)
+    return Profile(text, tree, lexing, parsing)
+
+
+def evaluate_columns(text: str, columns: Any,
+                     size: Optional[int] = None) -> Any:
+    """Boolean NumPy mask of rows of the columns matching the expression.
+
+    `columns` maps variable names to arrays of equal length, or is a
+    structured array. `size` gives the number of rows when the expression
+    uses none of the columns. Requires numpy.
+    """
+    return VectorizedEvaluator(parse(text), columns, size).evaluate()
+
+
+def evaluate_npy(text: str, source: str, chunk_bytes: int = CHUNK_BYTES,
+                 out: Any = None) -> Any:
+    """Boolean NumPy mask of rows of memory-mapped `.npy` columns.
+
+    `source` is a directory of `<name>.npy` column files or a single
+    `.npy` file; only columns used by the expression are opened, and rows
+    are evaluated in chunks of about `chunk_bytes`. Requires numpy.
+    """
+    return _evaluate_npy(parse(text), source, chunk_bytes, out)
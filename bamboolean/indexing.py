@@ -0,0 +1,238 @@
+"""Indexes selecting rules which may match a record"""
+from bisect import bisect_left
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, \
+    MutableMapping, Optional, Sequence, Set, Tuple
+
+from . import tokens as tok
+from .ast import AST, BinOp, Constraint, Num, chain_operands
+
+# truth of `value <op> threshold` for thresholds below, equal to and above
+# the value
+interval_truths: Dict[str, Tuple[bool, bool, bool]] = {
+    tok.LT: (False, False, True),
+    tok.LTE: (False, True, True),
+    tok.GT: (True, False, False),
+    tok.GTE: (True, True, False),
+    tok.EQ: (False, True, False),
+    tok.NE: (True, False, True),
+}
+
+NUMERIC_TYPES = (int, float, bool)
+
+
+def conjuncts(tree: AST) -> List[AST]:
+    """Operands which all must be true for the tree to be true"""
+    if isinstance(tree, BinOp) and tree.op.type == tok.AND:
+        return chain_operands(tree)
+    return [tree]
+
+
+def required_equalities(tree: AST) -> List[Tuple[str, Any]]:
+    """(variable, literal) pairs of `var == literal` required by the tree"""
+    return [
+        (str(node.var.value), node.value.value)
+        for node in conjuncts(tree)
+        if isinstance(node, Constraint) and node.rel_op.type == tok.EQ
+    ]
+
+
+def required_comparisons(tree: AST) -> List[Tuple[str, str, Any]]:
+    """(variable, operator, number) of numeric comparisons required by tree"""
+    return [
+        (str(node.var.value), node.rel_op.type, node.value.value)
+        for node in conjuncts(tree)
+        if isinstance(node, Constraint) and isinstance(node.value, Num)
+        and node.rel_op.type in interval_truths
+        and node.rel_op.type != tok.NE
+    ]
+
+
+class EqualityIndex:
+    """Inverted index from (variable, literal) pairs to rules requiring them.
+
+    Every rule with at least one required equality is indexed under its
+    most selective one, i.e. the pair shared by the fewest rules. Other
+    rules are always candidates. Dict lookup uses the same `==` as the
+    interpreter, so `x == 1` is found for records with x equal to 1, 1.0
+    or True.
+    """
+    def __init__(self, trees: Sequence[AST]) -> None:
+        self.by_var: Dict[str, Dict[Any, List[int]]] = {}
+        self.unindexed: List[int] = []
+
+        required = [required_equalities(tree) for tree in trees]
+        counts: Dict[Tuple[str, Any], int] = {}
+        for pairs in required:
+            for pair in set(pairs):
+                counts[pair] = counts.get(pair, 0) + 1
+
+        for position, pairs in enumerate(required):
+            if not pairs:
+                self.unindexed.append(position)
+                continue
+            var, literal = min(pairs, key=lambda pair: counts[pair])
+            by_literal = self.by_var.setdefault(var, {})
+            by_literal.setdefault(literal, []).append(position)
+
+    def candidates(self, table: dict) -> List[int]:
+        """Sorted positions of rules which may match the record.
+
+        `table` is the record with upper-cased keys.
+        """
+        found = set(self.unindexed)
+        self.collect(table, found)
+        return sorted(found)
+
+    def collect(self, table: dict, found: Set[int]) -> None:
+        """Add positions of indexed rules found for the record"""
+        for var, by_literal in self.by_var.items():
+            try:
+                positions = by_literal.get(table.get(var, ''))
+            except TypeError:  # unhashable values are never equal literals
+                continue
+            if positions:
+                found.update(positions)
+
+
+class VariableIntervals:
+    """Numeric constraints on a single variable settled by one bisect.
+
+    Thresholds are kept sorted, and for every relational operator the
+    constraints are ordered by their threshold, so the constraints true for
+    a value form at most three slices of that order. A constraint is
+    identified by an integer: a leaf or a rule position.
+    """
+    __slots__ = ('var', 'thresholds', 'groups', 'ids')
+
+    def __init__(self, var: str,
+                 constraints: Sequence[Tuple[str, Any, int]]) -> None:
+        self.var = var
+        self.thresholds = sorted({value for _, value, _ in constraints})
+        self.ids = [id_ for _, _, id_ in constraints]
+        self.groups: List[Tuple[List[int], List[int],
+                                Tuple[bool, bool, bool]]] = []
+        for op_type, truths in interval_truths.items():
+            ordered = sorted(
+                (bisect_left(self.thresholds, value), id_)
+                for op, value, id_ in constraints if op == op_type)
+            if not ordered:
+                continue
+            positions = [position for position, _ in ordered]
+            # starts[i]: number of constraints with threshold below the i-th
+            starts = [bisect_left(positions, i)
+                      for i in range(len(self.thresholds) + 1)]
+            self.groups.append(([id_ for _, id_ in ordered], starts,
+                                truths))
+
+    def _bounds(self, table: dict) -> Optional[Tuple[int, int]]:
+        """Numbers of thresholds below and not above the value"""
+        value = table.get(self.var, '')
+        if type(value) not in NUMERIC_TYPES or value != value:  # NaN
+            return None
+        thresholds = self.thresholds
+        low = bisect_left(thresholds, value)
+        if low < len(thresholds) and thresholds[low] == value:
+            return low, low + 1
+        return low, low
+
+    def settle(self, table: dict, values: MutableMapping[int, Any]) -> bool:
+        """Store values of all constraints, unless the value isn't numeric"""
+        bounds = self._bounds(table)
+        if bounds is None:
+            return False
+        low, high = bounds
+        update, fromkeys = values.update, dict.fromkeys
+        for ids, starts, (below, equal, above) in self.groups:
+            first, last = starts[low], starts[high]
+            update(fromkeys(ids[:first], below))
+            if first != last:
+                update(fromkeys(ids[first:last], equal))
+            update(fromkeys(ids[last:], above))
+        return True
+
+    def collect(self, table: dict, found: Set[int]) -> None:
+        """Add constraints true for the value, or all if it isn't numeric"""
+        bounds = self._bounds(table)
+        if bounds is None:
+            found.update(self.ids)
+            return
+        low, high = bounds
+        for ids, starts, (below, equal, above) in self.groups:
+            first, last = starts[low], starts[high]
+            if below:
+                found.update(ids[:first])
+            if equal:
+                found.update(ids[first:last])
+            if above:
+                found.update(ids[last:])
+
+
+class IntervalIndex:
+    """Numeric constraints of shared leaves, grouped by variable.
+
+    `leaf_index` maps keys made by `ruleset.leaf_key` to leaf indexes.
+    """
+    def __init__(self, leaf_index: Mapping[Hashable, int]) -> None:
+        constraints: Dict[str, List[Tuple[str, Any, int]]] = {}
+        for key, index in leaf_index.items():
+            if not isinstance(key, tuple) or len(key) != 4:
+                continue  # not a constraint
+            var, op_type, value_type, value = key
+            if op_type in interval_truths \
+                    and value_type in (tok.INTEGER, tok.FLOAT):
+                constraints.setdefault(var, []).append(
+                    (op_type, value, index))
+
+        self.by_leaf: Dict[int, VariableIntervals] = {}
+        for var, var_constraints in constraints.items():
+            intervals = VariableIntervals(var, var_constraints)
+            for _, _, index in var_constraints:
+                self.by_leaf[index] = intervals
+
+
+class RangeIndex:
+    """Rules indexed by a required numeric comparison, like `x >= 17`.
+
+    Rules at `positions` requiring a comparison of a variable with a
+    number are candidates only when the comparison holds. Each rule is
+    indexed under the comparison true for the smallest share of thresholds
+    used with its variable, which stand in for the distribution of values.
+    A non-numeric value of the variable makes all of its rules candidates,
+    so they are evaluated, and fail, just as without the index.
+    """
+    def __init__(self, trees: Sequence[AST],
+                 positions: Iterable[int]) -> None:
+        required = {position: required_comparisons(trees[position])
+                    for position in positions}
+        thresholds: Dict[str, List[Any]] = {}
+        for comparisons in required.values():
+            for var, _, value in comparisons:
+                thresholds.setdefault(var, []).append(value)
+        for values in thresholds.values():
+            values.sort()
+
+        def selectivity(comparison: Tuple[str, str, Any]) -> float:
+            var, op_type, value = comparison
+            values = thresholds[var]
+            below = bisect_left(values, value) / len(values)
+            if op_type in (tok.GT, tok.GTE):
+                return 1 - below
+            if op_type in (tok.LT, tok.LTE):
+                return below
+            return 0  # equality
+
+        constraints: Dict[str, List[Tuple[str, Any, int]]] = {}
+        self.unindexed: List[int] = []
+        for position, comparisons in required.items():
+            if not comparisons:
+                self.unindexed.append(position)
+                continue
+            var, op_type, value = min(comparisons, key=selectivity)
+            constraints.setdefault(var, []).append((op_type, value, position))
+        self.by_var = {var: VariableIntervals(var, var_constraints)
+                       for var, var_constraints in constraints.items()}
+
+    def collect(self, table: dict, found: Set[int]) -> None:
+        """Add positions of indexed rules found for the record"""
+        for intervals in self.by_var.values():
+            intervals.collect(table, found)
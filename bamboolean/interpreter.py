@@ -1,40 +1,137 @@
 from numbers import Number
-from typing import Any, NoReturn
+from typing import Any, Callable, Dict, Generator, List, NoReturn, Tuple
 import operator as built_in_op
 
 from . import tokens as tok
 from .exceptions import BambooleanRuntimeError
-from .ast import AST, TokenBasedAST
+from .ast import AST, TokenBasedAST, BinOp, UnaryOp
+from .lazy import Lazy, LazyTable, SymbolTable, lazy_table
 from .node_visitor import NodeVisitor
 
 
+rel_ops: Dict[str, Callable[[Any, Any], bool]] = {
+    tok.NE: built_in_op.ne,
+    tok.EQ: built_in_op.eq,
+    tok.LT: built_in_op.lt,
+    tok.LTE: built_in_op.le,
+    tok.GT: built_in_op.gt,
+    tok.GTE: built_in_op.ge,
+}
+
+
+def symbol_table_of(source: SymbolTable) -> dict:
+    """Symbol table with upper-cased keys of a mapping or a lazy resolver"""
+    if callable(source):
+        return LazyTable({}, source)
+    return lazy_table({k.upper(): v for k, v in source.items()})
+
+
+def evaluation_order(node: Any) -> Generator[AST, Any, Any]:
+    """Short-circuiting walk of the boolean operators of the tree.
+
+    Yields the leaves in the order of evaluation and is sent their values;
+    returns the value of the tree. Operators are kept on an explicit stack,
+    so the depth of the tree is not limited by the recursion limit.
+    """
+    stack: List[Tuple[Any, bool]] = []  # (operator, right side visited)
+    while True:
+        while True:
+            node_type = type(node)
+            if node_type is BinOp:
+                stack.append((node, False))
+                node = node.left
+            elif node_type is UnaryOp:
+                stack.append((node, False))
+                node = node.right
+            else:
+                break
+        value = yield node
+
+        while stack:
+            parent, right_visited = stack.pop()
+            op_type = parent.op.type
+            if type(parent) is UnaryOp:
+                if op_type != tok.NOT:
+                    raise BambooleanRuntimeError(
+                        "Runtime error occured. "
+                        "Could not evaluate unary operator")
+                value = not value
+            elif right_visited:
+                if op_type == tok.OR:
+                    value = bool(value)
+            elif op_type == tok.AND:
+                if value:
+                    stack.append((parent, True))
+                    node = parent.right
+                    break
+            elif op_type == tok.OR:
+                if value:
+                    value = True
+                else:
+                    stack.append((parent, True))
+                    node = parent.right
+                    break
+            else:
+                raise BambooleanRuntimeError(
+                    "Runtime error occured. "
+                    "Could not evaluate binary operator")
+        else:
+            return value
+
+
 class Interpreter(NodeVisitor):
-    def __init__(self, tree: AST, symbol_table: dict) -> None:
+    """Evaluation of the tree against a symbol table.
+
+    Lazy values are computed by `visit_Var` when it reads them, so the
+    symbol table is only folded, and never scanned for them, however
+    wide the record.
+    """
+    def __init__(self, tree: AST, symbol_table: SymbolTable) -> None:
         self.tree = tree
-        self.symbol_table = {k.upper(): v for k, v in symbol_table.items()}
+        if callable(symbol_table):
+            self.symbol_table: dict = LazyTable({}, symbol_table)
+        else:
+            self.symbol_table = {k.upper(): v
+                                 for k, v in symbol_table.items()}
 
     def interpret(self) -> bool:
         if not self.tree:
             return False
-        return self.visit(self.tree)
+        return self._evaluate(self.tree)
+
+    def _evaluate(self, node: Any) -> Any:
+        """Evaluate the tree with `evaluation_order`.
+
+        Same as `visit`, but boolean operators are handled inline instead
+        of through visitor generators, which is considerably faster.
+        Leaves are still evaluated by their `visit_` methods.
+        """
+        walk = evaluation_order(node)
+        visit = self.visit
+        try:
+            leaf = next(walk)
+            while True:
+                leaf = walk.send(visit(leaf))
+        except StopIteration as stop:
+            return stop.value
 
     def error(self, extra='') -> NoReturn:
         raise BambooleanRuntimeError(
             "Runtime error occured. {extra}".format(extra=extra))
 
-    def visit_BinOp(self, node) -> bool:
+    def visit_BinOp(self, node) -> Generator[AST, Any, Any]:
         op_type = node.op.type
         if op_type == tok.AND:
-            return self.visit(node.left) and self.visit(node.right)
+            return (yield node.left) and (yield node.right)
         elif op_type == tok.OR:
-            return bool(self.visit(node.left) or self.visit(node.right))
+            return bool((yield node.left) or (yield node.right))
         else:
             self.error("Could not evaluate binary operator")
 
-    def visit_UnaryOp(self, node) -> bool:
+    def visit_UnaryOp(self, node) -> Generator[AST, Any, bool]:
         op_type = node.op.type
         if op_type == tok.NOT:
-            return not self.visit(node.right)
+            return not (yield node.right)
         else:
             self.error("Could not evaluate unary operator")
 
@@ -45,29 +142,23 @@ class Interpreter(NodeVisitor):
 
     @staticmethod
     def _handle_rel_op(op_type: str, val1, val2) -> bool:
-        mapping = {
-            'NE': built_in_op.ne,
-            'EQ': built_in_op.eq,
-            'LT': built_in_op.lt,
-            'LTE': built_in_op.le,
-            'GT': built_in_op.gt,
-            'GTE': built_in_op.ge,
-        }
-        op = mapping[op_type]
-        return op(val1, val2)
+        return rel_ops[op_type](val1, val2)
 
     def visit_Var(self, node: TokenBasedAST) -> Any:
-        var_name = node.value
-        return self.symbol_table.get(var_name, '')
+        var_name = node.token.value
+        value = self.symbol_table.get(var_name, '')
+        if type(value) is Lazy:
+            value = self.symbol_table[var_name] = value.func()
+        return value
 
     def visit_Num(self, node) -> Number:
-        return node.value
+        return node.token.value
 
     def visit_Bool(self, node) -> bool:
-        return node.value
+        return node.token.value
 
     def visit_String(self, node) -> str:
-        return node.value
+        return node.token.value
 
     def visit_NoOp(self, node) -> bool:
         return True  # no expression should evaluate to true
@@ -0,0 +1,96 @@
+"""Variables computed only when the evaluation reaches them.
+
+A value of the symbol table may be `Lazy(func)`, and the symbol table
+itself may be a resolver: a callable taking an upper-cased variable name,
+and raising KeyError for missing variables. Either is called at most once
+per variable and evaluation, and not at all when short-circuiting skips
+the variable:
+
+    interpret("cheap AND score > 0.5",
+              {'cheap': False, 'score': Lazy(compute_score)})
+"""
+from typing import Any, Callable, Mapping, Optional, Union
+
+Resolver = Callable[[str], Any]
+SymbolTable = Union[Mapping[str, Any], Resolver]
+
+_UNSET = object()
+_ABSENT = object()  # memoized KeyError of the resolver
+
+
+class Lazy:
+    """Value of a variable computed by `func` when it is first needed"""
+    __slots__ = ('func',)
+
+    def __init__(self, func: Callable[[], Any]) -> None:
+        self.func = func
+
+    def __repr__(self) -> str:
+        return 'Lazy({!r})'.format(self.func)
+
+
+class LazyTable(dict):
+    """Symbol table computing Lazy values and values of `resolver` on `get`.
+
+    Computed values replace the Lazy ones, so each is computed at most once
+    for the lifetime of the table, i.e. of a single evaluation.
+    """
+    __slots__ = ('resolver',)
+
+    def __init__(self, table: Mapping[str, Any],
+                 resolver: Optional[Resolver] = None) -> None:
+        super().__init__(table)
+        self.resolver = resolver
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = dict.get(self, name, _UNSET)
+        if type(value) is Lazy:
+            value = self[name] = value.func()
+        elif value is _UNSET:
+            if self.resolver is None:
+                return default
+            try:
+                value = self.resolver(name)
+            except KeyError:
+                value = _ABSENT
+            self[name] = value
+        return default if value is _ABSENT else value
+
+
+class NotComputed(Exception):
+    """Read of a value of a ComputedView which is not computed yet"""
+
+
+class ComputedView(dict):
+    """Values of a LazyTable computed so far, computing no others.
+
+    Reading a Lazy value, or a value the resolver was not called for yet,
+    raises NotComputed instead.
+    """
+    __slots__ = ('table',)
+
+    def __init__(self, table: LazyTable) -> None:
+        super().__init__()
+        self.table = table
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = dict.get(self.table, name, _UNSET)
+        if type(value) is Lazy or (
+                value is _UNSET and self.table.resolver is not None):
+            raise NotComputed(name)
+        return default if value is _UNSET or value is _ABSENT else value
+
+
+def computed_view(table: dict) -> dict:
+    """ComputedView of a LazyTable, other tables have nothing to compute"""
+    if type(table) is LazyTable:
+        return ComputedView(table)
+    return table
+
+
+def lazy_table(table: dict) -> dict:
+    """`table`, or a LazyTable of it when it holds Lazy values"""
+    for value in table.values():
+        if type(value) is Lazy:
+            return LazyTable(table)
+    return table
@@ -1,126 +1,172 @@
 import re
-from functools import reduce
-from collections import OrderedDict
-from typing import NoReturn, Optional, Dict, Callable
+from sys import intern
+from typing import Iterator, NoReturn, Optional, TextIO, Union
 
 from .exceptions import BambooleanLexerError
 from . import tokens as tok
 
+CHUNK_SIZE = 64 * 1024
+# characters past a match needed to be sure the token is complete, e.g. '3.1'
+LOOKAHEAD = 2
 
-class Lexer:
-    def __init__(self, text: str) -> None:
-        self.text = text
-        self.position = 0
-        self.current_char = self.text[self.position] if self.text else None
 
-    def error(self) -> NoReturn:
-        raise BambooleanLexerError(
-            ("Error tokenizing input on character: "
-             "{} and position: {}.\nExpr: {}".format(
-                 self.current_char, self.position, self.text))
-        )
+def _operators_regex() -> str:
+    operators = sorted(tok.tokens_map, key=len, reverse=True)
+    return '|'.join(re.escape(operator) for operator in operators)
 
-    def _is_eof(self, pos: int) -> bool:
-        return pos > len(self.text) - 1
 
-    def next(self) -> None:
-        """
-        Set pointer to next character
-        """
-        self.position += 1
-        is_eof = self._is_eof(self.position)
-        self.current_char = self.text[self.position] if not is_eof else None
+token_regex = re.compile(r'''
+    (?P<WHITESPACE>\s*)
+    (?:
+        (?P<STRING>["'](?P<STRING_BODY>[^"']*)["']?)
+      | (?P<ID>[_a-zA-Z][\w/]*)
+      | (?P<NUMBER>\d+(?P<FRACTION>\.\d+)?)
+      | (?P<OPERATOR>{operators})
+    )?
+'''.format(operators=_operators_regex()), re.VERBOSE)
 
-    def peek(self) -> Optional[str]:
-        """
-        Check what next char will be without advancing position
-        """
-        peek_pos = self.position + 1
-        return self.text[peek_pos] if not self._is_eof(peek_pos) else None
 
-    def id(self) -> tok.Token:
-        """
-        Handle identifiers and reserved keywords
-        """
-        result = ''
-        while self.current_char is not None and \
-                re.match(r'[\w/]', self.current_char):
-            result += self.current_char
-            self.next()
-        result = result.upper()
-        token = tok.RESERVED_KEYWORDS.get(result, tok.Token(tok.ID, result))
-        return token
-
-    def skip_whitespace(self) -> None:
-        while self.current_char is not None and self.current_char.isspace():
-            self.next()
-
-    @staticmethod
-    def _is_quotation_mark(char: str) -> bool:
-        return char == "'" or char == '"'
-
-    def string(self) -> tok.Token:
-        self.next()  # skip opening quotation mark
-        result = ''
-        while self.current_char is not None and \
-                not self._is_quotation_mark(self.current_char):
-            result += self.current_char
-            self.next()
-        self.next()  # omit closing quote
-        return tok.Token(tok.STRING, result)
-
-    def number(self) -> tok.Token:
-        result = str(self._integer())
-        if self.current_char == '.':
-            self.next()
-            result += '.' + str(self._integer())
-            return tok.Token(tok.FLOAT, float(result))
+class Lexer:
+    """Tokenizer scanning the input with a single precompiled regex.
+
+    The source is either the expression text or a file-like object, which
+    is read lazily in chunks, so huge expressions are tokenized in bounded
+    memory. Position of the last returned token is kept in `token_line`
+    and `token_column` (both counted from 1).
+    """
+    def __init__(self, source: Union[str, TextIO],
+                 chunk_size: int = CHUNK_SIZE) -> None:
+        self._stream: Optional[TextIO]
+        if isinstance(source, str):
+            self.text: Optional[str] = source
+            self._stream = None
+            self._buffer = source
+            self._eof = True
         else:
-            return tok.Token(tok.INTEGER, int(result))
-
-    def _integer(self) -> int:
-        result = ''
-        while self.current_char is not None and \
-                self.current_char.isdigit():
-            result += self.current_char
-            self.next()
-        return int(result)
-
-    def skip_n_chars(self, n: int) -> None:
-        for i in range(n):
-            self.next()
-
-    def is_token_equal(self, expected: str) -> bool:
-        return expected == reduce(
-            lambda actual, _: actual + str(self.peek()),
-            range(len(expected)-1),
-            str(self.current_char),
+            self.text = None
+            self._stream = source
+            self._buffer = ''
+            self._eof = False
+        self._chunk_size = chunk_size
+        self._buffer_start = 0  # position of the buffer in the whole input
+        self._pos = 0  # position in the buffer
+        self._line = 1
+        self._line_start = 0
+        self._token_start = 0
+        self._token_line = 1
+        self._token_line_start = 0
+
+    @property
+    def position(self) -> int:
+        return self._buffer_start + self._pos
+
+    @property
+    def line(self) -> int:
+        return self._line
+
+    @property
+    def column(self) -> int:
+        return self.position - self._line_start + 1
+
+    @property
+    def token_line(self) -> int:
+        return self._token_line
+
+    @property
+    def token_column(self) -> int:
+        return self._token_start - self._token_line_start + 1
+
+    @property
+    def current_char(self) -> Optional[str]:
+        if self._pos >= len(self._buffer) and not self._eof:
+            self._fill()
+        is_eof = self._pos >= len(self._buffer)
+        return self._buffer[self._pos] if not is_eof else None
+
+    def error(self) -> NoReturn:
+        expr = '\nExpr: {}'.format(self.text) if self.text is not None else ''
+        raise BambooleanLexerError(
+            ("Error tokenizing input on character: "
+             "{} and position: {} (line {}, column {}).{}".format(
+                 self.current_char, self.position, self.line, self.column,
+                 expr)),
+            line=self.line,
+            column=self.column,
         )
 
+    def _fill(self) -> None:
+        """Drop consumed input and read the next chunk of the stream"""
+        assert self._stream is not None
+        size = max(self._chunk_size, len(self._buffer) - self._pos)
+        chunk = self._stream.read(size)
+        if not chunk:
+            self._eof = True
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._buffer_start += self._pos
+        self._pos = 0
+
+    def _match(self) -> 're.Match[str]':
+        while True:
+            match = token_regex.match(self._buffer, self._pos)
+            assert match is not None  # every part of the regex is optional
+            if self._eof or len(self._buffer) - match.end() >= LOOKAHEAD:
+                return match
+            # the token may continue in the next chunk
+            self._fill()
+
+    def _advance(self, end: int) -> None:
+        buffer, start = self._buffer, self._pos
+        newlines = buffer.count('\n', start, end)
+        if newlines:
+            self._line += newlines
+            self._line_start = \
+                self._buffer_start + buffer.rindex('\n', start, end) + 1
+        self._pos = end
+
     def get_next_token(self) -> tok.Token:
         """
         Lexical analyzer (tokenizer). Breaks sentence apart into tokens
         """
-        regex_map: Dict[str, Callable[[], tok.Token]] = OrderedDict((
-            (r'("|\')', self.string),
-            (r'[_a-zA-Z]', self.id),
-            (r'\d', self.number),
-        ))
-
-        while self.current_char is not None:
-            if self.current_char.isspace():
-                self.skip_whitespace()
-                continue
-
-            for regex, func in regex_map.items():
-                if re.match(regex, self.current_char):
-                    return func()
-
-            for expected_val, token in tok.tokens_map.items():
-                if self.is_token_equal(expected_val):
-                    self.skip_n_chars(len(expected_val))
-                    return token
-
-            self.error()
-
-        return tok.Token(tok.EOF, None)
+        match = self._match()
+        token_start = match.end('WHITESPACE')
+        if token_start != self._pos:
+            self._advance(token_start)
+        kind = match.lastgroup
+
+        if kind is None or kind == 'WHITESPACE':
+            if self._pos < len(self._buffer):
+                self.error()
+            self._mark_token()
+            return tok.EOF_TOKEN
+
+        self._mark_token()
+        if kind == 'ID':
+            self._pos = match.end()
+            name = match.group(kind).upper()
+            keyword = tok.RESERVED_KEYWORDS.get(name)
+            return keyword or tok.Token(tok.ID, intern(name))
+        if kind == 'OPERATOR':
+            self._pos = match.end()
+            return tok.tokens_map[match.group(kind)]
+        if kind == 'STRING':
+            self._advance(match.end())
+            return tok.Token(tok.STRING, intern(match.group('STRING_BODY')))
+        self._pos = match.end()
+        if match.group('FRACTION'):
+            return tok.Token(tok.FLOAT, float(match.group(kind)))
+        return tok.Token(tok.INTEGER, int(match.group(kind)))
+
+    def _mark_token(self) -> None:
+        self._token_start = self._buffer_start + self._pos
+        self._token_line = self._line
+        self._token_line_start = self._line_start
+
+    def tokens(self) -> Iterator[tok.Token]:
+        """Lazily generate tokens, up to and including EOF"""
+        while True:
+            token = self.get_next_token()
+            yield token
+            if token.type == tok.EOF:
+                return
+
+    __iter__ = tokens
@@ -1,4 +1,5 @@
-from typing import Any
+from types import GeneratorType
+from typing import Any, List
 from .exceptions import NoSuchVisitorException
 
 
@@ -10,8 +11,44 @@ class NodeVisitor:
     Example:
         class name: Node
         method: visit_Node()
+
+    A visit method either returns its result, or is a generator which
+    yields child nodes and receives results of visiting them:
+
+        def visit_BinOp(self, node):
+            left = yield node.left
+            right = yield node.right
+            return left + right
+
+    Generators are driven with an explicit stack, so the depth of the tree
+    is not limited by the Python recursion limit. A generator may also be
+    yielded instead of a node; it is then run as a nested visit.
     """
     def visit(self, node) -> Any:
+        result = self._dispatch(node)
+        if not isinstance(result, GeneratorType):
+            return result
+
+        stack: List[Any] = [result]
+        value = None
+        while stack:
+            try:
+                child = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            result = self._dispatch(child)
+            if isinstance(result, GeneratorType):
+                stack.append(result)
+                value = None
+            else:
+                value = result
+        return value
+
+    def _dispatch(self, node) -> Any:
+        if isinstance(node, GeneratorType):
+            return node
         method_name = 'visit_' + type(node).__name__
         visitor = getattr(self, method_name, self.generic_visit)
         return visitor(node)
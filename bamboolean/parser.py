@@ -1,17 +1,31 @@
-from typing import NoReturn, Dict, Type, Union, Callable
+from functools import partial
+from typing import NoReturn, Dict, Type, Union, Iterable, Optional, List
 from .exceptions import BambooleanParserError
 from .lexer import Lexer
 from . import ast
 from . import tokens as tok
 
 
-ParseNodeT = Callable[[], ast.AST]
+# binding power of binary operators, all of them are left-associative
+binary_precedence: Dict[str, int] = {
+    tok.OR: 1,
+    tok.AND: 2,
+}
 
 
 class Parser:
-    def __init__(self, lexer: Lexer) -> None:
-        self.lexer = lexer
-        self.current_token = self.lexer.get_next_token()
+    """Parser of the Bamboolean grammar.
+
+    Tokens are pulled one by one, either from a `Lexer` or from any
+    iterable of tokens ending with EOF, so the whole expression text never
+    has to be kept in memory.
+    """
+    def __init__(self, lexer: Union[Lexer, Iterable[tok.Token]]) -> None:
+        self.lexer: Optional[Lexer] = \
+            lexer if isinstance(lexer, Lexer) else None
+        # a stream without trailing EOF token behaves as if it had one
+        self._next_token = partial(next, iter(lexer), tok.EOF_TOKEN)
+        self.current_token = self._next_token()
 
     def parse(self) -> ast.AST:
         node = self.compound_expr()
@@ -20,13 +34,24 @@ class Parser:
         return node
 
     def error(self, extra='') -> NoReturn:
+        line = column = None
+        location = expr = ''
+        if self.lexer is not None:
+            line, column = self.lexer.token_line, self.lexer.token_column
+            location = ' Line {}, column {}.'.format(line, column)
+            if self.lexer.text is not None:
+                expr = '\nExpression: {}'.format(self.lexer.text)
         raise BambooleanParserError(
             ('Invalid syntax on: token {type}, val {val}. '
-             '{extra}.\nExpression: {expr}'
+             '{extra}.{location}{expr}'
              ).format(type=self.current_token.type,
                       val=self.current_token.value,
                       extra=extra,
-                      expr=self.lexer.text))
+                      location=location,
+                      expr=expr),
+            line=line,
+            column=column,
+        )
 
     def consume(self, token_type) -> None:
         """
@@ -34,7 +59,7 @@ class Parser:
         consume current and get next token
         """
         if self.current_token.type == token_type:
-            self.current_token = self.lexer.get_next_token()
+            self.current_token = self._next_token()
         else:
             self.error("Expected: {}".format(token_type))
 
@@ -49,45 +74,67 @@ class Parser:
 
     def expr(self) -> ast.AST:
         """
-        expr: simple_expr (OR simple_expr)*
-        """
-        return self._parse_bin_op(self.simple_expr, tok.OR)
-
-    def simple_expr(self) -> ast.AST:
-        """
-        simple_expr: term (AND term)*
-        """
-        return self._parse_bin_op(self.term, tok.AND)
-
-    def _parse_bin_op(self, node_func: ParseNodeT, token_type) -> ast.AST:
-        node = node_func()
-
-        while self.current_token.type == token_type:
+        expr        : simple_expr (OR simple_expr)*
+        simple_expr : term (AND term)*
+        term        : statement
+                    | LPAREN expr RPAREN
+                    | NOT term
+
+        Parsed with explicit operand and operator stacks instead of
+        recursion, so nesting depth is not limited by the recursion limit.
+        """
+        operands: List[ast.AST] = []
+        operators: List[tok.Token] = []  # NOT, AND, OR and LPAREN
+        depth = 0  # number of open parentheses
+
+        def reduce() -> None:
+            op = operators.pop()
+            right = operands.pop()
+            if tok.is_unary_op(op.type):
+                operands.append(ast.UnaryOp(op=op, right=right))
+            else:
+                left = operands.pop()
+                operands.append(ast.BinOp(left=left, op=op, right=right))
+
+        while True:
+            # prefix of a term: any number of NOT and LPAREN
             token = self.current_token
-            self.consume(token_type)
-            node = ast.BinOp(left=node, op=token, right=node_func())
+            while token.type == tok.LPAREN or tok.is_unary_op(token.type):
+                depth += token.type == tok.LPAREN
+                operators.append(token)
+                self.consume(token.type)
+                token = self.current_token
+
+            operands.append(self.statement())
+
+            # suffix of a term: apply pending NOTs and close parentheses
+            while True:
+                while operators and tok.is_unary_op(operators[-1].type):
+                    reduce()
+                if depth and self.current_token.type == tok.RPAREN:
+                    while operators[-1].type != tok.LPAREN:
+                        reduce()
+                    operators.pop()
+                    depth -= 1
+                    self.consume(tok.RPAREN)
+                else:
+                    break
 
-        return node
+            token = self.current_token
+            precedence = binary_precedence.get(token.type)
+            if precedence is None:
+                break
+            while operators and \
+                    binary_precedence.get(operators[-1].type, 0) >= precedence:
+                reduce()
+            operators.append(token)
+            self.consume(token.type)
 
-    def _parse_unary_op(self, node_func: ParseNodeT) -> ast.AST:
-        token = self.current_token
-        self.consume(token.type)
-        return ast.UnaryOp(op=token, right=node_func())
-
-    def term(self) -> ast.AST:
-        """
-        term : statement
-             | LPAREN expr RPAREN
-             | NOT term
-        """
-        if self.current_token.type == tok.LPAREN:
-            self.consume(tok.LPAREN)
-            node = self.expr()
-            self.consume(tok.RPAREN)
-            return node
-        if tok.is_unary_op(self.current_token.type):
-            return self._parse_unary_op(self.term)
-        return self.statement()
+        if depth:
+            self.consume(tok.RPAREN)  # reports missing parenthesis
+        while operators:
+            reduce()
+        return operands[0]
 
     def statement(self) -> Union[ast.ASTValueType, ast.Var, ast.Constraint]:
         """
@@ -0,0 +1,174 @@
+"""Opt-in instrumentation of parsing and evaluation.
+
+Profiled evaluation runs through `ProfilingInterpreter`, a separate code
+path, so `Interpreter` and compiled expressions carry no instrumentation.
+"""
+import json
+from time import perf_counter
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from . import tokens as tok
+from .ast import AST, BinOp, UnaryOp, chain_operands
+from .interpreter import Interpreter
+from .lazy import SymbolTable
+from .lexer import Lexer
+from .parser import Parser
+
+
+class TimedLexer(Lexer):
+    """Lexer accumulating the time spent tokenizing in `elapsed`"""
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.elapsed = 0.0
+
+    def get_next_token(self) -> tok.Token:
+        start = perf_counter()
+        try:
+            return super().get_next_token()
+        finally:
+            self.elapsed += perf_counter() - start
+
+
+def timed_parse(text: str) -> Tuple[AST, float, float]:
+    """Parse text, giving the tree and seconds spent lexing and parsing"""
+    lexer = TimedLexer(text)
+    start = perf_counter()
+    tree = Parser(lexer).parse()
+    total = perf_counter() - start
+    return tree, lexer.elapsed, total - lexer.elapsed
+
+
+def node_label(node: AST) -> str:
+    if isinstance(node, (BinOp, UnaryOp)):
+        return str(node.op.type)
+    return node.stringify()
+
+
+class NodeStats:
+    """Counters of a single node, `elapsed` includes its children"""
+    __slots__ = ('label', 'parent', 'calls', 'true', 'false', 'skipped',
+                 'elapsed')
+
+    def __init__(self, label: str, parent: Optional[int]) -> None:
+        self.label = label
+        self.parent = parent
+        self.calls = 0
+        self.true = 0
+        self.false = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profile:
+    """Statistics of parsing and evaluations of one expression.
+
+    Nodes are numbered in the order they are first reached, the root is 0.
+    AND/OR chains are a single node with an operand per child, and the
+    operands a chain short-circuits past are counted as `skipped`. Calls
+    which raise are counted, but neither their outcome nor their time.
+    """
+    def __init__(self, text: str, tree: AST, lexing: float = 0.0,
+                 parsing: float = 0.0) -> None:
+        self.text = text
+        self.tree = tree
+        self.lexing = lexing
+        self.parsing = parsing
+        self.evaluations = 0
+        self.nodes: List[NodeStats] = [NodeStats(node_label(tree), None)]
+        self._children: Dict[Tuple[int, int], int] = {}
+
+    def child(self, parent: int, position: int, node: AST) -> int:
+        """Number of the child of a node at the given position"""
+        key = (parent, position)
+        index = self._children.get(key)
+        if index is None:
+            index = self._children[key] = len(self.nodes)
+            self.nodes.append(NodeStats(node_label(node), parent))
+        return index
+
+    def evaluate(self, symbol_table: SymbolTable) -> Any:
+        self.evaluations += 1
+        return ProfilingInterpreter(self.tree, symbol_table, self).interpret()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'text': self.text,
+            'lexing': self.lexing,
+            'parsing': self.parsing,
+            'evaluations': self.evaluations,
+            'nodes': [stats.to_dict() for stats in self.nodes],
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def collapsed(self, root: str = 'expr') -> str:
+        """Self time in microseconds per stack, as read by flamegraph.pl"""
+        own = [stats.elapsed for stats in self.nodes]
+        for stats in self.nodes:
+            if stats.parent is not None:
+                own[stats.parent] -= stats.elapsed
+
+        stacks: List[str] = []
+        lines = [(root + ';lex', self.lexing), (root + ';parse', self.parsing)]
+        for index, stats in enumerate(self.nodes):
+            label = stats.label.replace(';', ',').replace('\n', ' ')
+            parent = stats.parent
+            stack = root + ';eval' if parent is None else stacks[parent]
+            stacks.append(stack + ';' + label)
+            lines.append((stacks[index], own[index]))
+        return ''.join('{} {}\n'.format(stack, round(seconds * 1e6))
+                       for stack, seconds in lines if seconds > 0)
+
+    def __repr__(self) -> str:
+        return 'Profile({!r})'.format(self.text)
+
+
+class ProfilingInterpreter(Interpreter):
+    """Interpreter recording counts and time of every node in a Profile"""
+    def __init__(self, tree: AST, symbol_table: SymbolTable,
+                 profile: Profile) -> None:
+        super().__init__(tree, symbol_table)
+        self.profile = profile
+
+    def _evaluate(self, node: Any) -> Any:
+        return self.visit(self._profiled(node, 0))
+
+    def _profiled(self, node: AST, index: int) -> Generator[Any, Any, Any]:
+        profile = self.profile
+        stats = profile.nodes[index]
+        stats.calls += 1
+        start = perf_counter()
+        if isinstance(node, BinOp):
+            op_type = node.op.type
+            if op_type not in (tok.AND, tok.OR):
+                self.error("Could not evaluate binary operator")
+            conjunction = op_type == tok.AND
+            operands = chain_operands(node)
+            for position, operand in enumerate(operands):
+                child = profile.child(index, position, operand)
+                value = yield self._profiled(operand, child)
+                if bool(value) != conjunction:
+                    for skipped in range(position + 1, len(operands)):
+                        profile.nodes[profile.child(
+                            index, skipped, operands[skipped])].skipped += 1
+                    break
+            if not conjunction:
+                value = bool(value)
+        elif isinstance(node, UnaryOp):
+            if node.op.type != tok.NOT:
+                self.error("Could not evaluate unary operator")
+            operand = node.right
+            value = not (yield self._profiled(
+                operand, profile.child(index, 0, operand)))
+        else:
+            value = self.visit(node)
+        stats.elapsed += perf_counter() - start
+        if value:
+            stats.true += 1
+        else:
+            stats.false += 1
+        return value
@@ -0,0 +1,183 @@
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, \
+    Tuple, Union
+
+from .ast import AST, Constraint, TokenBasedAST
+from .compiler import ExprCompiler, Predicate
+from .factories import parse
+from .indexing import EqualityIndex, IntervalIndex, RangeIndex, \
+    VariableIntervals
+from .interpreter import symbol_table_of
+from .lazy import SymbolTable
+
+RulesT = Union[Mapping[Hashable, str], Iterable[Tuple[Hashable, str]]]
+
+
+def leaf_key(node: AST) -> Hashable:
+    """Key identifying equal leaves, it keeps 1, 1.0 and true apart"""
+    if isinstance(node, Constraint):
+        value = node.value.token
+        return (node.var.value, node.rel_op.type, value.type, value.value)
+    if isinstance(node, TokenBasedAST):
+        return (node.token.type, node.token.value)
+    raise TypeError("Not a leaf: {!r}".format(node))
+
+
+class LeafValues(dict):
+    """Values of shared leaves for a single record, computed on first use.
+
+    Numeric constraints found in `intervals` are settled together with all
+    the other constraints on the same variable.
+    """
+    __slots__ = ('table', 'leaves', 'intervals')
+
+    def __init__(self, table: dict, leaves: List[Predicate],
+                 intervals: Optional[Dict[int, VariableIntervals]] = None
+                 ) -> None:
+        super().__init__()
+        self.table = table
+        self.leaves = leaves
+        self.intervals = intervals or {}
+
+    def __missing__(self, index: int) -> Any:
+        intervals = self.intervals.get(index)
+        if intervals is not None and intervals.settle(self.table, self):
+            return self[index]
+        value = self[index] = self.leaves[index](self.table)
+        return value
+
+
+class SharedLeafCompiler(ExprCompiler):
+    """Compile a rule reading its constraints and variables from LeafValues.
+
+    Leaves are registered in the shared `leaves` table, so equal leaves of
+    different rules are evaluated at most once per record.
+    """
+    def __init__(self, tree: AST, leaves: List[Predicate],
+                 leaf_index: Dict[Hashable, int]) -> None:
+        super().__init__(tree)
+        self.leaves = leaves
+        self.leaf_index = leaf_index
+
+    def _shared(self, node: AST) -> Predicate:
+        key = leaf_key(node)
+        index = self.leaf_index.get(key)
+        if index is None:
+            index = self.leaf_index[key] = len(self.leaves)
+            self.leaves.append(ExprCompiler(node).compile())
+        return lambda values: values[index]
+
+    visit_Constraint = visit_Var = _shared
+
+
+class RuleSet:
+    """Set of rules matched together against records.
+
+    Identical constraints and variables are shared between rules and
+    evaluated at most once per record, so the cost of matching grows with
+    the number of distinct constraints rather than with the number of rules.
+
+    With `index` enabled, only candidate rules are evaluated: rules
+    requiring `var == literal` are looked up in an EqualityIndex, and rules
+    requiring a numeric comparison in a RangeIndex. Numeric constraints on
+    a variable are then settled at once by an IntervalIndex. Records for
+    which some rules raise may skip those rules instead.
+    """
+    def __init__(self, rules: RulesT = (), index: bool = True) -> None:
+        self.leaves: List[Predicate] = []
+        self.leaf_index: Dict[Hashable, int] = {}
+        self.rules: List[Tuple[Hashable, Predicate]] = []
+        self.trees: Dict[Hashable, AST] = {}
+        self.index = index
+        self._equality_index: Optional[EqualityIndex] = None
+        self._range_index: Optional[RangeIndex] = None
+        self._interval_index: Optional[IntervalIndex] = None
+        items = rules.items() if isinstance(rules, Mapping) else rules
+        for rule_id, text in items:
+            self.add(rule_id, text)
+
+    @classmethod
+    def from_trees(cls, trees: Union[Mapping[Hashable, AST],
+                                     Iterable[Tuple[Hashable, AST]]],
+                   index: bool = True) -> 'RuleSet':
+        """Rule set of parsed rules, e.g. loaded with `serialization.load`"""
+        rule_set = cls(index=index)
+        items = trees.items() if isinstance(trees, Mapping) else trees
+        for rule_id, tree in items:
+            rule_set.add_tree(rule_id, tree)
+        return rule_set
+
+    def add(self, rule_id: Hashable, text: str) -> None:
+        self.add_tree(rule_id, parse(text))
+
+    def add_tree(self, rule_id: Hashable, tree: AST) -> None:
+        if rule_id in self.trees:
+            raise ValueError("Duplicated rule id: {!r}".format(rule_id))
+        compiler = SharedLeafCompiler(tree, self.leaves, self.leaf_index)
+        self.rules.append((rule_id, compiler.compile()))
+        self.trees[rule_id] = tree
+        self._equality_index = None
+        self._range_index = None
+        self._interval_index = None
+
+    @property
+    def equality_index(self) -> EqualityIndex:
+        """Index of the current rules, rebuilt lazily after adding rules"""
+        if self._equality_index is None:
+            self._equality_index = EqualityIndex(list(self.trees.values()))
+        return self._equality_index
+
+    @property
+    def range_index(self) -> RangeIndex:
+        """Index of rules not found in the equality index"""
+        if self._range_index is None:
+            self._range_index = RangeIndex(list(self.trees.values()),
+                                           self.equality_index.unindexed)
+        return self._range_index
+
+    @property
+    def interval_index(self) -> IntervalIndex:
+        """Index of the current leaves, rebuilt lazily after adding rules"""
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(self.leaf_index)
+        return self._interval_index
+
+    def match(self, symbol_table: SymbolTable) -> List[Hashable]:
+        """Ids of rules matching the record, in order of adding them.
+
+        Lazy values of variables looked up in the indexes are computed
+        even if no candidate rule needs them.
+        """
+        table = symbol_table_of(symbol_table)
+        rules = self.rules
+        if not self.index:
+            values = LeafValues(table, self.leaves)
+            return [rule_id for rule_id, rule in rules if rule(values)]
+
+        candidates = self.candidates(table)
+        # settling every numeric constraint of a variable pays off only when
+        # a good part of the rules is evaluated
+        intervals = None
+        if 4 * len(candidates) >= len(rules):
+            intervals = self.interval_index.by_leaf
+        values = LeafValues(table, self.leaves, intervals)
+        return [
+            rules[position][0]
+            for position in candidates
+            if rules[position][1](values)
+        ]
+
+    def candidates(self, table: dict) -> List[int]:
+        """Sorted positions of rules which may match the record.
+
+        `table` is the record with upper-cased keys.
+        """
+        equality_index, range_index = self.equality_index, self.range_index
+        if not equality_index.by_var and not range_index.by_var:
+            return range_index.unindexed
+        found = set(range_index.unindexed)
+        equality_index.collect(table, found)
+        range_index.collect(table, found)
+        return sorted(found)
+
+    def __len__(self) -> int:
+        return len(self.rules)
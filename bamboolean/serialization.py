@@ -0,0 +1,363 @@
+"""Versioned binary format of parsed rules and their bytecode.
+
+A file holds rules keyed by id (strings or integers), each both as its
+tree and as a bytecode program, so loading skips lexing and parsing:
+
+    header      magic b'BMBL', format version, sizes of the sections
+    tables      JSON: rule ids, constants, variable names and opcodes
+    offsets     int32 start of every tree and program, and their ends
+    trees       int32 postfix (node, argument) pairs
+    programs    int32 bytecode, indexing the shared tables
+
+Integers are little-endian. Loaded from a file, the data is memory-mapped
+and programs run directly on views of it, without copying; trees are
+decoded on first access. Files written with another format version, or
+by a library with different opcodes, are rejected with
+BambooleanSerializationError.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from sys import intern
+from typing import Any, BinaryIO, Dict, Generator, Hashable, Iterable, \
+    Iterator, List, Optional, Tuple, Union
+
+from . import tokens as tok
+from .ast import AST, BinOp, Bool, Constraint, NoOp, Num, String, \
+    TokenBasedAST, UnaryOp, Var
+from .bytecode import LOAD_CONST, LOAD_VAR, Program, compile_program, \
+    opnames, run
+from .exceptions import BambooleanSerializationError
+from .interpreter import symbol_table_of
+from .lazy import SymbolTable
+from .node_visitor import NodeVisitor
+from .ruleset import RuleSet
+
+MAGIC = b'BMBL'
+# bumped on every change of the layout or of the node codes
+FORMAT_VERSION = 1
+
+# magic, format version, flags (unused), bytes of tables, rules, words of
+# trees and of programs
+HEADER = struct.Struct('<4sHHIIII')
+WORD = 4
+
+# nodes of the trees, in postfix order
+NODE_VAR = 1
+NODE_CONST = 2
+NODE_CONSTRAINT = 3
+NODE_AND = 4
+NODE_OR = 5
+NODE_NOT = 6
+NODE_NOOP = 7
+
+REL_OPS = (tok.EQ, tok.NE, tok.LT, tok.LTE, tok.GT, tok.GTE)
+rel_op_codes = {op: code for code, op in enumerate(REL_OPS)}
+rel_op_tokens = [tok.abstract_tokens_map[op] for op in REL_OPS]
+AND_TOKEN = tok.RESERVED_KEYWORDS['AND']
+OR_TOKEN = tok.RESERVED_KEYWORDS['OR']
+
+RulesT = Union[RuleSet, Mapping, Iterable[Tuple[Hashable, AST]]]
+
+
+def opcodes() -> Dict[str, int]:
+    return {name: code for code, name in opnames.items()}
+
+
+class Tables:
+    """Constants and variable names shared by all rules of a file"""
+    def __init__(self) -> None:
+        self.consts: List[Any] = []
+        self.names: List[str] = []
+        self._const_index: Dict[Tuple[type, Any], int] = {}
+        self._name_index: Dict[str, int] = {}
+
+    def const(self, value: Any) -> int:
+        if type(value) not in (bool, int, float, str):
+            raise BambooleanSerializationError(
+                "Unsupported constant: {!r}".format(value))
+        key = (type(value), value)  # keep 1, 1.0 and True apart
+        if key not in self._const_index:
+            self._const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return self._const_index[key]
+
+    def name(self, name: str) -> int:
+        if name not in self._name_index:
+            self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self._name_index[name]
+
+
+class TreeEncoder(NodeVisitor):
+    """Append the tree as postfix (node, argument) pairs to `code`"""
+    def __init__(self, tables: Tables, code: 'array[int]') -> None:
+        self.tables = tables
+        self.code = code
+
+    def encode(self, tree: AST) -> None:
+        self.visit(tree)
+
+    def emit(self, node: int, arg: int = 0) -> None:
+        self.code.append(node)
+        self.code.append(arg)
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, Any, None]:
+        if node.op.type not in (tok.AND, tok.OR):
+            raise BambooleanSerializationError(
+                "Unsupported binary operator: {}".format(node.op.type))
+        yield node.left
+        yield node.right
+        self.emit(NODE_AND if node.op.type == tok.AND else NODE_OR)
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Generator[AST, Any, None]:
+        yield node.right
+        self.emit(NODE_NOT)
+
+    def visit_Constraint(self, node: Constraint) -> None:
+        self.visit(node.var)
+        self.visit(node.value)
+        self.emit(NODE_CONSTRAINT, rel_op_codes[node.rel_op.type])
+
+    def visit_Var(self, node: TokenBasedAST) -> None:
+        self.emit(NODE_VAR, self.tables.name(str(node.value)))
+
+    def _constant(self, node: TokenBasedAST) -> None:
+        self.emit(NODE_CONST, self.tables.const(node.value))
+
+    visit_Num = visit_Bool = visit_String = _constant
+
+    def visit_NoOp(self, node: NoOp) -> None:
+        self.emit(NODE_NOOP)
+
+
+def encode_program(tree: AST, tables: Tables, code: 'array[int]') -> None:
+    """Append bytecode of the tree, indexing the shared tables, to `code`.
+
+    Jump targets stay relative to the start of the program.
+    """
+    program = compile_program(tree)
+    start = len(code)
+    code.extend(array('i', program.code))
+    for pc in range(start, len(code), 2):
+        if code[pc] == LOAD_VAR:
+            code[pc + 1] = tables.name(program.names[code[pc + 1]])
+        elif code[pc] == LOAD_CONST:
+            code[pc + 1] = tables.const(program.consts[code[pc + 1]])
+
+
+def little_endian(words: 'array[int]') -> bytes:
+    if sys.byteorder != 'little':
+        words = array('i', words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def dumps(rules: RulesT) -> bytes:
+    """Rules, given as in `dump`, in the binary format"""
+    if isinstance(rules, RuleSet):
+        rules = rules.trees
+    items = rules.items() if isinstance(rules, Mapping) else rules
+    tables = Tables()
+    ids: List[Hashable] = []
+    seen = set()
+    tree_offsets, program_offsets = array('i'), array('i')
+    trees, programs = array('i'), array('i')
+    encoder = TreeEncoder(tables, trees)
+    for rule_id, tree in items:
+        if type(rule_id) not in (int, str):
+            raise BambooleanSerializationError(
+                "Rule ids must be strings or integers: {!r}".format(rule_id))
+        if rule_id in seen:
+            raise ValueError("Duplicated rule id: {!r}".format(rule_id))
+        seen.add(rule_id)
+        ids.append(rule_id)
+        tree_offsets.append(len(trees))
+        program_offsets.append(len(programs))
+        encoder.encode(tree)
+        encode_program(tree, tables, programs)
+    tree_offsets.append(len(trees))
+    program_offsets.append(len(programs))
+
+    encoded = json.dumps({
+        'ids': ids,
+        'consts': tables.consts,
+        'names': tables.names,
+        'opcodes': opcodes(),
+    }, separators=(',', ':')).encode('utf-8')
+    encoded += b' ' * (-len(encoded) % WORD)  # align the code to words
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(encoded), len(ids),
+                         len(trees), len(programs))
+    return b''.join([header, encoded, little_endian(tree_offsets),
+                     little_endian(program_offsets), little_endian(trees),
+                     little_endian(programs)])
+
+
+def dump(rules: RulesT, fp: BinaryIO) -> None:
+    """Write the rules to a binary file.
+
+    `rules` is a RuleSet, a mapping of rule ids to trees or an iterable of
+    (id, tree) pairs. Rule ids must be strings or integers.
+    """
+    fp.write(dumps(rules))
+
+
+class RuleArchive(Mapping):
+    """Rules read from the binary format: a mapping of rule ids to trees.
+
+    Trees are decoded on first access and kept; equal leaves of all the
+    trees are shared nodes. `program` gives the bytecode of a rule, its
+    code being a view of the loaded data.
+    """
+    def __init__(self, data: Any) -> None:
+        view = memoryview(data)
+        if view.nbytes < HEADER.size \
+                or bytes(view[:len(MAGIC)]) != MAGIC:
+            raise BambooleanSerializationError("Not a Bamboolean rule file")
+        (_, version, _, tables_size, count, tree_words,
+         program_words) = HEADER.unpack_from(view)
+        if version != FORMAT_VERSION:
+            raise BambooleanSerializationError(
+                "Unsupported format version {}, this library reads "
+                "version {}".format(version, FORMAT_VERSION))
+        start = HEADER.size + tables_size
+        words = 2 * (count + 1) + tree_words + program_words
+        if view.nbytes != start + words * WORD:
+            raise BambooleanSerializationError("Truncated rule file")
+        try:
+            tables = json.loads(bytes(view[HEADER.size:start]))
+            compiled_with = tables['opcodes']
+        except (ValueError, KeyError, TypeError) as error:
+            raise BambooleanSerializationError(
+                "Corrupted tables: {}".format(error)) from None
+        if compiled_with != opcodes():
+            raise BambooleanSerializationError(
+                "Rules were compiled with different opcodes, dump them "
+                "again with this version of the library")
+
+        self.ids: List[Hashable] = tables['ids']
+        self.positions = {rule_id: i for i, rule_id in enumerate(self.ids)}
+        self.consts: Tuple[Any, ...] = tuple(
+            intern(value) if type(value) is str else value
+            for value in tables['consts'])
+        self.names: Tuple[str, ...] = tuple(
+            intern(name) for name in tables['names'])
+        code: Any = view[start:].cast('i')
+        if sys.byteorder != 'little':
+            code = array('i', code)
+            code.byteswap()
+        self.tree_offsets = code[:count + 1]
+        self.program_offsets = code[count + 1:2 * (count + 1)]
+        self.trees = code[2 * (count + 1):2 * (count + 1) + tree_words]
+        self.programs = code[2 * (count + 1) + tree_words:]
+        self._decoded: Dict[Hashable, AST] = {}
+        # leaves shared by all the trees, created on first use
+        self._vars: List[Optional[AST]] = [None] * len(self.names)
+        self._consts: List[Optional[AST]] = [None] * len(self.consts)
+
+    def __getitem__(self, rule_id: Hashable) -> AST:
+        tree = self._decoded.get(rule_id)
+        if tree is None:
+            position = self.positions[rule_id]
+            tree = self._decoded[rule_id] = self.decode(
+                self.tree_offsets[position],
+                self.tree_offsets[position + 1])
+        return tree
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _var(self, arg: int) -> AST:
+        leaf = self._vars[arg] = Var(tok.Token(tok.ID, self.names[arg]))
+        return leaf
+
+    def _const(self, arg: int) -> AST:
+        value = self.consts[arg]
+        leaf: AST
+        if type(value) is bool:
+            leaf = Bool(tok.bool_token(value))
+        elif type(value) is int:
+            leaf = Num(tok.Token(tok.INTEGER, value))
+        elif type(value) is float:
+            leaf = Num(tok.Token(tok.FLOAT, value))
+        else:
+            leaf = String(tok.Token(tok.STRING, value))
+        self._consts[arg] = leaf
+        return leaf
+
+    def decode(self, start: int, end: int) -> AST:
+        """Tree of the postfix code between the offsets"""
+        words = self.trees[start:end].tolist()
+        variables, constants = self._vars, self._consts
+        stack: List[Any] = []
+        push, pop = stack.append, stack.pop
+        try:
+            for node, arg in zip(words[::2], words[1::2]):
+                if node == NODE_VAR:
+                    push(variables[arg] or self._var(arg))
+                elif node == NODE_CONST:
+                    push(constants[arg] or self._const(arg))
+                elif node == NODE_CONSTRAINT:
+                    value = pop()
+                    stack[-1] = Constraint(stack[-1], rel_op_tokens[arg],
+                                           value)
+                elif node == NODE_AND:
+                    right = pop()
+                    stack[-1] = BinOp(stack[-1], AND_TOKEN, right)
+                elif node == NODE_OR:
+                    right = pop()
+                    stack[-1] = BinOp(stack[-1], OR_TOKEN, right)
+                elif node == NODE_NOT:
+                    stack[-1] = UnaryOp(tok.NOT_TOKEN, stack[-1])
+                elif node == NODE_NOOP:
+                    push(NoOp())
+                else:
+                    raise BambooleanSerializationError(
+                        "Unknown node {}".format(node))
+            tree, = stack
+        except (IndexError, ValueError) as error:
+            raise BambooleanSerializationError(
+                "Corrupted tree: {}".format(error)) from None
+        return tree
+
+    def program(self, rule_id: Hashable) -> Program:
+        """Bytecode of the rule, run with `bytecode.run`"""
+        position = self.positions[rule_id]
+        start = self.program_offsets[position]
+        end = self.program_offsets[position + 1]
+        return Program(self.programs[start:end], self.consts, self.names)
+
+    def match(self, symbol_table: SymbolTable) -> List[Hashable]:
+        """Ids of rules matching the record, running their bytecode"""
+        table = symbol_table_of(symbol_table)
+        offsets, programs = self.program_offsets, self.programs
+        consts, names = self.consts, self.names
+        return [
+            rule_id for i, rule_id in enumerate(self.ids)
+            if run(Program(programs[offsets[i]:offsets[i + 1]], consts,
+                           names), table)
+        ]
+
+
+def loads(data: Any) -> RuleArchive:
+    """Rules of the binary format in a bytes-like object, without copying"""
+    return RuleArchive(data)
+
+
+def load(fp: BinaryIO) -> RuleArchive:
+    """Rules read from a binary file, memory-mapped when possible"""
+    try:
+        fileno = fp.fileno()
+    except (AttributeError, OSError):
+        return RuleArchive(fp.read())
+    try:
+        data: Any = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file
+        data = b''
+    return RuleArchive(data)
@@ -0,0 +1,76 @@
+"""Random expressions and symbol tables for differential tests"""
+import random
+from typing import Any, Callable, Dict
+
+ConstantFactory = Callable[[random.Random], str]
+
+VARIABLES = ('x', 'y', 'z', 'group/w')
+REL_OPS = ('==', '!=', '<', '<=', '>', '>=')
+CONSTANTS = ('0', '1', '42', '3.14', 'true', 'false', "''", "'yes'", '"no"')
+VALUES = (0, 1, 42, 3.14, -7, True, False, '', 'yes', 'no', None)
+
+
+def random_constant(rng: random.Random) -> str:
+    return rng.choice(CONSTANTS)
+
+
+def random_numeric_constant(rng: random.Random) -> str:
+    return rng.choice(('0', '1', '5', '10', '42', '3.14', '7.5'))
+
+
+def random_expression(rng: random.Random, depth: int = 4,
+                      constant: ConstantFactory = random_constant) -> str:
+    kind = rng.randrange(6) if depth > 0 else rng.randrange(3)
+    if kind == 0:
+        return constant(rng)
+    if kind == 1:
+        return rng.choice(VARIABLES)
+    if kind == 2:
+        return '{} {} {}'.format(
+            rng.choice(VARIABLES), rng.choice(REL_OPS), constant(rng))
+    if kind == 3:
+        return 'not {}'.format(random_expression(rng, depth - 1, constant))
+    if kind == 4:
+        return '({})'.format(random_expression(rng, depth - 1, constant))
+    return '{} {} {}'.format(
+        random_expression(rng, depth - 1, constant),
+        rng.choice(('and', 'or', 'AND', 'OR')),
+        random_expression(rng, depth - 1, constant),
+    )
+
+
+def random_comparison_chain(rng: random.Random, length: int = 4) -> str:
+    """Chain of comparisons mostly on the same variable, with constants"""
+    terms = []
+    for _ in range(length):
+        kind = rng.random()
+        if kind < 0.75:
+            terms.append('{} {} {}'.format(
+                rng.choice('xxy'), rng.choice(REL_OPS), random_constant(rng)))
+        elif kind < 0.85:
+            terms.append(rng.choice(('y', 'not y', 'z')))
+        else:
+            terms.append(random_constant(rng))
+    return rng.choice((' and ', ' or ')).join(terms)
+
+
+def random_symbol_table(rng: random.Random) -> Dict[str, Any]:
+    return {
+        rng.choice((name, name.upper())): rng.choice(VALUES)
+        for name in VARIABLES if rng.random() < 0.8
+    }
+
+
+def random_numeric_symbol_table(rng: random.Random) -> Dict[str, Any]:
+    return {
+        name: rng.choice((-1, 0, 1, 3, 5, 7, 7.5, 10, 11, 42, 100, 3.14))
+        for name in VARIABLES
+    }
+
+
+def outcome(func: Callable[[], Any]) -> Any:
+    """Value returned by func or the type of exception it raised"""
+    try:
+        return func()
+    except Exception as error:
+        return type(error)
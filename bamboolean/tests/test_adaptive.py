@@ -0,0 +1,125 @@
+import json
+import random
+import time
+import unittest
+
+from bamboolean.adaptive import AdaptiveExpression
+from bamboolean.factories import compile_adaptive, interpret, parse
+from .generators import outcome, random_expression, random_symbol_table
+
+
+class AdaptiveExpressionTestCase(unittest.TestCase):
+    def train(self, expression, records=200):
+        rng = random.Random(0)
+        for _ in range(records):
+            expression.evaluate({'x': rng.randrange(100),
+                                 'y': rng.randrange(100)})
+
+    def test_decisive_operand_moves_first(self):
+        expression = compile_adaptive('x >= 0 and x < 100 and y == 7',
+                                      sample_every=1, reorder_every=10)
+        self.assertEqual(expression.orders(), {'': [0, 1, 2]})
+        self.train(expression)
+        self.assertEqual(expression.orders()[''][0], 2)
+
+    def test_nested_chains(self):
+        expression = compile_adaptive(
+            'x >= 0 and (y > 1 or y == 1 or y < 1) and not (x < 0 or y == 7)',
+            sample_every=1, reorder_every=10)
+        self.assertEqual(set(expression.orders()), {'', '1', '2'})
+        self.train(expression)
+        orders = expression.orders()
+        self.assertEqual(orders['1'][0], 0)
+        self.assertEqual(orders[''][-1], 1)
+
+    def test_nothing_is_sampled_between_samples(self):
+        expression = compile_adaptive('x > 0 or y > 0', sample_every=10)
+        self.train(expression, records=25)
+        self.assertEqual(expression.samples, 2)
+        self.assertEqual(expression.chains[''].stats.evaluated, [2, 2])
+
+    def test_snapshot_roundtrip(self):
+        text = 'x >= 0 and x < 100 and y == 7'
+        expression = compile_adaptive(text, sample_every=1,
+                                      reorder_every=10)
+        self.train(expression)
+        snapshot = json.loads(json.dumps(expression.snapshot()))
+
+        restored = compile_adaptive(text)
+        restored.load_snapshot(snapshot)
+        self.assertEqual(restored.orders(), expression.orders())
+        self.assertEqual(restored.snapshot(), snapshot)
+        self.assertFalse(restored.evaluate({'x': 1, 'y': 6}))
+
+    def test_snapshot_of_other_expression(self):
+        snapshot = compile_adaptive('x and y').snapshot()
+        with self.assertRaises(ValueError):
+            compile_adaptive('x or y').load_snapshot(snapshot)
+        with self.assertRaises(ValueError):
+            compile_adaptive('x and y').load_snapshot(
+                dict(snapshot, version=0))
+        snapshot['chains']['']['order'] = [0, 0]
+        with self.assertRaises(ValueError):
+            compile_adaptive('x and y').load_snapshot(snapshot)
+
+    def test_invalid_sampling(self):
+        with self.assertRaises(ValueError):
+            compile_adaptive('x', sample_every=0)
+
+    def test_errors_are_not_reordered(self):
+        expression = compile_adaptive("x == 'a' or x > 1", sample_every=1,
+                                      reorder_every=1)
+        for value in (5, 0, 3):
+            expression.evaluate({'x': value})
+        self.assertEqual(expression.orders(), {'': [1, 0]})
+        self.assertTrue(expression.evaluate({'x': 'a'}))
+        expression.sample_every = 1000
+        self.assertTrue(expression.evaluate({'x': 'a'}))
+        with self.assertRaises(TypeError):
+            expression.evaluate({'x': 'b'})
+
+    def test_reordered_and_returns_other_operand(self):
+        expression = compile_adaptive('a and b', sample_every=1000)
+        self.assertEqual(expression.evaluate({'a': 1, 'b': 2}), 2)
+        self.assertEqual(expression.evaluate({'a': 0, 'b': ''}), 0)
+        expression.chains[''].set_order([1, 0])
+        self.assertEqual(expression.evaluate({'a': 1, 'b': 2}), 1)
+        self.assertEqual(expression.evaluate({'a': 0, 'b': ''}), '')
+        self.assertEqual(interpret('a and b', {'a': 1, 'b': 2}), 2)
+
+    def test_nested_chains_with_raising_leaf(self):
+        depth = 12
+        text = 'x and (y or (' * depth + 'z > 1' + '))' * depth
+        record = {'x': 1, 'y': 0, 'z': 'text'}
+        for reordered in (False, True):
+            expression = compile_adaptive(text, sample_every=1000)
+            if reordered:
+                for chain in expression.chains.values():
+                    chain.set_order(range(len(chain.operands) - 1, -1, -1))
+            start = time.perf_counter()
+            with self.assertRaises(TypeError):
+                expression.evaluate(record)
+            self.assertLess(time.perf_counter() - start, 1)
+            self.assertTrue(expression.evaluate(dict(record, z=2)))
+            self.assertEqual(expression.evaluate(dict(record, x=0)), 0)
+
+    def test_deep_nesting(self):
+        depth = 10000
+        expression = compile_adaptive(
+            'x and (y or (' * depth + 'z > 1' + '))' * depth, sample_every=1)
+        self.assertEqual(expression.orders(), {})
+        self.assertTrue(expression.evaluate({'x': 1, 'z': 2}))
+        self.assertFalse(expression.evaluate({'x': 1, 'z': 0}))
+
+    def test_same_as_interpreter(self):
+        rng = random.Random(13)
+        for _ in range(300):
+            text = random_expression(rng)
+            expression = AdaptiveExpression(text, parse(text), sample_every=2,
+                                            reorder_every=3)
+            for _ in range(20):
+                record = random_symbol_table(rng)
+                expected = outcome(lambda: interpret(text, record))
+                actual = outcome(lambda: expression.evaluate(record))
+                if not isinstance(expected, type):
+                    self.assertEqual(bool(actual), bool(expected), text)
@@ -0,0 +1,148 @@
+import asyncio
+import random
+import time
+import unittest
+
+from bamboolean.aio import evaluate_async
+from bamboolean.factories import compile, interpret
+from .generators import random_expression, random_symbol_table, outcome
+
+
+class Backend:
+    """Async resolver of a table, recording fetches and cancellations"""
+    def __init__(self, table, delays=None):
+        self.table = {k.upper(): v for k, v in table.items()}
+        self.delays = delays or {}
+        self.fetched = []
+        self.cancelled = []
+        self.batches = []
+
+    async def fetch(self, name):
+        self.fetched.append(name)
+        try:
+            await asyncio.sleep(self.delays.get(name, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        return self.table[name]
+
+    async def fetch_many(self, names):
+        self.batches.append(list(names))
+        await asyncio.sleep(max([self.delays.get(name, 0) for name in names]))
+        return {name: self.table[name] for name in names
+                if name in self.table}
+
+
+def evaluate(text, resolver, **kwargs):
+    return asyncio.run(evaluate_async(text, resolver, **kwargs))
+
+
+class EvaluateAsyncTestCase(unittest.TestCase):
+    def test_in_order_matches_interpreter(self):
+        rng = random.Random(24)
+        for _ in range(300):
+            text = random_expression(rng)
+            table = random_symbol_table(rng)
+            for batched in (False, True):
+                backend = Backend(table)
+                resolver = backend.fetch_many if batched else backend.fetch
+                self.assertEqual(
+                    outcome(lambda: evaluate(text, resolver,
+                                             batched=batched)),
+                    outcome(lambda: interpret(text, table)),
+                    msg='{!r} with {!r}'.format(text, table))
+
+    def test_speculative_gives_same_truth_value(self):
+        rng = random.Random(240)
+        for _ in range(300):
+            text = random_expression(rng)
+            table = random_symbol_table(rng)
+            expected = outcome(lambda: interpret(text, table))
+            if isinstance(expected, type):
+                continue  # operands raising may be skipped
+            for batched in (False, True):
+                backend = Backend(table)
+                resolver = backend.fetch_many if batched else backend.fetch
+                self.assertEqual(
+                    bool(evaluate(text, resolver, batched=batched,
+                                  speculative=True)),
+                    bool(expected),
+                    msg='{!r} with {!r}'.format(text, table))
+
+    def test_short_circuit_skips_fetches(self):
+        backend = Backend({'cheap_flag': False, 'expensive_score': 0.9})
+        self.assertFalse(evaluate('cheap_flag AND expensive_score > 0.5',
+                                  backend.fetch))
+        self.assertEqual(backend.fetched, ['CHEAP_FLAG'])
+
+    def test_variables_are_fetched_once(self):
+        backend = Backend({'x': 3})
+        self.assertTrue(evaluate('x > 1 and x < 5 and not x == 4',
+                                 backend.fetch))
+        self.assertEqual(backend.fetched, ['X'])
+
+    def test_missing_variables(self):
+        backend = Backend({'x': 1})
+        self.assertTrue(evaluate("y == '' and x", backend.fetch))
+        self.assertTrue(evaluate("y == '' and x", backend.fetch_many,
+                                 batched=True))
+
+    def test_speculative_fetches_concurrently(self):
+        backend = Backend({'a': 1, 'b': 2}, {'A': 0.2, 'B': 0.2})
+        start = time.perf_counter()
+        self.assertEqual(evaluate('a and b', backend.fetch,
+                                  speculative=True), 2)
+        self.assertLess(time.perf_counter() - start, 0.35)
+
+    def test_deciding_fetch_wins(self):
+        backend = Backend({'slow': False, 'fast': True},
+                          {'SLOW': 10, 'FAST': 0})
+        start = time.perf_counter()
+        self.assertTrue(evaluate('slow or fast', backend.fetch,
+                                 speculative=True))
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(backend.cancelled, ['SLOW'])
+
+        self.assertFalse(evaluate('slow and not fast', backend.fetch,
+                                  speculative=True))
+
+    def test_variable_shared_by_nested_chains(self):
+        texts = ('(x > 1 or y) and x < 5', 'x < 5 and (x > 1 or y)',
+                 '(y or x > 1) and (z and x < 5 or x == 3)')
+        for text in texts:
+            for batched in (False, True):
+                backend = Backend({'x': 3, 'y': True, 'z': False},
+                                  {'X': 0.05})
+                resolver = backend.fetch_many if batched else backend.fetch
+                self.assertTrue(evaluate(text, resolver, batched=batched,
+                                         speculative=True), text)
+                backend = Backend({'x': 7, 'y': True}, {'X': 0.05})
+                resolver = backend.fetch_many if batched else backend.fetch
+                self.assertFalse(evaluate(text, resolver, batched=batched,
+                                          speculative=True), text)
+
+    def test_batched_speculative_fetches_in_one_round_trip(self):
+        backend = Backend({'x': 50, 'y': False})
+        self.assertTrue(evaluate('x > 42 and (y != true or z)',
+                                 backend.fetch_many, batched=True,
+                                 speculative=True))
+        self.assertEqual(backend.batches, [['X', 'Y', 'Z']])
+
+    def test_errors_are_raised(self):
+        backend = Backend({'x': 'text'})
+        with self.assertRaises(TypeError):
+            evaluate('x > 1', backend.fetch)
+        with self.assertRaises(TypeError):
+            evaluate('x > 1 and x', backend.fetch, speculative=True)
+
+    def test_compiled_expression_and_plain_resolver(self):
+        expression = compile('x > 42 or y')
+        self.assertTrue(evaluate(expression, {'X': 50}.__getitem__))
+        self.assertFalse(evaluate(expression, {'X': 1}.__getitem__))
+
+    def test_deep_nesting(self):
+        depth = 10000
+        text = 'not (' * depth + 'x and (' * depth + 'y' + ')' * 2 * depth
+        backend = Backend({'x': 1, 'y': 1})
+        self.assertTrue(evaluate(text, backend.fetch))
+        self.assertTrue(evaluate(text, backend.fetch, speculative=True))
@@ -0,0 +1,50 @@
+import itertools
+import unittest
+
+from bamboolean.batch import evaluate_many
+from bamboolean.factories import compile, interpret
+
+
+def records(count):
+    return ({'x': i, 'Y': 'yes' if i % 3 else 'no'} for i in range(count))
+
+
+class EvaluateManyTestCase(unittest.TestCase):
+    text = "x > 10 and y == 'yes' or x == 5"
+
+    def test_results_in_input_order(self):
+        expected = [interpret(self.text, record) for record in records(500)]
+        for workers in (1, 2):
+            results = evaluate_many(self.text, records(500), workers=workers,
+                                    chunksize=7, max_pending=3)
+            self.assertEqual(list(results), expected)
+
+    def test_compiled_expression(self):
+        results = evaluate_many(compile('x and y'), records(10), workers=2,
+                                chunksize=4)
+        self.assertEqual(list(results), [interpret('x and y', record)
+                                         for record in records(10)])
+
+    def test_input_is_read_lazily(self):
+        pulled = itertools.count()
+
+        def counted():
+            for record in records(10 ** 6):
+                next(pulled)
+                yield record
+        results = evaluate_many(self.text, counted(), workers=2,
+                                chunksize=10, max_pending=4)
+        self.assertEqual(list(itertools.islice(results, 5)),
+                         [False, False, False, False, False])
+        results.close()
+        self.assertLessEqual(next(pulled), 4 * 10 + 1)
+
+    def test_errors_are_raised(self):
+        table = [{'x': 1}, {'x': 'a'}, {'x': 20}]
+        with self.assertRaises(TypeError):
+            list(evaluate_many('x > 10', table, workers=2, chunksize=1))
+        with self.assertRaises(ValueError):
+            evaluate_many('x > 10', table, chunksize=0)
+
+    def test_empty_input(self):
+        self.assertEqual(list(evaluate_many('x', [], workers=2)), [])
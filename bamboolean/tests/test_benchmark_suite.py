@@ -0,0 +1,74 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from bamboolean import factories
+from benchmarks import suite
+from benchmarks.__main__ import main
+
+
+def results(timings):
+    return {'version': suite.RESULTS_VERSION, 'timings': timings}
+
+
+class CompareTestCase(unittest.TestCase):
+    def test_regressions_above_threshold(self):
+        baseline = results({'a/parse': 1.0, 'b/parse': 1.0, 'c/parse': 1.0,
+                            'd/parse': 1.0})
+        current = results({'a/parse': 1.11, 'b/parse': 1.09, 'c/parse': 0.5,
+                           'd/parse': 1.0})
+        self.assertEqual(suite.compare(baseline, current), [
+            ('a/parse', 1.0, 1.11, True),
+            ('b/parse', 1.0, 1.09, False),
+            ('c/parse', 1.0, 0.5, False),
+            ('d/parse', 1.0, 1.0, False),
+        ])
+
+    def test_custom_threshold(self):
+        baseline = results({'a/parse': 1.0})
+        current = results({'a/parse': 1.3})
+        self.assertEqual(suite.compare(baseline, current, threshold=0.5),
+                         [('a/parse', 1.0, 1.3, False)])
+        self.assertEqual(suite.compare(baseline, current, threshold=0.2),
+                         [('a/parse', 1.0, 1.3, True)])
+
+    def test_timings_missing_in_either(self):
+        baseline = results({'a/parse': 1.0, 'b/parse': 1.0})
+        current = results({'b/parse': 2.0, 'c/parse': 1.0})
+        self.assertEqual(suite.compare(baseline, current),
+                         [('b/parse', 1.0, 2.0, True)])
+
+
+class CompareCommandTestCase(unittest.TestCase):
+    def test_zero_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for name, timings in (('baseline', {'a/lex': 0.0, 'a/parse': 1.0}),
+                                  ('current', {'a/lex': 0.0, 'a/parse': 0.5})):
+                paths.append(os.path.join(directory, name + '.json'))
+                suite.save(results(timings), paths[-1])
+            out = io.StringIO()
+            with redirect_stdout(out):
+                status = main(['compare'] + paths)
+        self.assertEqual(status, 0)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[1].startswith('a/lex'))
+        self.assertIn('n/a', lines[1])
+        self.assertIn('-50.0%', lines[2])
+
+
+class RunTestCase(unittest.TestCase):
+    def tearDown(self):
+        factories.disable_cache()
+
+    def test_cache_is_restored(self):
+        cache = factories.enable_cache()
+        tiny = suite.expression_case(depth=2, width=2, literals=suite.MIXED,
+                                     records=2)
+        with mock.patch.dict(suite.cases, {'tiny': tiny}):
+            timings = suite.run(['tiny'], repeat=1)['timings']
+        self.assertIn('tiny/end_to_end', timings)
+        self.assertIs(factories.get_cache(), cache)
@@ -0,0 +1,57 @@
+import pickle
+import random
+import unittest
+
+from bamboolean.factories import compile, interpret, parse
+from bamboolean.bytecode import compile_program, disassemble, run
+from . import fixtures
+from .generators import random_expression, random_symbol_table, outcome
+
+
+class BytecodeTestCase(unittest.TestCase):
+    def test_disassemble(self):
+        program = compile_program(parse('x > 42 AND y'))
+        self.assertEqual(disassemble(program).splitlines(), [
+            '   0 LOAD_VAR             0 (X)',
+            '   2 LOAD_CONST           0 (42)',
+            '   4 CMP_GT',
+            '   6 JUMP_IF_FALSE_OR_POP 10',
+            '   8 LOAD_VAR             1 (Y)',
+        ])
+
+    def test_constants_and_names_are_deduplicated(self):
+        program = compile_program(parse('x == 1 or x == 1.0 or x == true'))
+        self.assertEqual(program.names, ('X',))
+        self.assertEqual(
+            [type(const) for const in program.consts], [int, float, bool])
+
+    def test_pickle(self):
+        program = compile_program(parse(fixtures.parentheses))
+        restored = pickle.loads(pickle.dumps(program))
+        self.assertEqual(restored, program)
+        self.assertTrue(run(restored, {'X': 10, 'Y': 'no'}))
+
+    def test_noop_evaluates_to_true(self):
+        self.assertTrue(run(compile_program(parse('')), {}))
+
+    def test_deep_nesting(self):
+        depth = 10000
+        text = 'not (' * depth + 'x and (' * depth + 'y' + ')' * 2 * depth
+        compiled = compile(text, backend='bytecode')
+        self.assertTrue(compiled.evaluate({'x': 1, 'y': 1}))
+        self.assertFalse(compiled.evaluate({'x': 1, 'y': 0}))
+
+
+class DifferentialTestCase(unittest.TestCase):
+    def test_random_expressions(self):
+        rng = random.Random(8)
+        for _ in range(500):
+            expression = random_expression(rng)
+            compiled = compile(expression, backend='bytecode')
+            for _ in range(5):
+                symbol_table = random_symbol_table(rng)
+                self.assertEqual(
+                    outcome(lambda: compiled.evaluate(symbol_table)),
+                    outcome(lambda: interpret(expression, symbol_table)),
+                    msg='{!r} with {!r}'.format(expression, symbol_table),
+                )
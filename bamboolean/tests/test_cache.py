@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+from bamboolean import factories
+from bamboolean.cache import LRUCache
+from . import fixtures
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_hits_misses_and_evictions(self):
+        cache = LRUCache(maxsize=2)
+        cache.get_or_create('a', lambda: 1)
+        cache.get_or_create('b', lambda: 2)
+        self.assertEqual(cache.get_or_create('a', lambda: -1), 1)
+        cache.get_or_create('c', lambda: 3)  # evicts 'b'
+        self.assertEqual(cache.get_or_create('b', lambda: 4), 4)
+
+        info = cache.info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 4)
+        self.assertEqual(info.evictions, 2)
+        self.assertEqual(info.currsize, 2)
+
+    def test_resize(self):
+        cache = LRUCache(maxsize=3)
+        for key in 'abc':
+            cache.get_or_create(key, lambda: key)
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.info().evictions, 2)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(maxsize=0)
+
+    def test_shared_between_threads(self):
+        cache = LRUCache(maxsize=8)
+
+        def work():
+            for i in range(1000):
+                cache.get_or_create(i % 16, lambda: object())
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = cache.info()
+        self.assertEqual(info.hits + info.misses, 4000)
+        self.assertLessEqual(info.currsize, 8)
+
+
+class FactoriesCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = factories.enable_cache(maxsize=16)
+        self.cache.clear()
+
+    def tearDown(self):
+        factories.disable_cache()
+
+    def test_parse_is_cached(self):
+        tree = factories.parse(fixtures.simple_example)
+        self.assertIs(factories.parse(fixtures.simple_example), tree)
+        self.assertEqual(self.cache.info().hits, 1)
+
+    def test_compile_is_cached(self):
+        compiled = factories.compile(fixtures.parentheses)
+        self.assertIs(factories.compile(fixtures.parentheses), compiled)
+        self.assertIsNot(
+            factories.compile(fixtures.parentheses, backend='python'),
+            compiled)
+
+    def test_factories_use_cache(self):
+        factories.interpret(fixtures.simple_example, {'x': 50})
+        factories.extract_vars(fixtures.simple_example)
+        factories.normalize(fixtures.simple_example)
+        self.assertEqual(self.cache.info().misses, 1)
+        self.assertEqual(self.cache.info().hits, 2)
+
+    def test_disabled_by_default(self):
+        factories.disable_cache()
+        self.assertIsNone(factories.get_cache())
+        self.assertIsNot(
+            factories.parse(fixtures.simple_example),
+            factories.parse(fixtures.simple_example))
+
+    def test_set_cache(self):
+        factories.disable_cache()
+        factories.set_cache(self.cache)
+        self.assertIs(factories.get_cache(), self.cache)
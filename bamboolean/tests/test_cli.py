@@ -0,0 +1,121 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from bamboolean.cli import CsvTables, JsonTables, main, parse_value
+
+RECORDS = '{"x": 50, "Y": "a"}\n{"x": 1}\n\n{"X": 43, "y": "b"}'
+
+
+class FilterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', newline='') as f:
+            f.write(content)
+        return path
+
+    def run_main(self, *args, stdin=''):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stderr(err):
+            status = main(['filter'] + list(args), io.StringIO(stdin), out)
+        return status, out.getvalue(), err.getvalue()
+
+    def test_jsonl(self):
+        self.assertEqual(self.run_main('x > 42', stdin=RECORDS), (
+            0, '{"x": 50, "Y": "a"}\n{"X": 43, "y": "b"}\n', ''))
+        self.assertEqual(self.run_main('x > 42', '--flags', stdin=RECORDS),
+                         (0, 'true\nfalse\ntrue\n', ''))
+
+    def test_csv(self):
+        path = self.path('records.csv',
+                         'x,Name\r\n50,ann\r\n1,bob\r\n44.5,"c,d"\r\n7\r\n')
+        self.assertEqual(self.run_main("x > 42 or name == ''", path), (
+            0, 'x,Name\n50,ann\n44.5,"c,d"\n7\n', ''))
+        status, out, err = self.run_main('--strings', 'x > 42', path)
+        self.assertEqual(status, 1)
+        self.assertIn('record 1', err)
+
+    def test_many_files_and_workers(self):
+        first = self.path('first.jsonl', RECORDS)
+        second = self.path('second', RECORDS)
+        expected = '{"x": 50, "Y": "a"}\n{"X": 43, "y": "b"}\n' * 2
+        self.assertEqual(self.run_main('x > 42', first, second), (
+            0, expected, ''))
+        self.assertEqual(self.run_main('x > 42', first, second,
+                                       '--workers', '2', '--chunksize', '1'),
+                         (0, expected, ''))
+
+    def test_errors(self):
+        status, out, err = self.run_main(
+            'x > 42', stdin='{"x": 50}\n{"x": "a"}\n')
+        self.assertEqual((status, out), (1, '{"x": 50}\n'))
+        self.assertIn('-: record 2', err)
+        records = ''.join('{"x": %d}\n' % i for i in range(10)) \
+            + '{"x": "a"}\n{"x": 1}\n'
+        status, out, err = self.run_main('x > 42', '--workers', '2',
+                                         '--chunksize', '4', stdin=records)
+        self.assertEqual((status, out), (1, ''))
+        self.assertIn("-: record 11: '>' not supported", err)
+        self.assertEqual(self.run_main('x >', stdin='')[0], 2)
+        self.assertEqual(self.run_main('x', 'missing.jsonl')[0], 1)
+        self.assertEqual(self.run_main('x', stdin='[1]\n')[0], 1)
+
+    def test_file_errors_have_no_record_number(self):
+        status, out, err = self.run_main('x', 'missing.jsonl')
+        self.assertEqual(status, 1)
+        self.assertTrue(err.startswith('missing.jsonl: [Errno'), err)
+
+        path = os.path.join(self.directory.name, 'latin.jsonl')
+        with open(path, 'wb') as f:
+            f.write(b'{"x": 1}\n{"x": "\xe9"}\n')
+        status, out, err = self.run_main('x', path)
+        self.assertEqual(status, 1)
+        self.assertNotIn('record', err)
+        self.assertIn("'utf-8' codec can't decode", err)
+
+        first = self.path('first.csv', 'x\r\n1\r\n')
+        second = self.path('second.csv', 'y\r\n1\r\n')
+        status, out, err = self.run_main('x', first, second)
+        self.assertEqual((status, out), (1, 'x\n1\n'))
+        self.assertEqual(err, second + ': Header differs from the first '
+                                       'file\n')
+
+        status, out, err = self.run_main('x', stdin='{"x": 1}\n{"x": \n')
+        self.assertEqual(status, 1)
+        self.assertIn('-: record 2: ', err)
+
+    def test_module(self):
+        process = subprocess.run(
+            [sys.executable, '-m', 'bamboolean', 'filter', 'x > 42'],
+            input=RECORDS, stdout=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(process.returncode, 0)
+        self.assertEqual(process.stdout,
+                         '{"x": 50, "Y": "a"}\n{"X": 43, "y": "b"}\n')
+
+
+class TablesTestCase(unittest.TestCase):
+    def test_json_tables_fold_case_like_interpreter(self):
+        tables = JsonTables({'X', 'Y'})
+        self.assertEqual(tables('{"x": 1, "X": 2, "z": 3}'), {'X': 2})
+        self.assertEqual(tables('{"X": 2, "x": 1, "y": 3}'),
+                         {'X': 1, 'Y': 3})
+
+    def test_csv_tables(self):
+        tables = CsvTables({'X', 'Y'}, ['x', 'z', 'Y'], True)
+        self.assertEqual(tables(['1', 'a', 'true']), {'X': 1, 'Y': True})
+        self.assertEqual(tables(['1.5']), {'X': 1.5})
+
+    def test_parse_value(self):
+        for text, value in (('42', 42), ('-3', -3), ('2.5', 2.5),
+                            ('1e3', 1000.0), ('True', True),
+                            ('false', False), ('', ''), ('nan', 'nan'),
+                            ('1_000', '1_000')):
+            self.assertEqual(parse_value(text), value)
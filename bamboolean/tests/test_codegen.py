@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from bamboolean.factories import compile, interpret, parse
+from bamboolean.codegen import compile_predicate, generate_source
+from . import fixtures
+from .generators import random_expression, random_symbol_table, outcome
+
+
+class PythonCodeGeneratorTestCase(unittest.TestCase):
+    def test_generated_source(self):
+        source = generate_source(parse('x > 42 AND y != true'))
+        self.assertIn(
+            "((get('X', '') > 42) and (get('Y', '') != True))", source)
+
+    def test_or_is_coerced_to_bool(self):
+        predicate = compile_predicate(parse('x or y'))
+        self.assertIs(predicate({'X': 0, 'Y': 'text'}), True)
+
+    def test_noop_evaluates_to_true(self):
+        self.assertTrue(compile_predicate(parse(''))({}))
+
+    def test_python_backend(self):
+        compiled = compile(fixtures.operators_precedence, backend='python')
+        self.assertTrue(compiled.evaluate({'x': 1, 'y': 'not eligible'}))
+        self.assertFalse(compiled.evaluate({'x': 7, 'y': 'eligible'}))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            compile('x', backend='fortran')
+
+
+class DifferentialTestCase(unittest.TestCase):
+    def assertSameAsInterpreter(self, expression, symbol_table):
+        compiled = compile(expression, backend='python')
+        self.assertEqual(
+            outcome(lambda: compiled.evaluate(symbol_table)),
+            outcome(lambda: interpret(expression, symbol_table)),
+            msg='{!r} with {!r}'.format(expression, symbol_table),
+        )
+
+    def test_fixtures(self):
+        rng = random.Random(0)
+        expressions = [
+            fixtures.simple_example,
+            fixtures.parentheses,
+            fixtures.operators_precedence,
+            fixtures.implicit_boolean_cast,
+            fixtures.constant_statements,
+        ]
+        for expression in expressions:
+            for _ in range(50):
+                self.assertSameAsInterpreter(
+                    expression, random_symbol_table(rng))
+
+    def test_random_expressions(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            expression = random_expression(rng)
+            for _ in range(5):
+                self.assertSameAsInterpreter(
+                    expression, random_symbol_table(rng))
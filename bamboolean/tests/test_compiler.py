@@ -0,0 +1,168 @@
+import unittest
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from bamboolean.compiler import MAX_CLOSURE_DEPTH, VarsLookup
+from bamboolean.factories import compile, interpret
+from . import fixtures
+
+
+class KeyedRecord(Mapping):
+    """Record failing when all of its keys are read"""
+    def __init__(self, data):
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        raise AssertionError("keys of the record were scanned")
+
+    def __len__(self):
+        return len(self.data)
+
+
+class CompiledExpressionTestCase(unittest.TestCase):
+    def assertSameAsInterpreter(self, expression, sym_tab):
+        compiled = compile(expression)
+        for args in zip(*tuple(sym_tab.values())):
+            symbol_table = dict(zip(sym_tab.keys(), args))
+            self.assertEqual(
+                compiled.evaluate(symbol_table),
+                interpret(expression, symbol_table),
+            )
+
+    def test_compiled__basic(self):
+        compiled = compile('x > 42')
+        self.assertTrue(compiled.evaluate({'x': 50}))
+        self.assertFalse(compiled.evaluate({'X': 10}))
+
+    def test_simple_example(self):
+        sym_tab = OrderedDict([
+            ('x', [100, 90, 43, 42]),
+            ('y', [False, True, False, False]),
+            ('z', ['no', 'yes__typo', 'no', 'yes']),
+        ])
+        self.assertSameAsInterpreter(fixtures.simple_example, sym_tab)
+
+    def test_parentheses(self):
+        sym_tab = OrderedDict([
+            ('x', [100, 10, 24, 10, 10]),
+            ('y', ['yes', 'no', 'unknown', 'unknown', 'yes']),
+        ])
+        self.assertSameAsInterpreter(fixtures.parentheses, sym_tab)
+
+    def test_implicit_boolean_cast(self):
+        sym_tab = OrderedDict([
+            ('x', [42, 0, 44.4, 0]),
+            ('y', ['string', '', '', 'unknown']),
+            ('z', [0, False, True, 444]),
+        ])
+        self.assertSameAsInterpreter(fixtures.implicit_boolean_cast, sym_tab)
+
+    def test_long_chains(self):
+        sym_tab = OrderedDict([
+            ('a', [1, 0, 1, 'x']),
+            ('b', ['', 'y', 2, 3]),
+            ('c', [0, 0, 'z', 4]),
+        ])
+        self.assertSameAsInterpreter('a and b and c', sym_tab)
+        self.assertSameAsInterpreter('a or b or c', sym_tab)
+        self.assertSameAsInterpreter('a and (b and c) or not c', sym_tab)
+
+    def test_constant_statements(self):
+        self.assertTrue(compile(fixtures.constant_statements).evaluate({}))
+        self.assertFalse(compile("42 AND False OR ''").evaluate({}))
+
+    def test_empty_expr_evaluates_to_true(self):
+        self.assertTrue(compile('').evaluate({}))
+
+    def test_missing_variable_defaults_to_empty_string(self):
+        self.assertTrue(compile("x == ''").evaluate({}))
+        self.assertFalse(compile('x').evaluate({}))
+
+    def test_not(self):
+        compiled = compile('not x')
+        self.assertTrue(compiled.evaluate({'x': False}))
+        self.assertFalse(compiled.evaluate({'x': True}))
+
+    def test_compiled_expression_is_reusable(self):
+        compiled = compile(fixtures.operators_precedence)
+        self.assertTrue(compiled.evaluate({'x': 1, 'y': 'not eligible'}))
+        self.assertFalse(compiled.evaluate({'x': 7, 'y': 'eligible'}))
+        self.assertTrue(compiled.evaluate({'x': 11, 'y': 'eligible'}))
+
+    def test_compiled_expression_is_immutable(self):
+        compiled = compile('x')
+        with self.assertRaises(AttributeError):
+            compiled.text = 'y'
+
+
+class DeepNestingTestCase(unittest.TestCase):
+    depth = 10000  # well above the default recursion limit
+
+    def test_nested_chains(self):
+        text = 'x and (y or (' * self.depth + 'z > 1' + '))' * self.depth
+        for backend in ('closure', 'python', 'bytecode'):
+            compiled = compile(text, backend)
+            self.assertTrue(compiled.evaluate({'x': 1, 'z': 2}), backend)
+            self.assertFalse(compiled.evaluate({'x': 1, 'z': 1}), backend)
+            self.assertEqual(compiled.evaluate({'x': 0}), 0, backend)
+
+    def test_nested_not(self):
+        text = 'not (' * self.depth + 'x' + ')' * self.depth
+        for backend in ('closure', 'python', 'bytecode'):
+            self.assertTrue(compile(text, backend).evaluate({'x': 1}))
+
+    def test_around_closure_depth_limit(self):
+        for depth in range(MAX_CLOSURE_DEPTH - 2, MAX_CLOSURE_DEPTH + 2):
+            text = 'x and (' * depth + "y == 'a' or not z" + ')' * depth
+            for record in ({'x': 1, 'y': 'a'}, {'x': 1, 'z': 1}, {'x': 0}):
+                self.assertEqual(compile(text).evaluate(record),
+                                 interpret(text, record))
+
+
+class VarsLookupTestCase(unittest.TestCase):
+    def test_only_variables_are_read(self):
+        lookup = VarsLookup(['X', 'Y'])
+        record = {'field_{}'.format(i): i for i in range(500)}
+        record.update({'x': 1, 'Y': 2})
+        self.assertEqual(lookup(KeyedRecord(record)), {'X': 1, 'Y': 2})
+
+    def test_other_spellings_are_searched(self):
+        lookup = VarsLookup(['AGE', 'COUNTRY', 'VIP'])
+        self.assertEqual(lookup({'Age': 30, 'country': 'PL'}),
+                         {'AGE': 30, 'COUNTRY': 'PL'})
+
+    def test_several_spellings(self):
+        lookup = VarsLookup(['X'])
+        self.assertEqual(lookup({'x': 1, 'X': 2}), {'X': 2})
+        self.assertEqual(lookup({'X': 2, 'x': 1}), {'X': 2})
+        self.assertEqual(lookup({'Age': 1, 'aGE': 2}), {})
+        self.assertEqual(VarsLookup(['AGE'])({'Age': 1, 'aGE': 2}),
+                         {'AGE': 2})
+        self.assertEqual(interpret('age', {'Age': 1, 'aGE': 2}), 2)
+        # unlike the interpreter, the upper-case key wins
+        self.assertEqual(compile('x').evaluate({'X': 2, 'x': 1}), 2)
+        self.assertEqual(interpret('x', {'X': 2, 'x': 1}), 1)
+
+    def test_compiled_expression_reads_only_its_variables(self):
+        compiled = compile("x > 42 AND y != true")
+        self.assertEqual(compiled.variables, ('X', 'Y'))
+        record = {'field_{}'.format(i): i for i in range(500)}
+        record.update({'X': 50, 'y': False})
+        self.assertTrue(compiled.evaluate(KeyedRecord(record)))
+
+    def test_positional(self):
+        compiled = compile("x > 42 AND y != true")
+        self.assertTrue(compiled.positional()((50, False)))
+        self.assertFalse(compiled.positional()((50, True)))
+        header = ['id', 'Y', 'name', 'x']
+        evaluate = compiled.positional(header)
+        self.assertTrue(evaluate([1, False, 'a', 50]))
+        self.assertFalse(evaluate([2, False, 'b', 10]))
+
+    def test_positional_missing_variable(self):
+        compiled = compile("x == '' and not y")
+        self.assertTrue(compiled.positional(['z', 'y'])(['z', 0]))
+        self.assertTrue(compile('').positional([])(()))
@@ -0,0 +1,184 @@
+import random
+import unittest
+
+from bamboolean import tokens as tok
+from bamboolean.factories import interpret, parse
+from bamboolean.indexing import EqualityIndex, RangeIndex, \
+    required_comparisons, required_equalities
+from bamboolean.ruleset import RuleSet
+from .generators import VARIABLES, random_expression, \
+    random_numeric_constant, random_numeric_symbol_table
+
+
+class RequiredEqualitiesTestCase(unittest.TestCase):
+    def test_top_level_conjunction(self):
+        tree = parse("x == 'a' and (y == 1 and z > 2) and not w == 3")
+        self.assertEqual(required_equalities(tree), [('X', 'a'), ('Y', 1)])
+
+    def test_single_constraint(self):
+        self.assertEqual(required_equalities(parse('x == true')),
+                         [('X', True)])
+
+    def test_disjunction_requires_nothing(self):
+        self.assertEqual(required_equalities(parse("x == 'a' or y == 1")), [])
+        self.assertEqual(required_equalities(parse('')), [])
+
+
+class RequiredComparisonsTestCase(unittest.TestCase):
+    def test_numeric_comparisons(self):
+        tree = parse("x >= 17 and x < 5.15 and x != 3 and y > true "
+                     "and z == 'a' and (w > 1 or w < 0)")
+        self.assertEqual(required_comparisons(tree),
+                         [('X', tok.GTE, 17), ('X', tok.LT, 5.15)])
+
+
+class EqualityIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = EqualityIndex([parse(text) for text in (
+            "country == 'PL' and segment == 'gold'",
+            "country == 'PL' and segment == 'silver'",
+            "country == 'DE'",
+            "x == 1",
+            "country == 'PL' or vip",
+        )])
+
+    def test_rarest_pair_is_indexed(self):
+        self.assertEqual(self.index.by_var['SEGMENT'],
+                         {'gold': [0], 'silver': [1]})
+        self.assertEqual(self.index.by_var['COUNTRY'], {'DE': [2]})
+        self.assertEqual(self.index.unindexed, [4])
+
+    def test_candidates(self):
+        table = {'COUNTRY': 'PL', 'SEGMENT': 'gold', 'X': 1.0}
+        self.assertEqual(self.index.candidates(table), [0, 3, 4])
+        self.assertEqual(self.index.candidates({'X': True}), [3, 4])
+
+    def test_missing_variable_is_empty_string(self):
+        index = EqualityIndex([parse("x == ''"), parse("x == 'a'")])
+        self.assertEqual(index.candidates({}), [0])
+
+    def test_unhashable_value(self):
+        self.assertEqual(self.index.candidates({'SEGMENT': ['gold']}), [4])
+
+
+class IndexedRuleSetTestCase(unittest.TestCase):
+    def test_rules_added_after_match(self):
+        rules = RuleSet({'a': "x == 'a'"})
+        self.assertEqual(rules.match({'x': 'a'}), ['a'])
+        rules.add('b', "x == 'a' and y")
+        self.assertEqual(rules.match({'x': 'a', 'y': 1}), ['a', 'b'])
+
+    def test_same_as_interpreter(self):
+        rng = random.Random(10)
+        texts = []
+        for _ in range(300):
+            equalities = ['{} == {}'.format(rng.choice('xyz'),
+                                            rng.choice(['0', '1', "'a'"]))
+                          for _ in range(rng.randrange(3))]
+            rest = random_expression(rng, constant=random_numeric_constant)
+            texts.append(' and '.join(equalities + [rest]))
+        indexed = RuleSet(enumerate(texts))
+        plain = RuleSet(enumerate(texts), index=False)
+        for _ in range(50):
+            record = random_numeric_symbol_table(rng)
+            record[rng.choice('xyz')] = rng.choice([0, 1, 1.0, True])
+            expected = [i for i, text in enumerate(texts)
+                        if interpret(text, record)]
+            self.assertEqual(indexed.match(record), expected)
+            self.assertEqual(plain.match(record), expected)
+
+
+class IntervalIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rules = RuleSet(enumerate([
+            'x < 5.15', 'x >= 17', 'x > 10', 'x == 10', 'x != 10.0',
+            'x <= 17', "x == 'a'", 'y > 3', 'x > true',
+        ]))
+        self.index = self.rules.interval_index
+
+    def settle(self, value):
+        values = {}
+        intervals = self.index.by_leaf[0]
+        self.assertTrue(intervals.settle({'X': value}, values))
+        return [values[i] for i in range(6)]
+
+    def test_constraints_are_grouped_by_variable(self):
+        self.assertIs(self.index.by_leaf[0], self.index.by_leaf[5])
+        self.assertIsNot(self.index.by_leaf[0], self.index.by_leaf[7])
+        # string and bool constants are not indexed
+        self.assertEqual(len(self.index.by_leaf), 7)
+        self.assertEqual(self.index.by_leaf[0].thresholds, [5.15, 10, 17])
+
+    def test_settle(self):
+        for value in (-1, 5, 5.15, 6, 10, 10.0, 12, 17, 17.5, True,
+                      float('inf'), float('-inf')):
+            self.assertEqual(
+                self.settle(value),
+                [value < 5.15, value >= 17, value > 10, value == 10,
+                 value != 10.0, value <= 17],
+                value)
+
+    def test_non_numeric_values_are_not_settled(self):
+        intervals = self.index.by_leaf[0]
+        for value in ('a', None, float('nan'), [1]):
+            values = {}
+            self.assertFalse(intervals.settle({'X': value}, values))
+            self.assertEqual(values, {})
+
+    def test_leaves_are_not_evaluated(self):
+        self.rules.leaves[:6] = [None] * 6
+        self.assertEqual(self.rules.match({'x': 10, 'y': 4}), [3, 5, 7, 8])
+
+
+class RangeIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.texts = [
+            'x >= 0 and x < 10',
+            'x >= 10 and x < 100',
+            'x >= 90 and x < 1000',
+            'x > 100 or y',
+            'x == 10 and y > 2',
+            'y <= 2.5',
+        ]
+        trees = [parse(text) for text in self.texts]
+        self.index = RangeIndex(trees, [0, 1, 2, 3, 5])
+
+    def candidates(self, table):
+        found = set(self.index.unindexed)
+        self.index.collect(table, found)
+        return sorted(found)
+
+    def test_most_selective_comparison_is_indexed(self):
+        self.assertEqual(self.index.by_var['X'].thresholds, [10, 90, 100])
+        self.assertEqual(self.index.unindexed, [3])
+
+    def test_candidates(self):
+        self.assertEqual(self.candidates({'X': 5, 'Y': 3}), [0, 1, 3])
+        self.assertEqual(self.candidates({'X': 95, 'Y': 2}), [1, 2, 3, 5])
+        self.assertEqual(self.candidates({'X': 100.0, 'Y': False}),
+                         [2, 3, 5])
+
+    def test_non_numeric_values_select_all_rules(self):
+        self.assertEqual(self.candidates({}), [0, 1, 2, 3, 5])
+        self.assertEqual(self.candidates({'X': float('nan'), 'Y': 'a'}),
+                         [0, 1, 2, 3, 5])
+
+    def test_same_as_interpreter(self):
+        rng = random.Random(11)
+        texts = []
+        for _ in range(300):
+            var = rng.choice('xyz')
+            low = rng.choice(['0', '3.14', '5', '10'])
+            texts.append('{0} {1} {2} and {0} {3} {4} and {5}'.format(
+                var, rng.choice(['>', '>=']), low,
+                rng.choice(['<', '<=']), rng.choice(['5', '7.5', '42']),
+                random_expression(rng, 2, random_numeric_constant)))
+        rules = RuleSet(enumerate(texts))
+        self.assertLess(len(rules.range_index.unindexed), 300)
+        values = [-1, 0, 3.14, 5, 7.5, 10, 42, 100, True, False,
+                  float('inf'), float('-inf'), float('nan')]
+        for _ in range(100):
+            record = {name: rng.choice(values) for name in VARIABLES}
+            expected = [i for i, text in enumerate(texts)
+                        if interpret(text, record)]
+            self.assertEqual(rules.match(record), expected)
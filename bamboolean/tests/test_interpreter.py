@@ -1,8 +1,11 @@
+import random
 import unittest
 from collections import OrderedDict
 
-from bamboolean.factories import interpret
+from bamboolean.factories import interpret, parse
+from bamboolean.interpreter import Interpreter
 from . import fixtures
+from .generators import random_expression, random_symbol_table, outcome
 
 
 class InterpreterTestCase(unittest.TestCase):
@@ -89,3 +92,33 @@ class InterpreterTestCase(unittest.TestCase):
 
     def test_multi_not(self):
         self.assertTrue(interpret('not not x', {'x': True}))
+
+
+class DeepNestingTestCase(unittest.TestCase):
+    depth = 10000  # well above the default recursion limit
+
+    def test_nested_parentheses(self):
+        text = 'x and (' * self.depth + 'y' + ')' * self.depth
+        self.assertEqual(interpret(text, {'x': 1, 'y': 'yes'}), 'yes')
+        self.assertEqual(interpret(text, {'x': 0, 'y': 'yes'}), 0)
+
+    def test_nested_not(self):
+        self.assertTrue(interpret('not ' * self.depth + 'x', {'x': 1}))
+
+    def test_long_chain(self):
+        text = ' or '.join('x{}'.format(i) for i in range(self.depth))
+        self.assertTrue(interpret(text, {'x9999': 1}))
+        self.assertFalse(interpret(text, {}))
+
+
+class VisitorConsistencyTestCase(unittest.TestCase):
+    def test_visit_gives_same_results_as_interpret(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            tree = parse(random_expression(rng))
+            symbol_table = random_symbol_table(rng)
+            interpreter = Interpreter(tree, symbol_table)
+            self.assertEqual(
+                outcome(lambda: interpreter.visit(tree)),
+                outcome(interpreter.interpret),
+            )
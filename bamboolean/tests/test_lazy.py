@@ -0,0 +1,149 @@
+import unittest
+from functools import partial
+
+from bamboolean.batch import evaluate_many
+from bamboolean.factories import compile, compile_adaptive, interpret, \
+    parse, profile
+from bamboolean.interpreter import Interpreter
+from bamboolean.lazy import Lazy
+from bamboolean.ruleset import RuleSet
+
+
+class Counter:
+    """Function returning `value` and counting its calls"""
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def evaluators():
+    yield 'interpret', lambda text, table: interpret(text, table)
+    for backend in ('closure', 'python', 'bytecode'):
+        yield backend, lambda text, table, backend=backend: \
+            compile(text, backend).evaluate(table)
+    yield 'adaptive', lambda text, table: \
+        compile_adaptive(text).evaluate(table)
+    yield 'adaptive, sampled', lambda text, table: \
+        compile_adaptive(text, sample_every=1).evaluate(table)
+    yield 'profile', lambda text, table: profile(text).evaluate(table)
+
+
+class LazyValuesTestCase(unittest.TestCase):
+    def test_skipped_by_short_circuit(self):
+        for name, evaluate in evaluators():
+            with self.subTest(name):
+                score = Counter(0.9)
+                table = {'cheap_flag': False, 'expensive_score': Lazy(score)}
+                self.assertFalse(evaluate(
+                    'cheap_flag AND expensive_score > 0.5', table))
+                self.assertEqual(score.calls, 0)
+
+                table['cheap_flag'] = True
+                self.assertTrue(evaluate(
+                    'cheap_flag AND expensive_score > 0.5', table))
+                self.assertEqual(score.calls, 1)
+
+    def test_memoized_per_evaluation(self):
+        for name, evaluate in evaluators():
+            with self.subTest(name):
+                x = Counter(3)
+                table = {'X': Lazy(x)}
+                self.assertTrue(evaluate('x > 1 and x < 5 and x != 4', table))
+                self.assertEqual(x.calls, 1)
+                evaluate('x > 1', table)
+                self.assertEqual(x.calls, 2)
+
+    def test_resolver(self):
+        calls = []
+
+        def resolve(name):
+            calls.append(name)
+            if name == 'MISSING':
+                raise KeyError(name)
+            return {'X': 10, 'Y': 'yes'}[name]
+
+        for name, evaluate in evaluators():
+            with self.subTest(name):
+                del calls[:]
+                self.assertTrue(evaluate(
+                    "x > 5 or y == 'no'", resolve))
+                self.assertEqual(calls, ['X'])
+                self.assertTrue(evaluate(
+                    "missing == '' and not missing and y", resolve))
+                self.assertEqual(calls, ['X', 'MISSING', 'Y'])
+
+    def test_sampling_computes_only_needed_values(self):
+        score = Counter(0.9)
+        expression = compile_adaptive(
+            'flag or x > 1 or (x > 2 and score > 0.5)', sample_every=1)
+        self.assertTrue(expression.evaluate(
+            {'flag': True, 'x': 5, 'score': Lazy(score)}))
+        self.assertEqual(score.calls, 0)
+        # operands reading computed values are still sampled
+        self.assertEqual(expression.chains[''].stats.evaluated, [1, 1, 0])
+        self.assertEqual(expression.chains['2'].stats.evaluated, [1, 0])
+
+        self.assertTrue(expression.evaluate(
+            {'flag': False, 'x': 5, 'score': Lazy(score)}))
+        self.assertEqual(score.calls, 0)
+        self.assertFalse(expression.evaluate(
+            {'flag': False, 'x': 0, 'score': Lazy(score)}))
+        self.assertEqual(score.calls, 0)
+        self.assertFalse(expression.evaluate({'x': 0, 'score': 0.9}))
+        self.assertEqual(expression.chains[''].stats.evaluated, [4, 4, 2])
+
+    def test_positional_and_evaluate_many(self):
+        text = 'cheap_flag AND expensive_score > 0.5'
+        for cheap_flag in (False, True):
+            score = Counter(0.9)
+            evaluate_row = compile(text).positional()
+            self.assertEqual(evaluate_row((cheap_flag, Lazy(score))),
+                             cheap_flag)
+            self.assertEqual(score.calls, int(cheap_flag))
+
+            score = Counter(0.9)
+            records = [{'cheap_flag': cheap_flag,
+                        'expensive_score': Lazy(score)}]
+            self.assertEqual(list(evaluate_many(text, records, workers=1)),
+                             [cheap_flag])
+            self.assertEqual(score.calls, int(cheap_flag))
+
+    def test_evaluate_many_in_workers(self):
+        records = [{'x': Lazy(partial(int, value))} for value in (1, 5, 9)]
+        self.assertEqual(list(evaluate_many('x > 3', records, workers=2)),
+                         [False, True, True])
+
+    def test_error_of_lazy_value_is_raised(self):
+        def fail():
+            raise LookupError('unavailable')
+
+        with self.assertRaises(LookupError):
+            compile('x or y').evaluate({'x': 0, 'y': Lazy(fail)})
+
+    def test_rule_set(self):
+        texts = {'a': 'vip and score > 5', 'b': 'country == "PL"'}
+        score = Counter(10)
+        record = {'vip': False, 'score': Lazy(score), 'country': 'PL'}
+        rules = RuleSet(texts, index=False)
+        self.assertEqual(rules.match(record), ['b'])
+        self.assertEqual(score.calls, 0)
+        record['vip'] = True
+        self.assertEqual(rules.match(record), ['a', 'b'])
+        self.assertEqual(score.calls, 1)
+
+    def test_rule_set_index_reads_indexed_variables(self):
+        rules = RuleSet({'a': 'vip and score > 5'})
+        score = Counter(10)
+        self.assertEqual(rules.match({'score': Lazy(score)}), [])
+        self.assertEqual(score.calls, 1)
+
+    def test_interpreter_does_not_wrap_records(self):
+        x = Counter(3)
+        interpreter = Interpreter(parse('x > 1 and x < 5'), {'x': Lazy(x)})
+        self.assertIs(type(interpreter.symbol_table), dict)
+        self.assertTrue(interpreter.interpret())
+        self.assertEqual(x.calls, 1)
@@ -1,9 +1,12 @@
+import io
+import random
 import unittest
 
 from bamboolean.lexer import Lexer
 from bamboolean.exceptions import BambooleanLexerError
 from bamboolean import tokens as tok
 from .fixtures import simple_example
+from .generators import random_expression
 
 
 class LexerTestCase(unittest.TestCase):
@@ -58,3 +61,96 @@ class LexerTestCase(unittest.TestCase):
         lexer = Lexer('@>>')
         with self.assertRaises(BambooleanLexerError):
             lexer.get_next_token()
+
+    def test_error_position(self):
+        lexer = Lexer('x = 1')
+        lexer.get_next_token()
+        with self.assertRaises(BambooleanLexerError):
+            lexer.get_next_token()
+        self.assertEqual(lexer.position, 2)
+        self.assertEqual(lexer.current_char, '=')
+
+    def test_float_with_leading_zeros_in_fraction(self):
+        self.assertEqual(Lexer('3.05').get_next_token().value, 3.05)
+
+    def test_number_without_fraction_digits(self):
+        lexer = Lexer('3.')
+        self.assertEqual(lexer.get_next_token().value, 3)
+        with self.assertRaises(BambooleanLexerError):
+            lexer.get_next_token()
+
+    def test_unterminated_string(self):
+        token = Lexer("'text").get_next_token()
+        self.assertEqual((token.type, token.value), (tok.STRING, 'text'))
+
+    def test_long_string(self):
+        text = 'a' * 10 ** 6
+        token = Lexer('"{}"'.format(text)).get_next_token()
+        self.assertEqual(token.value, text)
+
+    def test_operators_are_not_split(self):
+        lexer = Lexer('x>=1 AND(y<=2)')
+        types = []
+        token = lexer.get_next_token()
+        while token.type != tok.EOF:
+            types.append(token.type)
+            token = lexer.get_next_token()
+        self.assertEqual(types, [
+            tok.ID, tok.GTE, tok.INTEGER, tok.AND,
+            tok.LPAREN, tok.ID, tok.LTE, tok.INTEGER, tok.RPAREN,
+        ])
+
+
+class TokenFlyweightTestCase(unittest.TestCase):
+    def test_operators_and_keywords_are_shared(self):
+        first = list(Lexer('x and y == true'))
+        second = list(Lexer('and == true'))
+        self.assertIs(first[1], second[0])
+        self.assertIs(first[3], second[1])
+        self.assertIs(first[4], second[2])
+
+    def test_names_and_strings_are_interned(self):
+        first = list(Lexer("some_name == 'some text'"))
+        second = list(Lexer("SOME_NAME == 'some text'"))
+        self.assertIs(first[0].value, second[0].value)
+        self.assertIs(first[2].value, second[2].value)
+
+    def test_tokens_have_no_dict(self):
+        self.assertFalse(hasattr(Lexer('x').get_next_token(), '__dict__'))
+
+    def test_token_equality(self):
+        self.assertEqual(tok.Token(tok.ID, 'X'), tok.Token(tok.ID, 'X'))
+        self.assertNotEqual(tok.Token(tok.ID, 'X'), tok.Token(tok.ID, 'Y'))
+        self.assertNotEqual(tok.Token(tok.ID, 'X'), (tok.ID, 'X'))
+
+
+class StreamingLexerTestCase(unittest.TestCase):
+    def lex(self, lexer):
+        try:
+            return [(t.type, t.value, lexer.token_line, lexer.token_column)
+                    for t in lexer.tokens()]
+        except BambooleanLexerError as error:
+            return [(error.line, error.column, lexer.position)]
+
+    def test_tokens_iterator(self):
+        tokens = list(Lexer('x > 1'))
+        self.assertEqual(
+            [t.type for t in tokens], [tok.ID, tok.GT, tok.INTEGER, tok.EOF])
+
+    def test_stream_gives_same_tokens_as_text(self):
+        rng = random.Random(5)
+        texts = [random_expression(rng).replace(' ', rng.choice(' \n\t'))
+                 for _ in range(200)]
+        texts += ["x == 'multi\nline' and\n  y @", "  \n", "3.", "x !"]
+        for text in texts:
+            for chunk_size in (1, 2, 7):
+                stream_lexer = Lexer(io.StringIO(text), chunk_size=chunk_size)
+                self.assertEqual(
+                    self.lex(stream_lexer), self.lex(Lexer(text)), msg=text)
+
+    def test_error_line_and_column(self):
+        lexer = Lexer('x == 1\n  and y @ 2')
+        with self.assertRaises(BambooleanLexerError) as context:
+            list(lexer.tokens())
+        self.assertEqual(context.exception.line, 2)
+        self.assertEqual(context.exception.column, 9)
@@ -1,6 +1,7 @@
 import unittest
 
-from bamboolean.factories import normalize
+from bamboolean.factories import normalize, parse
+from bamboolean.walkers import ExprNormalizer
 
 
 class NormalizeExpr(unittest.TestCase):
@@ -27,3 +28,16 @@ class NormalizeExpr(unittest.TestCase):
         self.assertEqual(normalize('not (x > 42)'), 'x <= 42')
         self.assertEqual(
             normalize('not (x > 42 and y)'), '(x <= 42 or not y)')
+
+    def test_normalize_constant(self):
+        self.assertEqual(normalize('not 42'), 'not 42')
+        self.assertEqual(
+            normalize("not (x or 'text')"), "(not x and not 'text')")
+
+    def test_normalize_deep_nesting(self):
+        depth = 10000
+        tree = ExprNormalizer(parse('not ' * depth + 'x')).normalize()
+        self.assertEqual(tree.stringify(), 'x')
+        text = 'x and (y or (' * depth + 'z' + '))' * depth
+        self.assertEqual(normalize(text),
+                         '(x and (y or ' * depth + 'z' + '))' * depth)
@@ -0,0 +1,116 @@
+import random
+import unittest
+
+from bamboolean.factories import interpret, optimize, parse
+from bamboolean.interpreter import Interpreter
+from bamboolean.walkers import ExprOptimizer
+from .generators import VARIABLES, outcome, random_comparison_chain, \
+    random_expression, random_numeric_constant, \
+    random_numeric_symbol_table, random_symbol_table
+
+
+class OptimizeExpr(unittest.TestCase):
+    def test_fold_constants(self):
+        self.assertEqual(optimize("444 AND True OR 'yes'"), 'true')
+        self.assertEqual(optimize("x and 1 and 'yes'"), 'x')
+        self.assertEqual(optimize("x and ''"), 'false')
+        self.assertEqual(optimize('x or 0 or y'), '(x or y)')
+        self.assertEqual(optimize('x or 3.14'), 'true')
+        self.assertEqual(optimize('not (1 and 0)'), 'true')
+
+    def test_collapse_double_negation(self):
+        self.assertEqual(optimize('not not x'), 'x')
+        self.assertEqual(optimize('not not not x'), 'not x')
+
+    def test_drop_repeated_operands(self):
+        self.assertEqual(optimize('x and y and X'), '(x and y)')
+        self.assertEqual(optimize('x > 1 or y or x > 1'), '(x > 1 or y)')
+
+    def test_merge_ranges_in_conjunction(self):
+        self.assertEqual(optimize('x > 5 AND x > 10'), 'x > 10')
+        self.assertEqual(optimize('x >= 10 and y and x > 10'),
+                         '(x > 10 and y)')
+        self.assertEqual(optimize('x >= 5 and x <= 5'), 'x == 5')
+        self.assertEqual(optimize('x > 1 and x < 9 and x == 5'), 'x == 5')
+        self.assertEqual(optimize("x > 1 and x != 0 and x != 'a'"), 'x > 1')
+        self.assertEqual(optimize("x == 'a' and x != 'b'"), "x == 'a'")
+
+    def test_contradictions(self):
+        self.assertEqual(optimize('x < 3 AND x > 7'), 'false')
+        self.assertEqual(optimize('x < 3 AND x > 7 or y'), 'y')
+        self.assertEqual(optimize('x > 5 and x <= 5'), 'false')
+        self.assertEqual(optimize('x == 1 and y and x == 2'), 'false')
+        self.assertEqual(optimize('x != 1 and x == 1'), 'false')
+        self.assertEqual(optimize("x == 'a' and x > 5"), 'false')
+
+    def test_merge_ranges_in_disjunction(self):
+        self.assertEqual(optimize('x > 5 or x > 10'), 'x > 5')
+        self.assertEqual(optimize('x < 5 or y or x <= 5'), '(x <= 5 or y)')
+        self.assertEqual(optimize('x > 5 or x == 7 or x == 5'), 'x >= 5')
+
+    def test_keep_order_of_comparisons(self):
+        # x > 3 would raise for a string the original rejects with x != 5
+        self.assertEqual(optimize('x != 5 and x > 3'), '(x != 5 and x > 3)')
+        self.assertEqual(optimize('x == 1 or y or x > 3'),
+                         '((x == 1 or y) or x > 3)')
+        # always true for numbers, but not for NaN
+        self.assertEqual(optimize('x < 3 or x >= 3'), '(x < 3 or x >= 3)')
+
+    def test_unchanged_tree_is_reused(self):
+        tree = parse('x > 1 and (y or z)')
+        self.assertIs(ExprOptimizer(tree).optimize(), tree)
+
+    def test_empty(self):
+        self.assertEqual(optimize(''), '')
+
+    def test_deep_nesting(self):
+        depth = 10000
+        tree = parse('(' * depth + 'x > 1 and 1' + ')' * depth)
+        self.assertEqual(ExprOptimizer(tree).optimize().stringify(), 'x > 1')
+        text = 'x and (y or (' * depth + 'z > 1 and 1' + '))' * depth
+        self.assertEqual(optimize(text),
+                         '(x and (y or ' * depth + 'z > 1' + '))' * depth)
+
+    def assertSameTruth(self, text, tree, record):
+        expected = outcome(lambda: interpret(text, record))
+        if isinstance(expected, type):
+            return  # the optimized expression may not raise
+        actual = Interpreter(tree, record).interpret()
+        self.assertEqual(bool(actual), bool(expected),
+                         '{} -> {} for {}'.format(text, tree.stringify(),
+                                                  record))
+
+    def test_same_as_interpreter(self):
+        rng = random.Random(12)
+        for _ in range(500):
+            text = random_expression(rng)
+            tree = ExprOptimizer(parse(text)).optimize()
+            for _ in range(10):
+                self.assertSameTruth(text, tree, random_symbol_table(rng))
+
+    def test_same_as_interpreter_for_numbers(self):
+        rng = random.Random(13)
+        values = [0, 1, 3.14, 5, 7.5, 10, 42, True, float('nan'), 'yes']
+        for _ in range(500):
+            text = random_expression(rng, constant=random_numeric_constant)
+            tree = ExprOptimizer(parse(text)).optimize()
+            for _ in range(10):
+                record = random_numeric_symbol_table(rng)
+                record[rng.choice(VARIABLES)] = rng.choice(values)
+                self.assertSameTruth(text, tree, record)
+
+    def test_same_as_interpreter_for_comparison_chains(self):
+        rng = random.Random(14)
+        values = [0, 1, 3, 5.0, 7.5, 42, True, False, float('nan'),
+                  float('inf'), 'yes', '', None]
+        for _ in range(2000):
+            text = random_comparison_chain(rng, rng.randrange(2, 6))
+            if rng.random() < 0.3:
+                text = '({}) {} ({})'.format(
+                    text, rng.choice(('and', 'or')),
+                    random_comparison_chain(rng))
+            tree = ExprOptimizer(parse(text)).optimize()
+            for _ in range(5):
+                record = {name: rng.choice(values) for name in 'xyz'
+                          if rng.random() < 0.9}
+                self.assertSameTruth(text, tree, record)
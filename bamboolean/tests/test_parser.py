@@ -1,8 +1,11 @@
+import io
 import unittest
 
 from bamboolean import tokens as tok
 from bamboolean.exceptions import BambooleanParserError
-from bamboolean.factories import ParserFactory
+from bamboolean.factories import ParserFactory, parse, parse_stream
+from bamboolean.lexer import Lexer
+from bamboolean.parser import Parser
 from . import fixtures
 
 
@@ -89,3 +92,85 @@ class ParserTestCase(unittest.TestCase):
         self.assertEqual(abstract_tree.tree_repr(), [
             (tok.NOT, 'NOT'), [(tok.NOT, 'NOT'), (tok.ID, 'X')]
         ])
+
+
+class CompactTreeTestCase(unittest.TestCase):
+    def test_nodes_have_no_dict(self):
+        tree = parse("not x or y > 1 and z == 'a' or true")
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            self.assertFalse(hasattr(node, '__dict__'), msg=repr(node))
+            for child in ('left', 'right', 'var', 'value'):
+                if hasattr(getattr(node, child, None), 'tree_repr'):
+                    stack.append(getattr(node, child))
+
+
+class StreamingParserTestCase(unittest.TestCase):
+    def test_parse_stream(self):
+        tree = parse_stream(io.StringIO(fixtures.parentheses))
+        self.assertEqual(
+            tree.tree_repr(), parse(fixtures.parentheses).tree_repr())
+
+    def test_parse_token_iterable(self):
+        tokens = list(Lexer(fixtures.simple_example))
+        tree = Parser(iter(tokens)).parse()
+        self.assertEqual(
+            tree.tree_repr(), parse(fixtures.simple_example).tree_repr())
+
+    def test_token_iterable_without_eof(self):
+        tokens = list(Lexer('x and y'))[:-1]
+        self.assertEqual(
+            Parser(tokens).parse().tree_repr(), parse('x and y').tree_repr())
+
+    def test_large_generated_stream(self):
+        text = '\n'.join(
+            "(var{0} > {0} and name == 'v{0}') or".format(i)
+            for i in range(20000)) + ' last'
+        tree = parse_stream(io.StringIO(text))
+        self.assertEqual(tree.right.tree_repr(), (tok.ID, 'LAST'))
+
+    def test_error_line_and_column(self):
+        stream = io.StringIO('x == 1 and\n  (y or z')
+        with self.assertRaises(BambooleanParserError) as context:
+            parse_stream(stream)
+        self.assertEqual(context.exception.line, 2)
+        self.assertEqual(context.exception.column, 10)
+
+
+class DeepNestingTestCase(unittest.TestCase):
+    depth = 10000  # well above the default recursion limit
+
+    def test_nested_parentheses(self):
+        tree = parse('(' * self.depth + 'x' + ')' * self.depth)
+        self.assertEqual(tree.tree_repr(), (tok.ID, 'X'))
+
+    def test_nested_right_operands(self):
+        tree = parse('x and (' * self.depth + 'y' + ')' * self.depth)
+        for _ in range(self.depth):
+            self.assertEqual(tree.left.tree_repr(), (tok.ID, 'X'))
+            tree = tree.right
+        self.assertEqual(tree.tree_repr(), (tok.ID, 'Y'))
+
+    def test_nested_not(self):
+        tree = parse('not ' * self.depth + 'x')
+        for _ in range(self.depth):
+            self.assertEqual(tree.op.type, tok.NOT)
+            tree = tree.right
+        self.assertEqual(tree.tree_repr(), (tok.ID, 'X'))
+
+    def test_string_forms(self):
+        tree = parse('x and (' * self.depth + 'not y' + ')' * self.depth)
+        self.assertEqual(tree.stringify(), '(x and ' * self.depth + 'not y'
+                         + ')' * self.depth)
+        self.assertTrue(str(tree).startswith("[('ID', 'X'), ('AND', 'AND'), "
+                                             "[('ID', 'X')"))
+        repr_tree = tree.tree_repr()
+        for _ in range(self.depth):
+            repr_tree = repr_tree[2]
+        self.assertEqual(repr_tree, [(tok.NOT, 'NOT'), (tok.ID, 'Y')])
+
+    def test_unbalanced_parentheses(self):
+        for text in ('(x', 'x)', '((x) and y', 'not (x or', '()'):
+            with self.assertRaises(BambooleanParserError, msg=text):
+                parse(text)
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from bamboolean.factories import interpret, parse, specialize
+from bamboolean.interpreter import Interpreter
+from bamboolean.lazy import Lazy
+from bamboolean.walkers import VarsExtractor, partial_evaluate
+from .generators import random_expression, random_symbol_table, outcome
+
+
+def residual(text, known_vars):
+    return partial_evaluate(parse(text), known_vars).stringify()
+
+
+class PartialEvaluateTestCase(unittest.TestCase):
+    def test_substitute_known_variables(self):
+        text = "tenant == 'acme' AND x > 5"
+        self.assertEqual(residual(text, {'tenant': 'acme'}), 'x > 5')
+        self.assertEqual(residual(text, {'TENANT': 'other'}), 'false')
+        self.assertEqual(residual("region == 'eu' OR vip", {'region': 'eu'}),
+                         'true')
+
+    def test_simplify_residual(self):
+        text = ("(region == 'eu' and x > 3) or (region == 'us' and x > 10)"
+                " or (region == 'us' and x > 20)")
+        self.assertEqual(residual(text, {'region': 'us'}), 'x > 10')
+        self.assertEqual(residual('not flag and (y or z)', {'flag': 0}),
+                         '(y or z)')
+
+    def test_unknown_variables_are_kept(self):
+        tree = parse('x > 1 and (y or z)')
+        self.assertIs(partial_evaluate(tree, {'w': 1}), tree)
+
+    def test_failing_comparison_is_false(self):
+        self.assertEqual(residual('tenant > 5 or y', {'tenant': 'PL'}), 'y')
+
+    def test_lazy_known_values(self):
+        calls = []
+
+        def tenant():
+            calls.append('tenant')
+            return 'acme'
+
+        known = {'tenant': Lazy(tenant), 'unused': Lazy(calls.append)}
+        text = "tenant == 'acme' and x > 5 or tenant == 'other'"
+        self.assertEqual(residual(text, known), 'x > 5')
+        self.assertEqual(calls, ['tenant'])
+        self.assertEqual(residual('x > 5', known), 'x > 5')
+        self.assertEqual(calls, ['tenant'])
+
+    def test_same_as_interpreter(self):
+        rng = random.Random(25)
+        for _ in range(500):
+            text = random_expression(rng)
+            record = random_symbol_table(rng)
+            known = {k: v for k, v in record.items() if rng.random() < 0.5}
+            rest = {k: v for k, v in record.items() if k not in known}
+            tree = partial_evaluate(parse(text), known)
+            self.assertFalse(
+                VarsExtractor(tree).extract()
+                & {name.upper() for name in known})
+            expected = outcome(lambda: interpret(text, record))
+            if isinstance(expected, type):
+                continue  # the residual expression may not raise
+            self.assertEqual(
+                bool(Interpreter(tree, rest).interpret()), bool(expected),
+                '{} -> {} for {} and {}'.format(
+                    text, tree.stringify(), known, rest))
+
+    def test_deep_nesting(self):
+        depth = 10000
+        text = 'x and (y or (' * depth + 'z > 1' + '))' * depth
+        self.assertEqual(residual(text, {'z': 5}),
+                         '(x and (y or ' * (depth - 1) + 'x'
+                         + '))' * (depth - 1))
+        expression = specialize(text, {'y': 0})
+        self.assertTrue(expression.evaluate({'x': 1, 'z': 2}))
+        self.assertFalse(expression.evaluate({'x': 1, 'z': 0}))
+
+    def test_specialize(self):
+        expression = specialize("tenant == 'acme' and x > 5 or vip",
+                                {'tenant': 'acme'}, backend='bytecode')
+        self.assertEqual(expression.text, '(x > 5 or vip)')
+        self.assertEqual(expression.variables, ('VIP', 'X'))
+        self.assertTrue(expression.evaluate({'x': 6}))
+        self.assertFalse(expression.evaluate({'x': 1}))
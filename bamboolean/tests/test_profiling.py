@@ -0,0 +1,72 @@
+import json
+import random
+import unittest
+
+from bamboolean.factories import interpret, profile
+from .generators import outcome, random_expression, random_symbol_table
+
+
+class ProfileTestCase(unittest.TestCase):
+    def test_counts(self):
+        result = profile('x > 1 and (y or z) and not w')
+        for record in ({'x': 0}, {'x': 2, 'y': 1}, {'x': 2, 'z': 1, 'w': 1}):
+            result.evaluate(record)
+        nodes = {stats.label: stats for stats in result.nodes}
+        self.assertEqual(set(nodes), {'AND', 'x > 1', 'OR', 'y', 'z', 'NOT',
+                                      'w'})
+        self.assertEqual(result.evaluations, 3)
+        self.assertEqual((nodes['AND'].calls, nodes['AND'].true,
+                          nodes['AND'].false), (3, 1, 2))
+        self.assertEqual((nodes['x > 1'].true, nodes['x > 1'].false), (2, 1))
+        self.assertEqual((nodes['OR'].calls, nodes['OR'].skipped), (2, 1))
+        self.assertEqual((nodes['z'].calls, nodes['z'].skipped), (1, 1))
+        self.assertEqual((nodes['NOT'].calls, nodes['NOT'].false), (2, 1))
+        self.assertGreaterEqual(nodes['AND'].elapsed, nodes['OR'].elapsed)
+
+    def test_parser_timings(self):
+        result = profile('x and ' * 200 + 'y')
+        self.assertGreater(result.lexing, 0)
+        self.assertGreater(result.parsing, 0)
+
+    def test_same_result_as_interpreter(self):
+        rng = random.Random(14)
+        for _ in range(300):
+            text = random_expression(rng)
+            result = profile(text)
+            for _ in range(5):
+                record = random_symbol_table(rng)
+                self.assertEqual(
+                    outcome(lambda: result.evaluate(record)),
+                    outcome(lambda: interpret(text, record)), text)
+
+    def test_errors_are_counted(self):
+        result = profile("x > 1")
+        with self.assertRaises(TypeError):
+            result.evaluate({'x': 'a'})
+        self.assertEqual((result.nodes[0].calls, result.nodes[0].true,
+                          result.nodes[0].false), (1, 0, 0))
+
+    def test_export(self):
+        result = profile("x == 'a;b' or y")
+        result.evaluate({'y': True})
+        data = json.loads(result.to_json())
+        self.assertEqual(data['text'], "x == 'a;b' or y")
+        self.assertEqual([node['label'] for node in data['nodes']],
+                         ['OR', "x == 'a;b'", 'y'])
+        self.assertEqual([node['parent'] for node in data['nodes']],
+                         [None, 0, 0])
+
+        stacks = [line.rsplit(' ', 1) for line in
+                  result.collapsed('rule').splitlines()]
+        for stack, count in stacks:
+            self.assertTrue(stack.startswith('rule;'))
+            self.assertGreater(int(count), 0)
+        frames = {frame for stack, _ in stacks for frame in stack.split(';')}
+        self.assertNotIn("x == 'a", frames)
+
+    def test_deep_nesting(self):
+        depth = 10000
+        result = profile('(' * depth + 'not ' * depth + 'x' + ')' * depth)
+        self.assertTrue(result.evaluate({'x': True}))
+        self.assertEqual(len(result.nodes), depth + 1)
+        result.collapsed()
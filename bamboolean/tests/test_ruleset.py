@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from bamboolean.factories import interpret
+from bamboolean.ruleset import RuleSet
+from . import fixtures
+from .generators import random_expression, random_numeric_constant, \
+    random_numeric_symbol_table
+
+
+class RuleSetTestCase(unittest.TestCase):
+    def test_match(self):
+        rules = RuleSet({
+            'simple': fixtures.simple_example,
+            'parentheses': fixtures.parentheses,
+            'precedence': fixtures.operators_precedence,
+        })
+        self.assertEqual(
+            rules.match({'x': 100, 'y': 'yes', 'z': 'no'}),
+            ['simple', 'parentheses'])
+        self.assertEqual(rules.match({'x': 1}), ['precedence'])
+
+    def test_rules_from_pairs(self):
+        rules = RuleSet([(1, 'x'), (2, 'not x'), (3, '')])
+        self.assertEqual(rules.match({'X': 1}), [1, 3])
+        self.assertEqual(len(rules), 3)
+
+    def test_duplicated_rule_id(self):
+        rules = RuleSet({'a': 'x'})
+        with self.assertRaises(ValueError):
+            rules.add('a', 'y')
+
+    def test_leaves_are_shared(self):
+        rules = RuleSet({
+            'a': "country == 'PL' and age > 18",
+            'b': "COUNTRY == 'PL' or age > 18.0",
+            'c': "country == 'PL' and not age > 18 or vip",
+            'd': "vip or age > true",
+        })
+        # age > 18, age > 18.0 and age > true are different constraints
+        self.assertEqual(len(rules.leaves), 5)
+
+    def test_leaf_is_evaluated_once_per_record(self):
+        rules = RuleSet({i: "x == 'a' and y > {}".format(i % 3)
+                         for i in range(30)}, index=False)
+        calls = []
+
+        def counted(index, leaf):
+            def evaluate(table):
+                calls.append(index)
+                return leaf(table)
+            return evaluate
+        rules.leaves[:] = [counted(i, leaf)
+                           for i, leaf in enumerate(rules.leaves)]
+
+        self.assertEqual(len(rules.match({'x': 'a', 'y': 1})), 10)
+        self.assertCountEqual(calls, [0, 1, 2, 3])
+
+    def test_deep_nesting(self):
+        depth = 10000
+        rules = RuleSet({
+            'deep': 'x and (y or (' * depth + 'z > 1' + '))' * depth,
+            'flat': 'z > 1',
+        })
+        self.assertEqual(rules.match({'x': 1, 'z': 2}), ['deep', 'flat'])
+        self.assertEqual(rules.match({'x': 0, 'z': 2}), ['flat'])
+        self.assertEqual(rules.match({'x': 1, 'z': 0}), [])
+
+    def test_same_as_interpreter(self):
+        rng = random.Random(9)
+        texts = [random_expression(rng, constant=random_numeric_constant)
+                 for _ in range(300)]
+        rules = RuleSet(enumerate(texts))
+        for _ in range(30):
+            record = random_numeric_symbol_table(rng)
+            expected = [i for i, text in enumerate(texts)
+                        if interpret(text, record)]
+            self.assertEqual(rules.match(record), expected)
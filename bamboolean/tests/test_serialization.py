@@ -0,0 +1,127 @@
+import io
+import os
+import random
+import struct
+import tempfile
+import unittest
+from unittest import mock
+
+from bamboolean import bytecode, serialization
+from bamboolean.exceptions import BambooleanSerializationError
+from bamboolean.factories import interpret, parse
+from bamboolean.ruleset import RuleSet
+from bamboolean.serialization import dump, dumps, load, loads
+from . import fixtures
+from .generators import random_expression, random_symbol_table, outcome
+
+RULES = {
+    'simple': fixtures.simple_example,
+    'parentheses': fixtures.parentheses,
+    'precedence': fixtures.operators_precedence,
+    'cast': fixtures.implicit_boolean_cast,
+    'constants': fixtures.constant_statements,
+    'empty': '',
+    'types': 'x == 1 or x == 1.0 or x == true or not x == "1"',
+}
+
+
+class SerializationTestCase(unittest.TestCase):
+    def test_trees_round_trip(self):
+        trees = {rule_id: parse(text) for rule_id, text in RULES.items()}
+        archive = loads(dumps(trees))
+        self.assertEqual(list(archive), list(RULES))
+        for rule_id, tree in trees.items():
+            self.assertEqual(archive[rule_id].tree_repr(), tree.tree_repr())
+            self.assertEqual(archive[rule_id].stringify(), tree.stringify())
+
+    def test_programs_run_on_the_data(self):
+        data = dumps((i, parse(text)) for i, text in enumerate(RULES.values()))
+        archive = loads(data)
+        program = archive.program(0)
+        self.assertIsInstance(program.code, memoryview)
+        self.assertIs(program.code.obj, data)
+        self.assertTrue(bytecode.run(program, {'X': 50, 'Y': False}))
+
+    def test_random_expressions(self):
+        rng = random.Random(21)
+        texts = [random_expression(rng) for _ in range(300)]
+        archive = loads(dumps(enumerate(map(parse, texts))))
+        for i, text in enumerate(texts):
+            self.assertEqual(archive[i].tree_repr(), parse(text).tree_repr())
+            program = archive.program(i)
+            for _ in range(3):
+                table = random_symbol_table(rng)
+                folded = {k.upper(): v for k, v in table.items()}
+                self.assertEqual(
+                    outcome(lambda: bytecode.run(program, folded)),
+                    outcome(lambda: interpret(text, table)),
+                    msg='{!r} with {!r}'.format(text, table))
+
+    def test_leaves_are_shared(self):
+        archive = loads(dumps({'a': parse('x == 1 and y'),
+                               'b': parse('y or x == 1.0')}))
+        a, b = archive['a'], archive['b']
+        self.assertIs(a.left.var, b.right.var)
+        self.assertIs(a.right, b.left)
+        self.assertIsNot(a.left.value, b.right.value)
+        self.assertIs(archive['a'], a)
+
+    def test_deep_nesting(self):
+        depth = 10000
+        text = 'not (' * depth + 'x and (' * depth + 'y' + ')' * 2 * depth
+        archive = loads(dumps({'deep': parse(text)}))
+        self.assertEqual(bytecode.compile_program(archive['deep']),
+                         bytecode.compile_program(parse(text)))
+        self.assertTrue(bytecode.run(archive.program('deep'),
+                                     {'X': 1, 'Y': 1}))
+
+    def test_memory_mapped_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rules.bin')
+            with open(path, 'wb') as f:
+                dump(RuleSet(RULES), f)
+            with open(path, 'rb') as f:
+                archive = load(f)
+            self.assertEqual(archive.match({'x': 50, 'y': False}),
+                             RuleSet(RULES).match({'x': 50, 'y': False}))
+            rules = RuleSet.from_trees(archive)
+            self.assertEqual(rules.match({'x': 1, 'y': 'eligible'}),
+                             RuleSet(RULES).match({'x': 1, 'y': 'eligible'}))
+
+    def test_file_like_object(self):
+        f = io.BytesIO()
+        dump({1: parse('x')}, f)
+        f.seek(0)
+        self.assertEqual(load(f).match({'x': 1}), [1])
+
+    def test_unsupported_rule_id(self):
+        with self.assertRaises(BambooleanSerializationError):
+            dumps({('a', 1): parse('x')})
+        with self.assertRaises(ValueError):
+            dumps([(1, parse('x')), (1, parse('y'))])
+
+
+class IncompatibleDataTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data = dumps({'a': parse(fixtures.simple_example)})
+
+    def test_not_a_rule_file(self):
+        for data in (b'', b'BM', b'{"ids": []}' + bytes(32)):
+            with self.assertRaises(BambooleanSerializationError):
+                loads(data)
+
+    def test_other_format_version(self):
+        data = bytearray(self.data)
+        struct.pack_into('<H', data, 4, serialization.FORMAT_VERSION + 1)
+        with self.assertRaisesRegex(BambooleanSerializationError, 'version'):
+            loads(data)
+
+    def test_other_opcodes(self):
+        with mock.patch.dict(bytecode.opnames, {99: 'CMP_IN'}):
+            with self.assertRaisesRegex(BambooleanSerializationError,
+                                        'opcodes'):
+                loads(self.data)
+
+    def test_truncated(self):
+        with self.assertRaises(BambooleanSerializationError):
+            loads(self.data[:-4])
@@ -23,3 +23,12 @@ class VarsExtractorTestCase(unittest.TestCase):
     def test_many_vars(self):
         variables = {f'VAR{i}' for i in range(30)}
         self.assertCountEqual(extract_vars(' OR '.join(variables)), variables)
+
+    def test_vars_under_not(self):
+        self.assertCountEqual(
+            extract_vars('not x and not (y or not z)'), {'X', 'Y', 'Z'})
+
+    def test_deep_nesting(self):
+        depth = 10000
+        text = 'x and (' * depth + 'y' + ')' * depth
+        self.assertCountEqual(extract_vars(text), {'X', 'Y'})
@@ -0,0 +1,182 @@
+import mmap
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from bamboolean import vectorized
+from bamboolean.factories import evaluate_columns, evaluate_npy, interpret
+from .generators import VARIABLES, VALUES, outcome, random_expression, \
+    random_numeric_constant
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore
+
+ROWS = 30
+
+
+def random_column(rng, kind):
+    if kind == 'int':
+        return np.array([rng.choice((0, 1, 5, 42)) for _ in range(ROWS)])
+    if kind == 'float':
+        return np.array([rng.choice((0.0, 3.14, 7.5, float('nan')))
+                         for _ in range(ROWS)])
+    if kind == 'bool':
+        return np.array([rng.random() < 0.5 for _ in range(ROWS)])
+    if kind == 'str':
+        return np.array([rng.choice(('', 'yes', 'no')) for _ in range(ROWS)])
+    column = np.empty(ROWS, dtype=object)
+    column[:] = [rng.choice(VALUES) for _ in range(ROWS)]
+    return column
+
+
+@unittest.skipUnless(np, "numpy is not installed")
+class VectorizedEvaluatorTestCase(unittest.TestCase):
+    def test_mask(self):
+        columns = {'x': np.array([1, 50, 100]),
+                   'y': np.array([True, False, True]),
+                   'z': np.array(['yes', 'no', ''])}
+        self.assertEqual(
+            evaluate_columns("x > 42 and y or z == 'no'", columns).tolist(),
+            [False, True, True])
+        self.assertEqual(evaluate_columns('not z', columns).tolist(),
+                         [False, False, True])
+
+    def test_missing_variables(self):
+        columns = {'x': np.arange(3)}
+        self.assertEqual(evaluate_columns("w == ''", columns).tolist(),
+                         [True, True, True])
+        self.assertEqual(evaluate_columns('w or x', columns).tolist(),
+                         [False, True, True])
+        with self.assertRaises(TypeError):
+            evaluate_columns('w > 1', columns)
+        self.assertEqual(evaluate_columns('w', {}, size=2).tolist(),
+                         [False, False])
+
+    def test_structured_array(self):
+        table = np.array([(1, 'a'), (2, 'b')],
+                         dtype=[('x', 'i8'), ('Name', 'U4')])
+        self.assertEqual(
+            evaluate_columns("x > 1 and name == 'a'", table).tolist(),
+            [False, False])
+        self.assertEqual(
+            evaluate_columns("x < 2 or name == 'b'", table).tolist(),
+            [True, True])
+
+    def test_errors_of_rows_not_reaching_comparison(self):
+        columns = {'x': np.array(['a', 'a'])}
+        self.assertEqual(
+            evaluate_columns("x == 'a' or x > 1", columns).tolist(),
+            [True, True])
+        columns = {'x': np.array(['a', 'b'])}
+        with self.assertRaises(TypeError):
+            evaluate_columns("x == 'a' or x > 1", columns)
+
+    def test_invalid_columns(self):
+        with self.assertRaises(ValueError):
+            evaluate_columns('x', {'x': np.arange(2), 'y': np.arange(3)})
+        with self.assertRaises(ValueError):
+            evaluate_columns('x', {})
+
+    def test_operands_are_evaluated_for_undecided_rows(self):
+        column = np.empty(4, dtype=object)
+        column[:] = ['a', 2, 'b', 3]
+        columns = {'x': np.array([0, 1, 0, 1]), 'y': column}
+        for compact_below in (0, 1):
+            with mock.patch.object(vectorized, 'COMPACT_BELOW',
+                                   compact_below):
+                self.assertEqual(
+                    evaluate_columns('x and y > 1 or y == 2',
+                                     columns).tolist(),
+                    [False, True, False, True])
+
+    def test_same_as_interpreter(self):
+        for compact_below in (0, vectorized.COMPACT_BELOW, 1):
+            with mock.patch.object(vectorized, 'COMPACT_BELOW',
+                                   compact_below):
+                self.check_same_as_interpreter()
+
+    def check_same_as_interpreter(self):
+        rng = random.Random(17)
+        kinds = ('missing', 'int', 'float', 'bool', 'str', 'object')
+        for _ in range(300):
+            constant = rng.choice((None, random_numeric_constant))
+            text = random_expression(rng, constant=constant) if constant \
+                else random_expression(rng)
+            columns = {}
+            for name in VARIABLES:
+                kind = rng.choice(kinds)
+                if kind != 'missing':
+                    columns[name] = random_column(rng, kind)
+            expected = [
+                outcome(lambda: interpret(text, {
+                    name: column[row].item()
+                    if isinstance(column[row], np.generic) else column[row]
+                    for name, column in columns.items()}))
+                for row in range(ROWS)
+            ]
+            errors = [value for value in expected if isinstance(value, type)]
+            actual = outcome(
+                lambda: evaluate_columns(text, columns, size=ROWS).tolist())
+            if errors:
+                self.assertEqual(actual, errors[0], text)
+            else:
+                self.assertEqual(actual, [bool(value) for value in expected],
+                                 text)
+
+
+@unittest.skipUnless(np, "numpy is not installed")
+class MemoryMappedColumnsTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        rows = 10000
+        generator = np.random.default_rng(20)
+        self.columns = {
+            'x': generator.integers(0, 100, rows),
+            'Name': np.array(['a', 'bb', 'ccc'])[
+                generator.integers(0, 3, rows)],
+            'flag': generator.random(rows) < 0.5,
+        }
+        for name, column in self.columns.items():
+            np.save(os.path.join(self.directory, name + '.npy'), column)
+
+    def test_directory_of_columns(self):
+        text = "x > 42 and name != 'bb' or not flag"
+        expected = evaluate_columns(text, self.columns).tolist()
+        for chunk_bytes in (1, 10 ** 4, vectorized.CHUNK_BYTES):
+            self.assertEqual(
+                evaluate_npy(text, self.directory, chunk_bytes).tolist(),
+                expected)
+
+    def test_only_used_columns_are_opened(self):
+        with open(os.path.join(self.directory, 'broken.npy'), 'w') as f:
+            f.write('not an array')
+        self.assertEqual(evaluate_npy('x > 42', self.directory).tolist(),
+                         (self.columns['x'] > 42).tolist())
+        self.assertEqual(evaluate_npy('true', self.directory + '/x.npy')
+                         .tolist(), [True] * 10000)
+        with self.assertRaises(ValueError):
+            evaluate_npy('broken', self.directory)
+
+    def test_structured_file(self):
+        table = np.zeros(1000, dtype=[('x', 'i8'), ('y', 'f4')])
+        table['x'] = np.arange(1000)
+        path = os.path.join(self.directory, 'table.npy')
+        np.save(path, table)
+        out = np.lib.format.open_memmap(
+            os.path.join(self.directory, 'mask.npy'), mode='w+',
+            dtype=bool, shape=(1000,))
+        evaluate_npy('x >= 10 and not y', path, chunk_bytes=100, out=out)
+        self.assertEqual(int(out.sum()), 990)
+
+    def test_chunks_span_whole_pages(self):
+        columns = [np.zeros(1, dtype=dtype) for dtype in ('i8', 'U3', '?')]
+        rows = vectorized.chunk_rows(columns, 10 ** 6)
+        for column in columns:
+            self.assertEqual(rows * column.dtype.itemsize % mmap.PAGESIZE,
+                             0)
@@ -24,6 +24,13 @@ ValueType = Optional[Union[str, bool, int, float]]
 
 
 class Token:
+    """Lexical token.
+
+    Operator and keyword tokens are shared flyweights, so tokens must never
+    be modified.
+    """
+    __slots__ = ('type', 'value')
+
     def __init__(self, type: str, value: ValueType) -> None:
         self.type: str = type
         self.value: ValueType = value
@@ -37,7 +44,9 @@ class Token:
         return hash((self.type, self.value))
 
     def __eq__(self, other) -> bool:
-        return self.__hash__() == other.__hash__()
+        if not isinstance(other, Token):
+            return NotImplemented
+        return self.type == other.type and self.value == other.value
 
     def stringify(self) -> str:
         return str(self.value).lower()
@@ -73,6 +82,14 @@ RESERVED_KEYWORDS: Dict[str, Token] = {
     'FALSE': Token(BOOL, False),
 }
 
+EOF_TOKEN = Token(EOF, None)
+NOT_TOKEN = RESERVED_KEYWORDS['NOT']
+
+
+def bool_token(value: bool) -> Token:
+    return RESERVED_KEYWORDS['TRUE' if value else 'FALSE']
+
+
 abstract_syntax: Dict[str, str] = OrderedDict((
     ('==', EQ),
     ('!=', NE),
@@ -0,0 +1,369 @@
+"""Evaluation of an expression over columns of NumPy arrays at once.
+
+Requires numpy, installed with `pip install bamboolean[numpy]`.
+"""
+import math
+import mmap
+import os
+from typing import Any, Callable, Dict, Generator, Iterable, List, \
+    NoReturn, Optional, Tuple, Union
+
+from . import tokens as tok
+from .ast import AST, BinOp, Constraint, TokenBasedAST, UnaryOp, \
+    chain_operands
+from .exceptions import BambooleanRuntimeError
+from .interpreter import rel_ops
+from .node_visitor import NodeVisitor
+from .walkers import VarsExtractor
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None  # type: ignore
+
+Mask = Any  # boolean numpy.ndarray
+# truth of every row, and rows for which the interpreter would raise
+Result = Tuple[Mask, Optional[Mask]]
+
+NUMERIC_KINDS = 'biuf'
+STRING_KINDS = 'U'
+
+# share of undecided rows below which operands are evaluated for them only
+COMPACT_BELOW = 0.25
+
+# bytes of all used columns evaluated at once by `evaluate_chunked`
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def as_columns(data: Any) -> Dict[str, Any]:
+    """Arrays keyed by upper-cased names, from a mapping or structured array"""
+    names = getattr(getattr(data, 'dtype', None), 'names', None)
+    if names:
+        return {name.upper(): data[name] for name in names}
+    return {str(name).upper(): np.asarray(column)
+            for name, column in data.items()}
+
+
+class VectorizedEvaluator(NodeVisitor):
+    """Evaluate the tree for every row of the columns, giving a bool mask.
+
+    Each constraint is a single comparison of a column, and boolean
+    operators combine masks with `&`, `|` and `~`. Like the interpreter,
+    chains short-circuit: an operand is evaluated only for the rows which
+    previous operands left undecided. The mask is the truth
+    value `Interpreter` gives for each row: missing variables are `''`,
+    bare variables have Python truthiness. Columns of numbers or strings
+    are compared by NumPy; other columns, e.g. of objects, are compared
+    value by value in Python.
+
+    Rows for which the interpreter would raise, e.g. comparing a string
+    with a number in a branch the row reaches, are tracked, and the
+    exception of the first such row is raised.
+    """
+    def __init__(self, tree: AST, columns: Any,
+                 size: Optional[int] = None) -> None:
+        if np is None:
+            raise ImportError("Vectorized evaluation requires numpy")
+        self.tree = tree
+        self.columns = as_columns(columns)
+        sizes = {len(column) for column in self.columns.values()}
+        if size is not None:
+            sizes.add(size)
+        if len(sizes) != 1:
+            raise ValueError("Columns must have the same, known length")
+        self.size = sizes.pop()
+        # indexes of the selected rows, all rows if None; masks of visit
+        # methods cover selected rows only
+        self.rows: Optional[Any] = None
+        # indexes of rows for which an exception was raised
+        self.failures: List[Tuple[Any, Exception]] = []
+
+    def evaluate(self) -> Mask:
+        truth, errors = self.visit(self.tree)
+        if errors is not None and errors.any():
+            row = int(errors.argmax())
+            for rows, exception in self.failures:
+                if (rows == row).any():
+                    raise exception
+            self.error("Row {} failed".format(row))
+        return truth
+
+    def error(self, extra='') -> NoReturn:
+        raise BambooleanRuntimeError(
+            "Runtime error occured. {extra}".format(extra=extra))
+
+    def column(self, name: str) -> Optional[Any]:
+        """Values of the variable in selected rows, None if it's missing"""
+        column = self.columns.get(name)
+        if column is None or self.rows is None:
+            return column
+        return column[self.rows]
+
+    def full(self, value: bool) -> Result:
+        return np.full(self.size, value, dtype=bool), None
+
+    def failed(self, exception: Exception, errors: Optional[Mask] = None
+               ) -> Result:
+        if errors is None:
+            errors = np.ones(self.size, dtype=bool)
+        rows = np.flatnonzero(errors)
+        if self.rows is not None:
+            rows = self.rows[rows]
+        self.failures.append((rows, exception))
+        return np.zeros(self.size, dtype=bool), errors
+
+    def scalar(self, compute: Callable[[], Any]) -> Result:
+        """Same truth for every row, e.g. of a missing variable"""
+        try:
+            return self.full(bool(compute()))
+        except Exception as exception:
+            return self.failed(exception)
+
+    def elementwise(self, values: Iterable[Any],
+                    compute: Callable[[Any], Any]) -> Result:
+        truth = np.zeros(self.size, dtype=bool)
+        errors = None
+        first: Optional[Exception] = None
+        for row, value in enumerate(values):
+            try:
+                truth[row] = bool(compute(value))
+            except Exception as exception:
+                if errors is None:
+                    errors = np.zeros(self.size, dtype=bool)
+                    first = exception
+                errors[row] = True
+        if first is not None:
+            self.failed(first, errors)
+        return truth, errors
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, Any, Result]:
+        """Evaluate operands only for rows the previous ones didn't decide.
+
+        When few rows are undecided, the next operand is evaluated for
+        those rows alone, selected by their indexes.
+        """
+        op_type = node.op.type
+        if op_type not in (tok.AND, tok.OR):
+            self.error("Could not evaluate binary operator")
+        conjunction = op_type == tok.AND
+        operands = chain_operands(node)
+        truth, errors = yield operands[0]
+        for operand in operands[1:]:
+            undecided = truth if conjunction else ~truth
+            if errors is not None:
+                undecided = undecided & ~errors
+            count = int(np.count_nonzero(undecided))
+            if not count:
+                break
+
+            if count > self.size * COMPACT_BELOW:
+                value, value_errors = yield operand
+                if value_errors is not None:
+                    reached = value_errors & undecided
+                    errors = reached if errors is None else errors | reached
+                truth = truth & value if conjunction else truth | value
+                continue
+
+            positions = np.flatnonzero(undecided)
+            rows, size = self.rows, self.size
+            self.rows = positions if rows is None else rows[positions]
+            self.size = count
+            try:
+                value, value_errors = yield operand
+            finally:
+                self.rows, self.size = rows, size
+            truth = np.zeros(size, dtype=bool) if conjunction \
+                else truth.copy()
+            truth[positions] = value
+            if value_errors is not None:
+                reached = np.zeros(size, dtype=bool)
+                reached[positions] = value_errors
+                errors = reached if errors is None else errors | reached
+        return truth, errors
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Generator[AST, Any, Result]:
+        if node.op.type != tok.NOT:
+            self.error("Could not evaluate unary operator")
+        truth, errors = yield node.right
+        return ~truth, errors
+
+    def visit_Constraint(self, node: Constraint) -> Result:
+        op_type = node.rel_op.type
+        compare = rel_ops[op_type]
+        literal = node.value.value
+        column = self.column(str(node.var.value))
+        if column is None:
+            return self.scalar(lambda: compare('', literal))
+
+        kind = column.dtype.kind
+        is_number = isinstance(literal, (int, float))
+        if kind in NUMERIC_KINDS and is_number \
+                or kind in STRING_KINDS and isinstance(literal, str):
+            return compare(column, literal), None
+        if kind in NUMERIC_KINDS + STRING_KINDS and self.size:
+            # numbers and strings are never equal, nor ordered
+            if op_type in (tok.EQ, tok.NE):
+                return self.full(op_type == tok.NE)
+            try:
+                compare(column[0].item(), literal)
+            except TypeError as exception:
+                return self.failed(exception)
+        return self.elementwise(column.tolist(),
+                                lambda value: compare(value, literal))
+
+    def visit_Var(self, node: TokenBasedAST) -> Result:
+        column = self.column(str(node.value))
+        if column is None:
+            return self.full(False)  # missing variables are ''
+        kind = column.dtype.kind
+        if kind == 'b':
+            return column, None
+        if kind in NUMERIC_KINDS:
+            return column != 0, None
+        if kind in STRING_KINDS:
+            return np.char.str_len(column) > 0, None
+        return self.elementwise(column.tolist(), bool)
+
+    def _constant(self, node: TokenBasedAST) -> Result:
+        return self.full(bool(node.value))
+
+    visit_Num = visit_Bool = visit_String = _constant
+
+    def visit_NoOp(self, node) -> Result:
+        return self.full(True)  # no expression should evaluate to true
+
+
+class NpyColumn:
+    """Column of a `.npy` file, memory-mapped a slice of rows at a time.
+
+    Only the header is read when it's created. Slicing maps the rows into
+    memory, and they are unmapped once the slice isn't used anymore, so
+    columns larger than memory can be evaluated chunk by chunk. `field`
+    selects a field of a structured array.
+    """
+    def __init__(self, path: str, field: Optional[str] = None) -> None:
+        if np is None:
+            raise ImportError("Vectorized evaluation requires numpy")
+        with open(path, 'rb') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            self.offset = f.tell()
+        shape, fortran_order, self.record = header
+        if len(shape) != 1 or self.record.hasobject:
+            raise ValueError("Not a column of values: {}".format(path))
+        self.path = path
+        self.field = field
+        self.size = shape[0]
+        self.itemsize = self.record.itemsize  # bytes of a row in the file
+        self.dtype = self.record if field is None else self.record[field]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, rows: slice) -> Any:
+        start, stop, _ = rows.indices(self.size)
+        if stop <= start:
+            return np.empty(0, dtype=self.dtype)
+        array = np.memmap(self.path, dtype=self.record, mode='r',
+                          offset=self.offset + start * self.itemsize,
+                          shape=(stop - start,))
+        return array if self.field is None else array[self.field]
+
+
+def open_npy(source: Union[str, 'os.PathLike[str]'],
+             names: Optional[Iterable[str]] = None) -> Dict[str, NpyColumn]:
+    """Columns keyed by upper-cased names, none of them read yet.
+
+    `source` is a `.npy` file, of a structured array or of a single
+    column named after the file, or a directory of `<name>.npy` column
+    files. Only columns in `names` are opened, if given.
+    """
+    wanted = None if names is None else {name.upper() for name in names}
+    if os.path.isdir(source):
+        paths = {
+            entry.name[:-len('.npy')].upper(): entry.path
+            for entry in os.scandir(source) if entry.name.endswith('.npy')
+        }
+        if wanted is not None:
+            paths = {name: path for name, path in paths.items()
+                     if name in wanted}
+    else:
+        name = os.path.basename(os.fspath(source))
+        paths = {os.path.splitext(name)[0].upper(): os.fspath(source)}
+
+    columns: Dict[str, NpyColumn] = {}
+    for name, path in paths.items():
+        column = NpyColumn(path)
+        fields = column.record.names
+        if fields:
+            columns.update((field.upper(), NpyColumn(path, field))
+                           for field in fields)
+        else:
+            columns[name] = column
+    if wanted is not None:
+        columns = {name: column for name, column in columns.items()
+                   if name in wanted}
+    return columns
+
+
+def chunk_rows(columns: Iterable[Any], chunk_bytes: int = CHUNK_BYTES
+               ) -> int:
+    """Rows per chunk spanning whole memory pages of every column"""
+    itemsizes = [column.itemsize for column in columns]
+    unit = 1
+    for itemsize in itemsizes:
+        pages = mmap.PAGESIZE // math.gcd(mmap.PAGESIZE, itemsize)
+        unit = unit * pages // math.gcd(unit, pages)
+    rows = chunk_bytes // max(sum(itemsizes), 1)
+    return max(rows // unit, 1) * unit
+
+
+def evaluate_chunked(tree: AST, columns: Any, size: Optional[int] = None,
+                     chunk_bytes: int = CHUNK_BYTES,
+                     out: Optional[Mask] = None) -> Mask:
+    """Evaluate the tree for consecutive chunks of rows of the columns.
+
+    Columns are arrays, e.g. memory-mapped, or `NpyColumn`, sliced for
+    every chunk without copying, so only a chunk of them is paged in at a
+    time. The mask is written to `out` if given, which may be
+    memory-mapped too.
+    """
+    if getattr(getattr(columns, 'dtype', None), 'names', None):
+        columns = as_columns(columns)
+    else:
+        columns = {str(name).upper(): column
+                   for name, column in columns.items()}
+    if size is None:
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) != 1:
+            raise ValueError("Columns must have the same, known length")
+        size = sizes.pop()
+    if out is None:
+        out = np.empty(size, dtype=bool)
+    rows = chunk_rows(columns.values(), chunk_bytes)
+    for start in range(0, size, rows):
+        stop = min(start + rows, size)
+        chunk = {name: column[start:stop]
+                 for name, column in columns.items()}
+        out[start:stop] = VectorizedEvaluator(
+            tree, chunk, stop - start).evaluate()
+    return out
+
+
+def evaluate_npy(tree: AST, source: Union[str, 'os.PathLike[str]'],
+                 chunk_bytes: int = CHUNK_BYTES,
+                 out: Optional[Mask] = None) -> Mask:
+    """Evaluate the tree over `.npy` columns, mapped a chunk at a time.
+
+    Only columns of variables used by the expression are opened.
+    """
+    columns = open_npy(source, VarsExtractor(tree).extract())
+    size = None
+    if not columns:  # the number of rows is still needed
+        every = open_npy(source)
+        if every:
+            size = len(next(iter(every.values())))
+    return evaluate_chunked(tree, columns, size, chunk_bytes, out)
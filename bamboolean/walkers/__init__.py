@@ -1,2 +1,4 @@
 from .vars_extractor import VarsExtractor  # noqa
 from .normalize import ExprNormalizer  # noqa
+from .optimize import ExprOptimizer  # noqa
+from .partial import PartialEvaluator, partial_evaluate  # noqa
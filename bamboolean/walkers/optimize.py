@@ -0,0 +1,278 @@
+from typing import Any, Dict, Generator, Hashable, List, Optional, Tuple
+
+from bamboolean.node_visitor import NodeVisitor
+from bamboolean.ast import AST, BinOp, Bool, Constraint, Num, String, \
+    UnaryOp, Var, chain_operands
+from bamboolean.interpreter import rel_ops
+from bamboolean import tokens as tok
+
+TRUE = Bool(tok.bool_token(True))
+FALSE = Bool(tok.bool_token(False))
+
+LOWER_BOUNDS = (tok.GT, tok.GTE)
+UPPER_BOUNDS = (tok.LT, tok.LTE)
+
+
+def constant_truth(node: AST) -> Optional[bool]:
+    """Truth value of a constant, None for other nodes"""
+    if isinstance(node, (Num, Bool, String)):
+        return bool(node.value)
+    return None
+
+
+def operand_key(node: AST) -> Optional[Hashable]:
+    """Key of a leaf equal to other leaves with the same key"""
+    if isinstance(node, Constraint):
+        value = node.value.token
+        return (node.var.value, node.rel_op.type, value.type, value.value)
+    if isinstance(node, Var):
+        return node.value
+    return None
+
+
+def is_number(value: Any) -> bool:
+    return isinstance(value, (int, float))  # bool included
+
+
+def holds(constraint: Constraint, value: Any) -> bool:
+    return rel_ops[constraint.rel_op.type](value, constraint.value.value)
+
+
+def tighter(node: Constraint, other: Optional[Constraint]) -> bool:
+    """Whether the bound `node` is stricter than `other` in its direction"""
+    if other is None:
+        return True
+    value: Any = node.value.value
+    other_value: Any = other.value.value
+    if value == other_value:
+        return node.rel_op.type in (tok.GT, tok.LT) \
+            and other.rel_op.type in (tok.GTE, tok.LTE)
+    if node.rel_op.type in LOWER_BOUNDS:
+        return value > other_value
+    return value < other_value
+
+
+def with_op(constraint: Constraint, op_type: str) -> Constraint:
+    op = tok.abstract_tokens_map[op_type]
+    return Constraint(constraint.var, op, constraint.value)
+
+
+def build_chain(operands: List[AST], op: tok.Token) -> AST:
+    node = operands[0]
+    for operand in operands[1:]:
+        node = BinOp(node, op, operand)
+    return node
+
+
+def intersect(members: List[Constraint]) -> Optional[List[Constraint]]:
+    """Constraints equivalent to all of `members` for numbers.
+
+    None if no value satisfies all of them.
+    """
+    lower: Optional[Constraint] = None
+    upper: Optional[Constraint] = None
+    equal: Optional[Constraint] = None
+    not_equal: List[Constraint] = []
+    for node in members:
+        op_type = node.rel_op.type
+        if op_type == tok.EQ:
+            if equal is not None and equal.value.value != node.value.value:
+                return None
+            equal = equal or node
+        elif op_type == tok.NE:
+            not_equal.append(node)
+        elif op_type in LOWER_BOUNDS:
+            lower = node if tighter(node, lower) else lower
+        else:
+            upper = node if tighter(node, upper) else upper
+
+    bounds = [bound for bound in (lower, upper) if bound is not None]
+    if equal is not None:
+        value = equal.value.value
+        if bounds and not is_number(value):
+            return None  # strings are not comparable with numbers
+        if not all(holds(node, value) for node in bounds + not_equal):
+            return None
+        return [equal]
+
+    if lower is not None and upper is not None:
+        low: Any = lower.value.value
+        high: Any = upper.value.value
+        if low > high:
+            return None
+        if low == high:
+            if tok.GT in (lower.rel_op.type, upper.rel_op.type) \
+                    or tok.LT in (lower.rel_op.type, upper.rel_op.type):
+                return None
+            return [with_op(lower, tok.EQ)]
+    if bounds:
+        # numbers are never equal to other values, nor to ones out of bounds
+        not_equal = [
+            node for node in not_equal
+            if is_number(node.value.value)
+            and all(holds(bound, node.value.value) for bound in bounds)
+        ]
+    return bounds + not_equal
+
+
+class ExprOptimizer(NodeVisitor):
+    """Simplify an expression without changing its truth value.
+
+    Constants are folded, comparisons of the same variable are merged or
+    dropped when subsumed within AND and OR chains, and always true or
+    always false subtrees are collapsed:
+
+        x > 5 AND x > 10 AND 444    ->  x > 10
+        x < 3 AND x > 7 OR y        ->  y
+
+    For every record which the original expression evaluates without an
+    exception, the optimized one doesn't raise either and has the same
+    truth value. Values returned by AND may differ, e.g. `x AND 1` is
+    reduced to `x`.
+    """
+    def __init__(self, tree: AST) -> None:
+        self.tree = tree
+
+    def optimize(self) -> AST:
+        return self.visit(self.tree)
+
+    def generic_visit(self, node: AST) -> AST:
+        return node
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Generator[AST, Any, AST]:
+        if node.op.type != tok.NOT:
+            return node
+        right = yield node.right
+        truth = constant_truth(right)
+        if truth is not None:
+            return FALSE if truth else TRUE
+        if isinstance(right, UnaryOp) and right.op.type == tok.NOT:
+            return right.right
+        if right is node.right:
+            return node
+        return UnaryOp(node.op, right)
+
+    def visit_BinOp(self, node: BinOp) -> Generator[AST, Any, AST]:
+        op_type = node.op.type
+        if op_type not in (tok.AND, tok.OR):
+            return node
+        original = chain_operands(node)
+        operands: List[AST] = []
+        for operand in original:
+            operand = yield operand
+            if isinstance(operand, BinOp) and operand.op.type == op_type:
+                operands.extend(chain_operands(operand))
+            else:
+                operands.append(operand)
+
+        conjunction = op_type == tok.AND
+        kept: List[AST] = []
+        seen = set()
+        for operand in operands:
+            truth = constant_truth(operand)
+            if truth is not None:
+                if truth != conjunction:  # false in AND, true in OR
+                    return TRUE if truth else FALSE
+                continue
+            key = operand_key(operand)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(operand)
+
+        if conjunction:
+            merged = self.merge_conjunction(kept)
+            if merged is None:
+                return FALSE
+            kept = merged
+        else:
+            kept = self.merge_disjunction(kept)
+
+        if not kept:
+            return TRUE if conjunction else FALSE
+        if len(kept) == 1:
+            return kept[0]
+        if len(kept) == len(original) \
+                and all(a is b for a, b in zip(kept, original)):
+            return node
+        return build_chain(kept, node.op)
+
+    @staticmethod
+    def merge_conjunction(operands: List[AST]) -> Optional[List[AST]]:
+        """Merge constraints on the same variable, None on a contradiction.
+
+        The merged constraints take the place of the first one which isn't
+        `!=`; constraints before it are never reordered, so a record
+        reaching the merged ones has either a number or fails on `==`.
+        """
+        groups: Dict[Any, List[Tuple[int, Constraint]]] = {}
+        for position, node in enumerate(operands):
+            if isinstance(node, Constraint) and (
+                    node.rel_op.type in (tok.EQ, tok.NE)
+                    or isinstance(node.value, Num)):
+                groups.setdefault(node.var.value, []).append((position, node))
+
+        replaced: Dict[int, List[AST]] = {}
+        for group in groups.values():
+            members = [node for _, node in group]
+            anchor = next((i for i, node in enumerate(members)
+                           if node.rel_op.type != tok.NE), None)
+            if len(group) < 2 or anchor is None:
+                continue
+            merged = intersect(members)
+            if merged is None:
+                return None
+            before = {operand_key(node) for node in members[:anchor]}
+            replaced[group[anchor][0]] = [
+                node for node in merged if operand_key(node) not in before]
+            for position, _ in group[anchor + 1:]:
+                replaced[position] = []
+
+        result: List[AST] = []
+        for position, node in enumerate(operands):
+            result.extend(replaced.get(position, [node]))
+        return result
+
+    @staticmethod
+    def merge_disjunction(operands: List[AST]) -> List[AST]:
+        """Keep the weakest bound of a variable in each direction.
+
+        The bound takes the place of the first comparison in its direction,
+        and `==` constraints after it, which the bound covers, are dropped.
+        """
+        bounds: Dict[Tuple[Any, bool], List[Tuple[int, Constraint]]] = {}
+        equal: Dict[Any, List[Tuple[int, Constraint]]] = {}
+        for position, node in enumerate(operands):
+            if not isinstance(node, Constraint) \
+                    or not isinstance(node.value, Num):
+                continue
+            op_type, var = node.rel_op.type, node.var.value
+            if op_type == tok.EQ:
+                equal.setdefault(var, []).append((position, node))
+            elif op_type != tok.NE:
+                direction = (var, op_type in LOWER_BOUNDS)
+                bounds.setdefault(direction, []).append((position, node))
+
+        replaced: Dict[int, List[AST]] = {}
+        for (var, lower), group in bounds.items():
+            first, weakest = group[0]
+            for position, node in group[1:]:
+                replaced[position] = []
+                if tighter(weakest, node):
+                    weakest = node
+            for position, node in equal.get(var, []):
+                value = node.value.value
+                if position < first:
+                    continue
+                if holds(weakest, value):
+                    replaced[position] = []
+                elif value == weakest.value.value:
+                    replaced[position] = []
+                    weakest = with_op(weakest, tok.GTE if lower else tok.LTE)
+            replaced[first] = [weakest]
+
+        result: List[AST] = []
+        for position, node in enumerate(operands):
+            result.extend(replaced.get(position, [node]))
+        return result
@@ -0,0 +1,59 @@
+from typing import Any, Mapping
+
+from bamboolean.ast import AST, Constraint, TokenBasedAST
+from bamboolean.interpreter import rel_ops
+from bamboolean.lazy import Lazy
+from .optimize import ExprOptimizer, FALSE, TRUE
+
+
+class PartialEvaluator(ExprOptimizer):
+    """Substitute known variables and simplify the rest of the expression.
+
+    Leaves reading a known variable are replaced by their truth value and
+    the tree is optimized, leaving a residual expression of the unknown
+    variables only, or a constant:
+
+        tenant == 'acme' AND x > 5   with tenant 'acme'   ->  x > 5
+        region == 'eu' OR vip        with region 'eu'     ->  true
+
+    For every record which the original expression evaluates without an
+    exception together with the known variables, the residual one has
+    the same truth value. A comparison of a known value raising TypeError
+    is taken as false, as records reaching it raise anyway.
+
+    Known values may be Lazy; each is computed once, when a leaf reading
+    it is reached, and not at all when the tree does not read it.
+    """
+    def __init__(self, tree: AST, known_vars: Mapping[str, Any]) -> None:
+        super().__init__(tree)
+        self.known_vars = {k.upper(): v for k, v in known_vars.items()}
+
+    def evaluate(self) -> AST:
+        return self.optimize()
+
+    def known(self, name: str) -> Any:
+        value = self.known_vars[name]
+        if type(value) is Lazy:
+            value = self.known_vars[name] = value.func()
+        return value
+
+    def visit_Constraint(self, node: Constraint) -> AST:
+        name = node.var.value
+        if name not in self.known_vars:
+            return node
+        try:
+            truth = rel_ops[node.rel_op.type](self.known(name),
+                                              node.value.value)
+        except TypeError:
+            return FALSE
+        return TRUE if truth else FALSE
+
+    def visit_Var(self, node: TokenBasedAST) -> AST:
+        if node.value not in self.known_vars:
+            return node
+        return TRUE if self.known(str(node.value)) else FALSE
+
+
+def partial_evaluate(tree: AST, known_vars: Mapping[str, Any]) -> AST:
+    """Residual tree of the expression with `known_vars` substituted"""
+    return PartialEvaluator(tree, known_vars).evaluate()
@@ -1,4 +1,4 @@
-from typing import Set
+from typing import Any, Generator, Set
 from bamboolean.node_visitor import NodeVisitor
 from bamboolean.ast import AST, TokenBasedAST
 
@@ -15,8 +15,16 @@ class VarsExtractor(NodeVisitor):
     def visit_Constraint(self, node) -> Set[str]:
         return self.visit(node.var)
 
-    def visit_BinOp(self, node) -> Set[str]:
-        return self.visit(node.left) | self.visit(node.right)
+    def visit_BinOp(self, node) -> Generator[AST, Any, Set[str]]:
+        left = yield node.left
+        right = yield node.right
+        if len(left) < len(right):
+            left, right = right, left
+        left |= right  # sets are created by the visit, safe to update
+        return left
+
+    def visit_UnaryOp(self, node) -> Generator[AST, Any, Set[str]]:
+        return (yield node.right)
 
     def visit_Var(self, node: TokenBasedAST) -> Set[str]:
         return {str(node.value)}
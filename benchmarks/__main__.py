@@ -0,0 +1,74 @@
+"""Benchmark suite of every stage, from lexing to end to end evaluation.
+
+Usage:
+    python -m benchmarks run [-o results.json] [--repeat N] [case ...]
+    python -m benchmarks compare baseline.json results.json [--threshold F]
+
+`compare` exits with status 1 when any timing regressed.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from . import suite
+
+
+def run(args: argparse.Namespace) -> int:
+    unknown = set(args.cases) - set(suite.cases)
+    if unknown:
+        print('Unknown cases: {}'.format(', '.join(sorted(unknown))))
+        return 2
+    results = suite.run(
+        args.cases, args.repeat,
+        lambda key, seconds: print('{:<24} {:12.3f} ms'.format(
+            key, seconds * 1e3)))
+    if args.output:
+        suite.save(results, args.output)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = suite.load(args.baseline)
+    current = suite.load(args.current)
+    rows = suite.compare(baseline, current, args.threshold)
+    print('{:<24} {:>12} {:>12} {:>8}'.format(
+        '', 'baseline ms', 'current ms', 'change'))
+    for key, before, after, regressed in rows:
+        # stages below the timer resolution take no time
+        change = '{:+7.1%}'.format(after / before - 1) if before else 'n/a'
+        print('{:<24} {:12.3f} {:12.3f} {:>8}{}'.format(
+            key, before * 1e3, after * 1e3, change,
+            '  REGRESSION' if regressed else ''))
+    missing = set(baseline['timings']) ^ set(current['timings'])
+    if missing:
+        print('Not compared: {}'.format(', '.join(sorted(missing))))
+    return 1 if any(regressed for *_, regressed in rows) else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='time the stages')
+    run_parser.add_argument('cases', nargs='*',
+                            help='cases to run: {}'.format(
+                                ', '.join(suite.cases)))
+    run_parser.add_argument('-o', '--output', help='save results as JSON')
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser(
+        'compare', help='flag regressions against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='allowed slowdown, e.g. 0.1 for 10%%')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Adaptive reordering of rules whose most selective check comes last.
+
+Records are upper-cased beforehand, so that only evaluation is measured.
+
+Usage: python -m benchmarks.adaptive [rules] [records]
+"""
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from bamboolean.compiler import compile_closures
+from bamboolean.factories import compile_adaptive, parse
+from .corpus import generate_record
+
+FEATURES = 20
+
+
+def generate_late_rule(rng: random.Random, clauses: int = 8) -> str:
+    """Conjunction of broad numeric checks ending with a selective one"""
+    terms = ['feature_{} >= {}'.format(rng.randrange(1, FEATURES, 2),
+                                       rng.randrange(100))
+             for _ in range(clauses - 1)]
+    terms.append("feature_{} == 'value_{}'".format(
+        rng.randrange(0, FEATURES, 2), rng.randrange(50)))
+    return ' and '.join(terms)
+
+
+def per_evaluation(evaluators: List[Callable[[dict], Any]],
+                   table: List[Dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    for record in table:
+        for evaluate in evaluators:
+            evaluate(record)
+    return (time.perf_counter() - start) / len(evaluators) / len(table) * 1e6
+
+
+def main(rules: int = 1000, records: int = 200) -> None:
+    rng = random.Random(0)
+    texts = [generate_late_rule(rng) for _ in range(rules)]
+    table = [{k.upper(): v for k, v in generate_record(rng).items()}
+             for _ in range(records)]
+
+    closures = [compile_closures(parse(text)) for text in texts]
+    print('closure:            {:6.2f} us per evaluation'.format(
+        per_evaluation(closures, table)))
+
+    adaptive = [compile_adaptive(text, sample_every=8, reorder_every=8)
+                for text in texts]
+    # evaluate() folds the case of whole records, sampled or not
+    print('adaptive, training: {:6.2f} us per evaluation'.format(
+        per_evaluation([e.evaluate for e in adaptive], table)))
+    print('adaptive, trained:  {:6.2f} us per evaluation'.format(
+        per_evaluation([e._predicate for e in adaptive], table)))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
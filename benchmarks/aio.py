@@ -0,0 +1,67 @@
+"""Latency of evaluate_async with variables behind a slow backend.
+
+Usage: python -m benchmarks.aio [rules] [latency_ms]
+"""
+import asyncio
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from bamboolean.aio import evaluate_async
+from bamboolean.compiler import CompiledExpression
+from bamboolean.factories import compile
+from .corpus import generate_record, generate_rule
+
+
+class Backend:
+    def __init__(self, record: Dict[str, Any], latency: float) -> None:
+        self.record = {k.upper(): v for k, v in record.items()}
+        self.latency = latency
+        self.round_trips = 0
+
+    async def fetch(self, name: str) -> Any:
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+        return self.record[name]
+
+    async def fetch_many(self, names: List[str]) -> Dict[str, Any]:
+        self.round_trips += 1
+        await asyncio.sleep(self.latency)
+        return {name: self.record[name] for name in names
+                if name in self.record}
+
+
+async def measure(name: str, expressions: List[CompiledExpression],
+                  record: Dict[str, Any], latency: float,
+                  **options: Any) -> None:
+    backend = Backend(record, latency)
+    resolver = backend.fetch_many if options.get('batched') \
+        else backend.fetch
+    start = time.perf_counter()
+    for expression in expressions:
+        await evaluate_async(expression, resolver, **options)
+    each = (time.perf_counter() - start) / len(expressions)
+    print('{:<24}{:8.1f} ms/rule {:6.1f} round trips/rule'.format(
+        name + ':', each * 1e3, backend.round_trips / len(expressions)))
+
+
+async def run(rules: int, latency: float) -> None:
+    rng = random.Random(0)
+    expressions = [compile(generate_rule(rng)) for _ in range(rules)]
+    record = generate_record(rng)
+    await measure('in order', expressions, record, latency)
+    await measure('in order, batched', expressions, record, latency,
+                  batched=True)
+    await measure('speculative', expressions, record, latency,
+                  speculative=True)
+    await measure('speculative, batched', expressions, record, latency,
+                  batched=True, speculative=True)
+
+
+def main(rules: int = 50, latency_ms: float = 5) -> None:
+    asyncio.run(run(rules, latency_ms / 1e3))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
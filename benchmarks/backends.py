@@ -0,0 +1,66 @@
+"""Evaluation time of Interpreter and compiled backends.
+
+`evaluate` includes case-folding of the record keys on every call,
+`core` evaluates against records which are already upper-cased.
+
+Usage: python -m benchmarks.backends [rules] [records]
+"""
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+from bamboolean.factories import parse
+from bamboolean.compiler import CompiledExpression, backends
+from bamboolean.interpreter import Interpreter
+from .corpus import generate_rule, generate_record
+
+
+def per_evaluation(run: Callable[[], Iterable[Any]], count: int) -> float:
+    start = time.perf_counter()
+    for _ in run():
+        pass
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def interpreter_core(trees: List[Any], records: List[Dict[str, Any]]
+                     ) -> Iterable[Any]:
+    interpreter = Interpreter(trees[0], {})
+    for record in records:
+        interpreter.symbol_table = record
+        for tree in trees:
+            interpreter.tree = tree
+            yield interpreter.interpret()
+
+
+def main(rules: int = 1000, records: int = 50) -> None:
+    rng = random.Random(0)
+    texts = [generate_rule(rng) for _ in range(rules)]
+    trees = [parse(text) for text in texts]
+    table = [generate_record(rng) for _ in range(records)]
+    upper_table = [{k.upper(): v for k, v in r.items()} for r in table]
+    count = rules * records
+
+    print('{:<12} {:>10} {:>10}  (us per evaluation)'.format(
+        '', 'evaluate', 'core'))
+    evaluate = per_evaluation(lambda: (
+        Interpreter(tree, record).interpret()
+        for record in table for tree in trees), count)
+    core = per_evaluation(lambda: interpreter_core(trees, upper_table), count)
+    print('{:<12} {:10.2f} {:10.2f}'.format('interpreter', evaluate, core))
+
+    for backend, compile_tree in backends.items():
+        compiled = [CompiledExpression(text, tree, backend)
+                    for text, tree in zip(texts, trees)]
+        predicates = [compile_tree(tree) for tree in trees]
+        evaluate = per_evaluation(lambda: (
+            expression.evaluate(record)
+            for record in table for expression in compiled), count)
+        core = per_evaluation(lambda: (
+            predicate(record)
+            for record in upper_table for predicate in predicates), count)
+        print('{:<12} {:10.2f} {:10.2f}'.format(backend, evaluate, core))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
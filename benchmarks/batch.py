@@ -0,0 +1,32 @@
+"""Throughput of evaluate_many with an increasing number of workers.
+
+Usage: python -m benchmarks.batch [records] [max_workers]
+"""
+import os
+import random
+import sys
+import time
+
+from bamboolean.batch import evaluate_many
+from .corpus import generate_record, generate_rule
+
+
+def main(records: int = 200000, max_workers: int = 0) -> None:
+    rng = random.Random(0)
+    text = ' or '.join('({})'.format(generate_rule(rng)) for _ in range(20))
+    sample = [generate_record(rng) for _ in range(100)]
+    table = [sample[i % len(sample)] for i in range(records)]
+
+    workers = 1
+    while workers <= (max_workers or os.cpu_count() or 1):
+        start = time.perf_counter()
+        for _ in evaluate_many(text, table, workers=workers):
+            pass
+        elapsed = time.perf_counter() - start
+        print('{:>3} workers: {:10.0f} records/s'.format(
+            workers, records / elapsed))
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,123 @@
+"""Synthetic rules and records resembling a production rule corpus"""
+import random
+from typing import Any, Dict, Mapping
+
+FEATURES = 200
+
+# share of leaves comparing numbers, strings and booleans
+MIXED_LITERALS = {'number': 1, 'string': 1, 'bool': 1}
+
+
+def generate_rule(rng: random.Random, clauses: int = 6) -> str:
+    terms = []
+    for _ in range(clauses):
+        feature = rng.randrange(FEATURES)
+        name = 'feature_{}'.format(feature)
+        if rng.random() < 0.2:
+            terms.append('not {}'.format(name))
+        elif feature % 2:
+            terms.append('{} > {}'.format(name, rng.randrange(1000)))
+        else:
+            terms.append("{} == 'value_{}'".format(name, rng.randrange(50)))
+    half = clauses // 2
+    return ' and '.join(terms[:half]) + ' or ' + ' and '.join(terms[half:])
+
+
+def generate_segment_rule(rng: random.Random, clauses: int = 4) -> str:
+    """Conjunction of string equalities with one numeric threshold"""
+    features = rng.sample(range(0, FEATURES, 2), clauses - 1)
+    terms = ["feature_{} == 'value_{}'".format(feature, rng.randrange(50))
+             for feature in features]
+    terms.append('feature_{} > {}'.format(
+        rng.randrange(1, FEATURES, 2), rng.randrange(1000)))
+    return ' and '.join(terms)
+
+
+def generate_range_rule(rng: random.Random, ranges: int = 2) -> str:
+    """Conjunction of numeric ranges, like `x >= 17 and x < 52`"""
+    terms = []
+    for feature in rng.sample(range(1, FEATURES, 2), ranges):
+        low = rng.randrange(1000)
+        high = low + rng.randrange(1, 500)
+        terms.append('feature_{0} >= {1} and feature_{0} < {2}'.format(
+            feature, low, high))
+    return ' and '.join(terms)
+
+
+def generate_templated_rule(rng: random.Random, clauses: int = 4) -> str:
+    """Rule assembled from templates with flags and overlapping ranges"""
+    terms = []
+    for _ in range(clauses):
+        name = 'feature_{}'.format(rng.randrange(1, FEATURES, 2))
+        low = rng.randrange(1000)
+        kind = rng.randrange(4)
+        if kind == 0:  # switched by a flag substituted into the template
+            terms.append('{} and {} > {}'.format(
+                rng.choice(('true', 'false', '1', '0')), name, low))
+        elif kind == 1:  # default bound narrowed by a specific one
+            terms.append('{0} >= 0 and {0} < 1000 and {0} > {1}'.format(
+                name, low))
+        elif kind == 2:
+            terms.append('{0} > {1} and {0} < {2}'.format(
+                name, low, rng.randrange(1000)))
+        else:
+            terms.append('{} <= {}'.format(name, low))
+    return ' or '.join('({})'.format(term) for term in terms)
+
+
+def generate_leaf(rng: random.Random, literals: Mapping[str, int],
+                  variables: int = 20) -> str:
+    """Comparison of a variable with a literal of a kind drawn by weight.
+
+    Variables are named by the kind of their values, e.g. `number_3`.
+    """
+    kind = rng.choices(list(literals), weights=list(literals.values()))[0]
+    name = '{}_{}'.format(kind, rng.randrange(variables))
+    if kind == 'number':
+        return '{} {} {}'.format(name, rng.choice(('<', '<=', '>', '>=')),
+                                 rng.randrange(100))
+    if kind == 'string':
+        return "{} {} 'value_{}'".format(name, rng.choice(('==', '!=')),
+                                         rng.randrange(10))
+    if rng.random() < 0.5:
+        return name
+    return '{} == {}'.format(name, rng.choice(('true', 'false')))
+
+
+def generate_expression(rng: random.Random, depth: int, width: int,
+                        literals: Mapping[str, int] = MIXED_LITERALS) -> str:
+    """Chains of `width` operands, each nesting the next one, `depth` deep.
+
+    Levels alternate between AND and OR, some operands are negated.
+    """
+    text = generate_leaf(rng, literals)
+    for level in range(depth):
+        terms = [generate_leaf(rng, literals) for _ in range(width - 1)]
+        terms = ['not ' + term if rng.random() < 0.1 else term
+                 for term in terms]
+        terms.insert(rng.randrange(width), '({})'.format(text))
+        text = (' and ' if level % 2 else ' or ').join(terms)
+    return text
+
+
+def generate_typed_record(rng: random.Random, variables: int = 20
+                          ) -> Dict[str, Any]:
+    """Record with values of every variable of `generate_leaf`"""
+    record: Dict[str, Any] = {}
+    for i in range(variables):
+        record['number_{}'.format(i)] = rng.randrange(100)
+        record['string_{}'.format(i)] = 'value_{}'.format(rng.randrange(10))
+        record['bool_{}'.format(i)] = rng.random() < 0.5
+    return record
+
+
+def generate_record(rng: random.Random) -> Dict[str, Any]:
+    """Record with values comparable with constraints of `generate_rule`"""
+    record: Dict[str, Any] = {}
+    for i in range(FEATURES):
+        if i % 2:
+            record['feature_{}'.format(i)] = rng.randrange(1000)
+        else:
+            record['feature_{}'.format(i)] = 'value_{}'.format(
+                rng.randrange(50))
+    return record
@@ -0,0 +1,51 @@
+"""Parse and evaluate extremely deep and extremely long expressions.
+
+Usage: python -m benchmarks.deep_nesting [depth] [width]
+"""
+import sys
+import time
+from typing import Callable, Dict, TypeVar
+
+from bamboolean.factories import parse
+from bamboolean.interpreter import Interpreter
+from bamboolean.walkers import VarsExtractor, ExprNormalizer
+
+T = TypeVar('T')
+
+
+def nested_parentheses(depth: int) -> str:
+    return 'x and (' * depth + 'y' + ')' * depth
+
+
+def nested_not(depth: int) -> str:
+    return 'not (' * depth + 'x' + ')' * depth
+
+
+def flat_chain(width: int) -> str:
+    return ' and '.join('x{} < {}'.format(i % 100, i) for i in range(width))
+
+
+def timed(label: str, func: Callable[[], T]) -> T:
+    start = time.perf_counter()
+    result = func()
+    print('  {:<10} {:8.3f} s'.format(label, time.perf_counter() - start))
+    return result
+
+
+def run(name: str, text: str, symbol_table: Dict[str, object]) -> None:
+    print('{} ({} chars)'.format(name, len(text)))
+    tree = timed('parse', lambda: parse(text))
+    timed('interpret', lambda: Interpreter(tree, symbol_table).interpret())
+    timed('vars', lambda: VarsExtractor(tree).extract())
+    timed('normalize', lambda: ExprNormalizer(tree).normalize())
+
+
+def main(depth: int = 100000, width: int = 1000000) -> None:
+    run('nested parentheses', nested_parentheses(depth), {'x': 1, 'y': 1})
+    run('nested not', nested_not(depth), {'x': 1})
+    run('flat chain', flat_chain(width),
+        {'x{}'.format(i): -1 for i in range(100)})
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,44 @@
+"""Memory taken by parsed trees.
+
+Usage: python -m benchmarks.memory [rules]
+"""
+import random
+import sys
+import tracemalloc
+from typing import List
+
+from bamboolean.ast import AST
+from bamboolean.factories import parse
+from .corpus import generate_rule
+
+
+def count_nodes(tree: AST) -> int:
+    count, stack = 0, [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        for child in ('left', 'right', 'var', 'value'):
+            if isinstance(getattr(node, child, None), AST):
+                stack.append(getattr(node, child))
+    return count
+
+
+def main(rules: int = 50000) -> None:
+    rng = random.Random(0)
+    texts = [generate_rule(rng) for _ in range(rules)]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    trees: List[AST] = [parse(text) for text in texts]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    nodes = sum(count_nodes(tree) for tree in trees)
+    print('rules: {}, nodes: {}'.format(rules, nodes))
+    print('total: {:.1f} MiB'.format(size / 2 ** 20))
+    print('bytes per node: {:.1f}'.format(size / nodes))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""Peak memory of evaluating `.npy` columns loaded fully or mapped in chunks.
+
+Each way runs in a fresh process, which reports its peak resident memory.
+Requires numpy.
+
+Usage: python -m benchmarks.npy [rows]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bamboolean.factories import evaluate_columns, evaluate_npy
+
+TEXT = 'x > 500 and y < 0.5'
+
+
+def measure(way: str, directory: str) -> None:
+    start = time.perf_counter()
+    if way == 'loaded':
+        columns = {name[:-len('.npy')]: np.load(os.path.join(directory, name))
+                   for name in os.listdir(directory)}
+        mask = evaluate_columns(TEXT, columns)
+    else:
+        mask = evaluate_npy(TEXT, directory)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print('{:<8} {:8.2f} s {:8.0f} MB peak, {} true'.format(
+        way + ':', elapsed, peak, mask.sum()))
+
+
+def main(rows: int = 2 * 10 ** 7) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        generator = np.random.default_rng(0)
+        np.save(os.path.join(directory, 'x.npy'),
+                generator.integers(0, 1000, rows))
+        np.save(os.path.join(directory, 'y.npy'), generator.random(rows))
+        np.save(os.path.join(directory, 'unused.npy'),
+                generator.random(rows))
+        size = sum(entry.stat().st_size for entry in os.scandir(directory))
+        print('{} rows, {:.0f} MB of columns'.format(rows, size / 2 ** 20))
+        for way in ('loaded', 'mapped'):
+            subprocess.run([sys.executable, '-m', 'benchmarks.npy', way,
+                            directory], check=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        measure(*sys.argv[1:])
+    else:
+        main(*map(int, sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""Size and evaluation time of rules before and after ExprOptimizer.
+
+Records are upper-cased beforehand, so that only evaluation is measured.
+
+Usage: python -m benchmarks.optimizer [rules] [records]
+"""
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+from bamboolean.ast import AST
+from bamboolean.compiler import compile_closures
+from bamboolean.factories import parse
+from bamboolean.interpreter import Interpreter
+from bamboolean.walkers import ExprOptimizer
+from .corpus import generate_record, generate_templated_rule
+from .memory import count_nodes
+
+
+def per_evaluation(trees: List[AST], table: List[Dict[str, Any]]
+                   ) -> Dict[str, float]:
+    count = len(trees) * len(table)
+    timings = {}
+
+    interpreter = Interpreter(trees[0], {})
+    start = time.perf_counter()
+    for record in table:
+        interpreter.symbol_table = record
+        for tree in trees:
+            interpreter.tree = tree
+            interpreter.interpret()
+    timings['interpreter'] = (time.perf_counter() - start) / count * 1e6
+
+    predicates = [compile_closures(tree) for tree in trees]
+    start = time.perf_counter()
+    for record in table:
+        for predicate in predicates:
+            predicate(record)
+    timings['closure'] = (time.perf_counter() - start) / count * 1e6
+    return timings
+
+
+def main(rules: int = 5000, records: int = 20) -> None:
+    rng = random.Random(0)
+    trees = [parse(generate_templated_rule(rng)) for _ in range(rules)]
+    table = [{k.upper(): v for k, v in generate_record(rng).items()}
+             for _ in range(records)]
+
+    start = time.perf_counter()
+    optimized = [ExprOptimizer(tree).optimize() for tree in trees]
+    each = (time.perf_counter() - start) / rules * 1e6
+    print('optimization: {:.1f} us per rule'.format(each))
+
+    print('{:<10} {:>8} {:>12} {:>8}  (us per evaluation)'.format(
+        '', 'nodes', 'interpreter', 'closure'))
+    for name, forest in (('original', trees), ('optimized', optimized)):
+        timings = per_evaluation(forest, table)
+        print('{:<10} {:>8} {:>12.2f} {:>8.2f}'.format(
+            name, sum(count_nodes(tree) for tree in forest),
+            timings['interpreter'], timings['closure']))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""Rules specialized once for a tenant against rules evaluated whole.
+
+Usage: python -m benchmarks.partial [rules] [records]
+"""
+import random
+import sys
+import time
+from typing import List
+
+from bamboolean.compiler import CompiledExpression
+from bamboolean.factories import compile, specialize
+from .corpus import generate_record, generate_rule
+
+TENANTS = 10
+REGIONS = ('eu', 'us', 'apac')
+
+
+def generate_tenant_rule(rng: random.Random) -> str:
+    return "tenant == 't{}' and (region == '{}' or {})".format(
+        rng.randrange(TENANTS), rng.choice(REGIONS), generate_rule(rng))
+
+
+def measure(name: str, expressions: List[CompiledExpression],
+            records: List[dict]) -> None:
+    start = time.perf_counter()
+    for record in records:
+        [expression.evaluate(record) for expression in expressions]
+    each = (time.perf_counter() - start) / len(records)
+    print('{:<24}{:8.2f} ms/record'.format(name + ':', each * 1e3))
+
+
+def main(rules: int = 2000, records: int = 200) -> None:
+    rng = random.Random(0)
+    texts = [generate_tenant_rule(rng) for _ in range(rules)]
+    known = {'tenant': 't3', 'region': 'eu'}
+    table = [dict(generate_record(rng), **known) for _ in range(records)]
+
+    measure('whole rules', [compile(text) for text in texts], table)
+    start = time.perf_counter()
+    specialized = [specialize(text, known) for text in texts]
+    print('{:<24}{:8.2f} ms'.format(
+        'specializing:', (time.perf_counter() - start) * 1e3))
+    constant = sum(expression.text in ('true', 'false')
+                   for expression in specialized)
+    print('{:<24}{:8d} of {}'.format('constant residuals:', constant, rules))
+    measure('specialized rules', specialized, table)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""Matching a record against many rules.
+
+Usage: python -m benchmarks.ruleset [rules] [records]
+"""
+import random
+import sys
+import time
+
+from bamboolean.factories import compile
+from bamboolean.ruleset import RuleSet
+from .corpus import generate_rule, generate_record, \
+    generate_range_rule, generate_segment_rule
+
+
+def measure(name: str, ruleset: RuleSet, table: list) -> None:
+    ruleset.match(table[0])  # build the index outside of the measurement
+    start = time.perf_counter()
+    for record in table:
+        ruleset.match(record)
+    each = (time.perf_counter() - start) / len(table)
+    print('{:<21}{:8.2f} ms/record'.format(name + ':', each * 1e3))
+
+
+def main(rules: int = 20000, records: int = 20) -> None:
+    rng = random.Random(0)
+    texts = [generate_rule(rng) for _ in range(rules)]
+    table = [generate_record(rng) for _ in range(records)]
+
+    print('mixed rules')
+    compiled = [compile(text) for text in texts]
+    start = time.perf_counter()
+    for record in table:
+        [i for i, expression in enumerate(compiled)
+         if expression.evaluate(record)]
+    each = (time.perf_counter() - start) / records
+    print('compiled one by one: {:8.2f} ms/record'.format(each * 1e3))
+
+    ruleset = RuleSet(enumerate(texts), index=False)
+    measure('without index', ruleset, table)
+    measure('with index', RuleSet(enumerate(texts)), table)
+    print('{} distinct leaves'.format(len(ruleset.leaves)))
+
+    print('equality-heavy rules')
+    texts = [generate_segment_rule(rng) for _ in range(rules)]
+    measure('without index', RuleSet(enumerate(texts), index=False), table)
+    measure('with index', RuleSet(enumerate(texts)), table)
+
+    print('numeric range rules')
+    texts = [generate_range_rule(rng) for _ in range(rules)]
+    measure('without index', RuleSet(enumerate(texts), index=False), table)
+    measure('with index', RuleSet(enumerate(texts)), table)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
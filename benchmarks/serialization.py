@@ -0,0 +1,52 @@
+"""Startup with a rule corpus: parsing the texts against loading a dump.
+
+Usage: python -m benchmarks.serialization [rules]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from bamboolean.factories import parse
+from bamboolean.ruleset import RuleSet
+from bamboolean.serialization import dump, load
+from .corpus import generate_rule
+
+
+def measure(name: str, func: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    result = func()
+    print('{:<28}{:8.3f} s'.format(name + ':', time.perf_counter() - start))
+    return result
+
+
+def main(rules: int = 50000) -> None:
+    rng = random.Random(0)
+    texts = [generate_rule(rng) for _ in range(rules)]
+
+    trees = measure('parse texts', lambda: {i: parse(text)
+                                            for i, text in enumerate(texts)})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'rules.bin')
+        with open(path, 'wb') as f:
+            measure('dump', lambda: dump(trees, f))
+        print('{:<28}{:8.1f} MB'.format('file size:',
+                                        os.path.getsize(path) / 1e6))
+
+        def open_archive() -> Any:
+            with open(path, 'rb') as f:
+                return load(f)
+
+        archive = measure('load (programs ready)', open_archive)
+        measure('load and decode all trees',
+                lambda: [tree for tree in open_archive().values()])
+        measure('rule set from texts', lambda: RuleSet(enumerate(texts)))
+        measure('rule set from dump',
+                lambda: RuleSet.from_trees(open_archive()))
+        del archive
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,172 @@
+"""Reproducible timings of every stage, saved as JSON and compared.
+
+Each case is a list of expressions and records generated from a fixed
+seed. Every stage is run over the whole case `repeat` times with garbage
+collection disabled, and the fastest run is kept, in seconds.
+"""
+import gc
+import json
+import platform
+import random
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from bamboolean import factories
+from bamboolean.interpreter import Interpreter
+from bamboolean.lexer import Lexer
+from bamboolean.parser import Parser
+from bamboolean import tokens as tok
+from bamboolean.walkers import ExprNormalizer, VarsExtractor
+from .corpus import generate_expression, generate_record, generate_rule, \
+    generate_typed_record
+
+RESULTS_VERSION = 1
+SEED = 0
+
+
+class Case(NamedTuple):
+    texts: List[str]
+    records: List[Dict[str, Any]]
+
+
+def expression_case(depth: int, width: int, literals: Dict[str, int],
+                    records: int = 20) -> Callable[[random.Random], Case]:
+    def generate(rng: random.Random) -> Case:
+        text = generate_expression(rng, depth, width, literals)
+        return Case([text], [generate_typed_record(rng)
+                             for _ in range(records)])
+    return generate
+
+
+def rules_case(rules: int = 500, records: int = 10
+               ) -> Callable[[random.Random], Case]:
+    def generate(rng: random.Random) -> Case:
+        return Case([generate_rule(rng) for _ in range(rules)],
+                    [generate_record(rng) for _ in range(records)])
+    return generate
+
+
+def wide_case(rules: int = 20, fields: int = 1000, records: int = 20
+              ) -> Callable[[random.Random], Case]:
+    """Few rules against records far wider than the rules read"""
+    def generate(rng: random.Random) -> Case:
+        def record() -> Dict[str, Any]:
+            values = generate_record(rng)
+            values.update(('padding_{}'.format(i), i)
+                          for i in range(fields - len(values)))
+            return values
+        return Case([generate_rule(rng) for _ in range(rules)],
+                    [record() for _ in range(records)])
+    return generate
+
+
+MIXED = {'number': 1, 'string': 1, 'bool': 1}
+
+cases: Dict[str, Callable[[random.Random], Case]] = {
+    'flat': expression_case(depth=1, width=2000, literals=MIXED),
+    'deep': expression_case(depth=1000, width=2, literals=MIXED),
+    'balanced': expression_case(depth=40, width=40, literals=MIXED),
+    'numbers': expression_case(depth=10, width=100, literals={'number': 1}),
+    'strings': expression_case(depth=10, width=100, literals={'string': 1}),
+    'rules': rules_case(),
+    'wide': wide_case(),
+}
+
+
+def lex(text: str) -> int:
+    lexer = Lexer(text)
+    count = 1
+    while lexer.get_next_token().type != tok.EOF:
+        count += 1
+    return count
+
+
+def prepare(case: Case) -> Dict[str, Callable[[], Any]]:
+    """Stages of the case, each processing all of its expressions"""
+    tokens = [list(Lexer(text)) for text in case.texts]
+    trees = [Parser(stream).parse() for stream in tokens]
+    return {
+        'lex': lambda: [lex(text) for text in case.texts],
+        'parse': lambda: [Parser(stream).parse() for stream in tokens],
+        'vars': lambda: [VarsExtractor(tree).extract() for tree in trees],
+        'normalize': lambda: [ExprNormalizer(tree).normalize()
+                              for tree in trees],
+        'interpret': lambda: [Interpreter(tree, record).interpret()
+                              for record in case.records for tree in trees],
+        'end_to_end': lambda: [factories.interpret(text, record)
+                               for record in case.records
+                               for text in case.texts],
+    }
+
+
+def fastest(func: Callable[[], Any], repeat: int) -> float:
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def run(names: Optional[List[str]] = None, repeat: int = 5,
+        report: Callable[[str, float], None] = lambda name, seconds: None
+        ) -> Dict[str, Any]:
+    """Time every stage of the cases, results keyed by `case/stage`"""
+    previous = factories.get_cache()
+    factories.disable_cache()  # end to end includes parsing
+    timings: Dict[str, float] = {}
+    try:
+        for name in names or list(cases):
+            case = cases[name](random.Random(SEED))
+            for stage, func in prepare(case).items():
+                key = '{}/{}'.format(name, stage)
+                timings[key] = fastest(func, repeat)
+                report(key, timings[key])
+    finally:
+        factories.set_cache(previous)
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'seed': SEED,
+        'timings': timings,
+    }
+
+
+def save(results: Dict[str, Any], path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError('Unsupported results version in {}: {!r}'.format(
+            path, results.get('version')))
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = 0.1) -> List[Tuple[str, float, float, bool]]:
+    """(key, baseline, current, regressed) of timings present in both.
+
+    A timing regressed when it is slower than the baseline by more than
+    the threshold, a fraction of the baseline.
+    """
+    rows = []
+    for key, before in baseline['timings'].items():
+        after = current['timings'].get(key)
+        if after is not None:
+            rows.append((key, before, after,
+                         after > before * (1 + threshold)))
+    return rows
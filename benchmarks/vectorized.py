@@ -0,0 +1,77 @@
+"""Vectorized evaluation of a rule over columns against per-row interpreter.
+
+The interpreter is timed on a sample of rows and extrapolated. A second
+rule puts a selective numeric check before costly string comparisons, to
+compare evaluating all rows with evaluating only the undecided ones.
+Requires numpy.
+
+Usage: python -m benchmarks.vectorized [rows]
+"""
+import random
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from bamboolean import vectorized
+from bamboolean.factories import evaluate_columns, parse
+from bamboolean.interpreter import Interpreter
+from .corpus import FEATURES, generate_rule
+
+SAMPLE = 10000
+
+
+def generate_columns(rows: int, text: str) -> Dict[str, Any]:
+    """Columns of features used in the text, like `generate_record`"""
+    generator = np.random.default_rng(0)
+    columns: Dict[str, Any] = {}
+    for i in range(FEATURES):
+        name = 'feature_{}'.format(i)
+        if name not in text:
+            continue
+        if i % 2:
+            columns[name] = generator.integers(0, 1000, rows)
+        else:
+            columns[name] = np.char.add(
+                'value_', generator.integers(0, 50, rows).astype('U2'))
+    return columns
+
+
+def main(rows: int = 10 ** 7) -> None:
+    rng = random.Random(0)
+    text = generate_rule(rng)
+    selective = 'feature_1 > 990 and ' + ' and '.join(
+        "feature_{} != 'value_{}'".format(2 * i, i) for i in range(4))
+    columns = generate_columns(rows, text + selective)
+    constraints = text.count(' and ') + text.count(' or ') + 1
+    print('{} rows, {} constraints: {}'.format(rows, constraints, text))
+
+    start = time.perf_counter()
+    mask = evaluate_columns(text, columns)
+    elapsed = time.perf_counter() - start
+    print('vectorized:  {:10.3f} s, {:8.1f} ms per constraint, {} true'
+          .format(elapsed, elapsed / constraints * 1e3, mask.sum()))
+
+    records = [{name: column[row].item() for name, column in columns.items()}
+               for row in range(min(rows, SAMPLE))]
+    tree = parse(text)
+    start = time.perf_counter()
+    for record in records:
+        Interpreter(tree, record).interpret()
+    elapsed = (time.perf_counter() - start) / len(records) * rows
+    print('interpreter: {:10.3f} s (extrapolated)'.format(elapsed))
+
+    print('{} rows: {}'.format(rows, selective))
+    default = vectorized.COMPACT_BELOW
+    for label, compact_below in (('all rows', 0.0), ('undecided', default)):
+        vectorized.COMPACT_BELOW = compact_below
+        start = time.perf_counter()
+        evaluate_columns(selective, columns)
+        print('{:<12} {:10.3f} s'.format(
+            label + ':', time.perf_counter() - start))
+    vectorized.COMPACT_BELOW = default
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
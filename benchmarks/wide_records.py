@@ -0,0 +1,39 @@
+"""Evaluating an expression of two variables against records of many fields.
+
+Usage: python -m benchmarks.wide_records [fields] [records]
+"""
+import random
+import sys
+import time
+from typing import Any, Callable, List
+
+from bamboolean.factories import compile
+
+
+def measure(name: str, func: Callable[[Any], Any], rows: List[Any]) -> None:
+    start = time.perf_counter()
+    for row in rows:
+        func(row)
+    each = (time.perf_counter() - start) / len(rows)
+    print('{:<32}{:8.2f} us/record'.format(name + ':', each * 1e6))
+
+
+def main(fields: int = 500, records: int = 20000) -> None:
+    rng = random.Random(0)
+    names = ['field_{}'.format(i) for i in range(fields)]
+    rows = [[rng.randrange(1000) for _ in names] for _ in range(records)]
+    dicts = [dict(zip(names, row)) for row in rows]
+    compiled = compile('field_7 > 500 and field_300 < 200')
+    predicate = compiled._predicate
+
+    measure('folding every key', lambda record: predicate(
+        {k.upper(): v for k, v in record.items()}), dicts)
+    measure('evaluate', compiled.evaluate, dicts)
+    measure('positional', compiled.positional(names), rows)
+    other_case = [{name.capitalize(): value for name, value in row.items()}
+                  for row in dicts]
+    measure('evaluate, keys searched', compiled.evaluate, other_case)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -32,4 +32,7 @@ setup(
     ],
     keywords='boolean logic interpreter',
     packages=find_packages(exclude=['tests']),
+    extras_require={
+        'numpy': ['numpy'],
+    },
 )